@@ -0,0 +1,473 @@
+"""
+Parallel batch export of multiple scene files.
+
+Each scene is exported in it's own process (a standalone **mayapy** by default),
+with up to N processes running at once. The worker opens the scene, runs the whole
+export pipeline with non-interactive **export_to()**, and writes a small JSON result.
+The scheduler collects per-scene results, logs and timings, and retries failed scenes.
+
+From the command line:
+
+	mayapy -m drl.aivik.batch --pipeline IslandsPVE --out D:/export --workers 4 a.ma b.mb
+
+The scheduler itself doesn't require Maya: the worker command can be replaced
+(see **BatchRunner**'s **command_f**), i.e. with a stand-in script for tests.
+The stand-in has to follow the same protocol: it gets the result-file path and writes
+a JSON dict there, with at least the <success> key (and optionally <exported> / <error>).
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from collections import deque
+from timeit import default_timer as _timer
+
+PIPELINES = ('IslandsPVE', 'Buildings')
+RESULT_VERSION = 1
+
+_poll_interval = 0.1
+
+
+def default_interpreter():
+	"""
+	Path to **mayapy**: from $MAYA_LOCATION if it's set, otherwise it's expected to be in $PATH.
+	"""
+	exe = 'mayapy.exe' if sys.platform.startswith('win') else 'mayapy'
+	maya_location = os.environ.get('MAYA_LOCATION')
+	if maya_location:
+		path = os.path.join(maya_location, 'bin', exe)
+		if os.path.isfile(path):
+			return path
+	return exe
+
+
+def scene_name(scene):
+	"""
+	File name of the scene without the extension.
+	"""
+	return os.path.splitext(os.path.basename(scene))[0]
+
+
+def scene_out_names(scenes):
+	"""
+	Unique export sub-folder names for the given scenes.
+
+	A scene gets it's file name (without the extension), unless another scene has the same one.
+	Then, a short hash of it's path (relative to the scenes' common folder) is appended,
+	so the name stays the same between runs: i.e., <a/level.ma> and <b/level.ma>
+	give <level_1f2e3d4c> and <level_5a6b7c8d>.
+
+	:param scenes: <list of str> absolute paths to the scenes, each one only once.
+	:rtype: dict[str, str]
+	"""
+	by_name = dict()
+	for s in scenes:
+		by_name.setdefault(os.path.normcase(scene_name(s)), list()).append(s)
+
+	root = os.path.dirname(os.path.commonprefix(
+		[os.path.dirname(s) + os.sep for s in scenes]
+	)) if scenes else ''
+	res = dict()
+	for same in by_name.values():
+		for s in same:
+			nm = scene_name(s)
+			if len(same) > 1:
+				rel = os.path.relpath(s, root) if root else s
+				rel = os.path.normcase(rel).replace(os.sep, '/')
+				nm = '{0}_{1}'.format(nm, hashlib.md5(rel.encode('utf-8')).hexdigest()[:8])
+			res[s] = nm
+	return res
+
+
+def worker_command(
+	scene, pipeline, out_folder, result_path,
+	interpreter=None, incremental=True, force=False
+):
+	"""
+	Command line (as a list of arguments) running the export of a single scene.
+
+	:rtype: list[str]
+	"""
+	cmd = [
+		interpreter or default_interpreter(), '-m', 'drl.aivik.batch', '--worker',
+		'--pipeline', pipeline,
+		'--out', out_folder,
+		'--result', result_path,
+	]
+	if not incremental:
+		cmd.append('--full')
+	if force:
+		cmd.append('--force')
+	cmd.append(scene)
+	return cmd
+
+
+class JobResult(object):
+	"""
+	The outcome of a single scene's export (the last attempt of it).
+	"""
+	def __init__(self, scene, out_folder):
+		super(JobResult, self).__init__()
+		self.scene = scene
+		self.out_folder = out_folder
+		self.success = False
+		self.attempts = 0
+		self.seconds = 0.0  # of all attempts
+		self.return_code = None
+		self.timed_out = False
+		self.exported = list()
+		self.error = None
+		self.logs = list()
+
+	def to_dict(self):
+		return dict(
+			scene=self.scene,
+			out_folder=self.out_folder,
+			success=self.success,
+			attempts=self.attempts,
+			seconds=self.seconds,
+			return_code=self.return_code,
+			timed_out=self.timed_out,
+			exported=list(self.exported),
+			error=self.error,
+			logs=list(self.logs),
+		)
+
+	def __repr__(self):
+		return '<JobResult {0}: {1}, {2} attempt(s), {3:.2f} s>'.format(
+			self.scene, 'OK' if self.success else 'FAILED', self.attempts, self.seconds
+		)
+
+
+class _Running(object):
+	def __init__(self, index, process, log_file, result_path, started):
+		super(_Running, self).__init__()
+		self.index = index
+		self.process = process
+		self.log_file = log_file
+		self.result_path = result_path
+		self.started = started
+
+
+def _read_result(path):
+	if not os.path.isfile(path):
+		return None
+	try:
+		with open(path, 'r') as f:
+			return json.load(f)
+	except (IOError, OSError, ValueError):
+		return None
+
+
+class BatchRunner(object):
+	"""
+	Schedules the export of multiple scenes into a pool of worker processes.
+
+	:param scenes: <list of str> paths to .ma/.mb files.
+	:param pipeline: name of the exporter class in <drl.aivik.export> (see **PIPELINES**).
+	:param out_folder:
+		The root export folder. Each scene is exported to it's own sub-folder,
+		named after the scene file (see **scene_out_names()** for the scenes named the same).
+	:param workers: <int> the number of simultaneous processes (CPU count by default).
+	:param retries: <int> how many times a failed scene is re-tried.
+	:param timeout: <float / None> seconds, after which a worker is killed (and considered failed).
+	:param log_folder: where the worker logs are saved (<out_folder>/_logs by default).
+	:param interpreter: the executable running the worker (mayapy by default).
+	:param incremental: <bool> skip unchanged groups (see **BaseExport.export_to()**).
+	:param force: <bool> re-export all the groups, even in incremental mode.
+	:param command_f:
+		<callable / None>
+
+		Builds the worker command instead of **worker_command()**.
+		Arguments: (scene, out_folder, result_path), returns a list of arguments.
+	:param env: <dict / None> environment of the worker processes.
+	:param verbose: print the progress.
+	"""
+	def __init__(
+		self, scenes, pipeline, out_folder,
+		workers=None, retries=1, timeout=None, log_folder=None,
+		interpreter=None, incremental=True, force=False,
+		command_f=None, env=None, verbose=True
+	):
+		super(BatchRunner, self).__init__()
+		if command_f is None and pipeline not in PIPELINES:
+			raise ValueError('Unknown pipeline: {0} (expected one of: {1})'.format(
+				pipeline, ', '.join(PIPELINES)
+			))
+		if workers is None:
+			try:
+				from multiprocessing import cpu_count
+				workers = cpu_count()
+			except (ImportError, NotImplementedError):
+				workers = 1
+		self.scenes = [os.path.abspath(s) for s in scenes]
+		seen = set()
+		for s in self.scenes:
+			key = os.path.normcase(s)
+			if key in seen:
+				raise ValueError('The scene is given more than once: {0}'.format(s))
+			seen.add(key)
+		self.__out_names = scene_out_names(self.scenes)
+		self.pipeline = pipeline
+		self.out_folder = os.path.abspath(out_folder)
+		self.workers = max(1, int(workers))
+		self.retries = max(0, int(retries))
+		self.timeout = timeout
+		self.log_folder = log_folder or os.path.join(self.out_folder, '_logs')
+		self.interpreter = interpreter
+		self.incremental = bool(incremental)
+		self.force = bool(force)
+		self.command_f = command_f
+		self.env = env
+		self.verbose = bool(verbose)
+		self.results = list()  # type: list[JobResult]
+
+	def _log(self, msg):
+		if self.verbose:
+			print(msg)
+			sys.stdout.flush()
+
+	def scene_out_folder(self, scene):
+		nm = self.__out_names.get(scene) or scene_name(scene)
+		return os.path.join(self.out_folder, nm)
+
+	def __command(self, scene, out_folder, result_path):
+		if self.command_f is not None:
+			return list(self.command_f(scene, out_folder, result_path))
+		return worker_command(
+			scene, self.pipeline, out_folder, result_path,
+			self.interpreter, self.incremental, self.force
+		)
+
+	def __start(self, index):
+		res = self.results[index]
+		res.attempts += 1
+		scene = res.scene
+		base_nm = '{0:03d}_{1}.{2}'.format(index, scene_name(scene), res.attempts)
+		log_path = os.path.join(self.log_folder, base_nm + '.log')
+		result_path = os.path.join(self.log_folder, base_nm + '.json')
+		if os.path.isfile(result_path):
+			os.remove(result_path)
+		res.logs.append(log_path)
+
+		log_file = open(log_path, 'w')
+		try:
+			process = subprocess.Popen(
+				self.__command(scene, res.out_folder, result_path),
+				stdout=log_file, stderr=subprocess.STDOUT, env=self.env
+			)
+		except (OSError, ValueError):
+			log_file.write(traceback.format_exc())
+			log_file.close()
+			raise
+		self._log('[{0}/{1}] started (attempt {2}): {3}'.format(
+			index + 1, len(self.results), res.attempts, scene
+		))
+		return _Running(index, process, log_file, result_path, _timer())
+
+	def __finish(self, running, timed_out=False):
+		"""
+		Collect the result of a finished process.
+
+		:return: <bool> whether the scene was exported successfully.
+		"""
+		running.log_file.close()
+		res = self.results[running.index]
+		res.seconds += _timer() - running.started
+		res.return_code = running.process.returncode
+		res.timed_out = timed_out
+
+		data = _read_result(running.result_path) or dict()
+		res.exported = list(data.get('exported') or [])
+		res.error = data.get('error')
+		res.success = bool(
+			not timed_out and res.return_code == 0 and data.get('success', True)
+		)
+		if not res.success and not res.error:
+			res.error = 'timed out' if timed_out else 'exit code: {0}'.format(res.return_code)
+		self._log('[{0}/{1}] {2} in {3:.2f} s: {4}'.format(
+			running.index + 1, len(self.results),
+			'done' if res.success else 'FAILED', res.seconds, res.scene
+		))
+		return res.success
+
+	def run(self):
+		"""
+		Export all the scenes.
+
+		:return: results, in the same order as the scenes.
+		:rtype: list[JobResult]
+		"""
+		self.results = [
+			JobResult(s, self.scene_out_folder(s)) for s in self.scenes
+		]
+		if not os.path.isdir(self.log_folder):
+			os.makedirs(self.log_folder)
+
+		queue = deque(range(len(self.scenes)))
+		running = list()  # type: list[_Running]
+		try:
+			while queue or running:
+				while queue and len(running) < self.workers:
+					running.append(self.__start(queue.popleft()))
+
+				still_running = list()
+				for r in running:
+					timed_out = False
+					if r.process.poll() is None:
+						if self.timeout is None or _timer() - r.started < self.timeout:
+							still_running.append(r)
+							continue
+						r.process.kill()
+						r.process.wait()
+						timed_out = True
+					if not self.__finish(r, timed_out):
+						if self.results[r.index].attempts <= self.retries:
+							queue.append(r.index)
+				running = still_running
+				if running:
+					time.sleep(_poll_interval)
+		finally:
+			for r in running:
+				# interrupted: don't leave orphan processes
+				if r.process.poll() is None:
+					r.process.kill()
+					r.process.wait()
+				r.log_file.close()
+		return self.results
+
+	def summary(self):
+		"""
+		:return: JSON-serializable report of the whole batch.
+		:rtype: dict
+		"""
+		return dict(
+			version=RESULT_VERSION,
+			pipeline=self.pipeline,
+			out_folder=self.out_folder,
+			workers=self.workers,
+			succeeded=sum(1 for r in self.results if r.success),
+			failed=sum(1 for r in self.results if not r.success),
+			total_seconds=sum(r.seconds for r in self.results),
+			scenes=[r.to_dict() for r in self.results],
+		)
+
+	def save_summary(self, path=None):
+		"""
+		:param path: <str / None> <out_folder>/_logs/summary.json by default.
+		:return: <str> the path of the saved file.
+		"""
+		if not path:
+			path = os.path.join(self.log_folder, 'summary.json')
+		with open(path, 'w') as f:
+			json.dump(self.summary(), f, indent=1, sort_keys=True)
+		return path
+
+
+# -----------------------------------------------------------
+# worker side (it's run in mayapy)
+
+def _scene_roots():
+	"""
+	World-level transforms of the opened scene, except for cameras.
+	"""
+	from maya import cmds
+	return [
+		r for r in (cmds.ls(assemblies=True, long=True) or [])
+		if not cmds.listRelatives(r, shapes=True, type='camera')
+	]
+
+
+def run_worker(scene, pipeline, out_folder, result_path=None, incremental=True, force=False):
+	"""
+	Export a single scene. Intended to be run in a standalone Maya process.
+
+	:return: <int> exit code: 0 on success.
+	"""
+	start = _timer()
+	result = dict(
+		version=RESULT_VERSION, scene=scene, pipeline=pipeline,
+		success=False, exported=list(), error=None,
+	)
+	try:
+		import maya.standalone
+		try:
+			maya.standalone.initialize(name='python')
+		except RuntimeError:
+			pass  # already initialized / we're inside a Maya session
+
+		from maya import cmds
+		cmds.file(scene, open=True, force=True)
+
+		from drl.aivik import export as _export
+		exporter_cls = getattr(_export, pipeline)
+		exporter = exporter_cls(
+			_scene_roots(), selection_if_none=False, save_scene_warning=False
+		)
+		if not os.path.isdir(out_folder):
+			os.makedirs(out_folder)
+		exported = exporter.export(
+			overwrite=1, folder=out_folder, incremental=incremental, force=force
+		)
+		result['exported'] = list(exported or [])
+		result['success'] = True
+	except Exception:
+		result['error'] = traceback.format_exc()
+		print(result['error'])
+	finally:
+		result['seconds'] = _timer() - start
+		if result_path:
+			with open(result_path, 'w') as f:
+				json.dump(result, f, indent=1, sort_keys=True)
+	return 0 if result['success'] else 1
+
+
+def main(argv=None):
+	"""
+	Command-line entry point: either the scheduler, or (with --worker) a single-scene worker.
+	"""
+	import argparse
+	parser = argparse.ArgumentParser(
+		prog='mayapy -m drl.aivik.batch',
+		description='Export multiple scene files in parallel processes.'
+	)
+	parser.add_argument('scenes', nargs='+', help='.ma/.mb files')
+	parser.add_argument('--pipeline', required=True, choices=PIPELINES)
+	parser.add_argument('--out', required=True, help='the root export folder')
+	parser.add_argument('--workers', type=int, default=None, help='default: CPU count')
+	parser.add_argument('--retries', type=int, default=1)
+	parser.add_argument('--timeout', type=float, default=None, help='seconds per scene')
+	parser.add_argument('--interpreter', default=None, help='default: mayapy')
+	parser.add_argument('--full', action='store_true', help='non-incremental export')
+	parser.add_argument('--force', action='store_true', help='re-export unchanged groups, too')
+	parser.add_argument('--summary', default=None, help='path of the JSON summary')
+	parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+	parser.add_argument('--result', default=None, help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.worker:
+		return run_worker(
+			args.scenes[0], args.pipeline, args.out, args.result,
+			not args.full, args.force
+		)
+
+	runner = BatchRunner(
+		args.scenes, args.pipeline, args.out,
+		workers=args.workers, retries=args.retries, timeout=args.timeout,
+		interpreter=args.interpreter, incremental=not args.full, force=args.force,
+	)
+	results = runner.run()
+	print('Summary: ' + runner.save_summary(args.summary))
+	failed = [r for r in results if not r.success]
+	for r in failed:
+		print('FAILED: {0}\n{1}'.format(r.scene, r.error))
+	return 1 if failed else 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -1,15 +1,23 @@
 __author__ = 'Lex Darlog (DRL)'
 
+from maya import cmds
 from pymel import core as pm
 
 from drl_common import errors as err
 from drl.for_maya import geo, scene
 from drl.for_maya.ls import pymel as ls
+from drl.for_maya.ls.material_index import MaterialIndex
+from drl.for_maya.ls.dag_snapshot import DagSnapshot
 from drl.for_maya.ui import dialogs
 from drl.for_maya.plugins import fbx
 from drl.for_maya.auto import cleanup as cl
 
 from .messages import common as m
+from .__incremental import (
+	ExportManifest,
+	group_hash,
+	settings_fingerprint,
+)
 
 from drl.for_maya.py_node_types import transform as _t_transform
 
@@ -36,7 +44,9 @@ class BaseExport(object):
 	):
 		super(BaseExport, self).__init__()
 		self._objects = list()
+		self.__material_index = None
 		self.__batch_exporter = fbx.BatchExporter(**kwargs_exporter)
+		self.__preset_path = None  # the last loaded preset, for incremental export
 
 		if save_scene_warning:
 			self.__save_changed_scene()  # requires ^ __batch_exporter to already be set
@@ -49,6 +59,29 @@ class BaseExport(object):
 	def _plugin(self):
 		return self.__batch_exporter.get_exporter().id
 
+	@property
+	def material_index(self):
+		"""
+		Material-assignment snapshot, shared by all the export stages.
+
+		It's built on the first access and isn't updated automatically.
+		Call **refresh_material_index()** after the stages changing the assignments.
+
+		:rtype: MaterialIndex
+		"""
+		if self.__material_index is None:
+			self.__material_index = MaterialIndex()
+		return self.__material_index
+
+	def refresh_material_index(self):
+		"""
+		Re-build the material-assignment snapshot from the current scene.
+		"""
+		if self.__material_index is None:
+			self.__material_index = MaterialIndex(build=False)
+		self.__material_index.refresh()
+		return self
+
 	def __save_changed_scene(self):
 		def _show_warning():
 			"""
@@ -110,11 +143,11 @@ class BaseExport(object):
 		self.set_objects(value, False)
 
 	@staticmethod
-	def children(obj):
+	def children(obj, dag=None):
 		return sorted(set(
 			ls.to_children(
 				obj, False,
-				from_shape_transforms=True, keep_source_objects=False
+				from_shape_transforms=True, keep_source_objects=False, dag=dag
 			)
 		), key=ls.long_item_name)
 
@@ -133,7 +166,7 @@ class BaseExport(object):
 		)
 		return res
 
-	def get_all_exported_objects(self, transforms_only=True, keep_order=False):
+	def get_all_exported_objects(self, transforms_only=True, keep_order=False, dag=None):
 		"""
 		The list of entire hierarchy of exported objects.
 		I.e., specified objects with their children, grand-children etc.
@@ -146,12 +179,15 @@ class BaseExport(object):
 		:param keep_order:
 			Leave it to false if the order doesn't matter. It will work faster.
 			When False, the processed objects are sorted alphabetically.
+		:param dag:
+			Optional <DagSnapshot>, to query the hierarchy in memory.
 		:return: <list of PyNodes>
 		"""
 		objects = self._objects
 		kw_args = dict(
 			from_shape_transforms=True,
-			keep_shapes=not transforms_only
+			keep_shapes=not transforms_only,
+			dag=dag
 		)
 		if keep_order:
 			return ls.to_hierarchy(objects, False, remove_duplicates=True, **kw_args)
@@ -162,15 +198,19 @@ class BaseExport(object):
 	def del_not_exported(self):
 		"""
 		Remove all the extra objects (not included to the export process).
+
+		The whole hierarchy is captured once in a <DagSnapshot>,
+		and all the queries are done in memory.
 		"""
-		exported = self.get_all_exported_objects()
-		parents = ls.all_parents(self._objects, False)
-		kept = set(exported + parents)
+		dag = DagSnapshot()
+		exported = self.get_all_exported_objects(keep_order=True, dag=dag)
+		parents = ls.all_parents(self._objects, False, dag=dag)
+		kept = set(x.longName() for x in exported + parents)
 		removed = [
-			x for x in ls.all_objects()
+			p for p in dag.all_nodes(no_shapes=True)
 			if not (
-				(x in kept) or
-				ls.short_item_name(x) in _maya_default_objects
+				(p in kept) or
+				p.rsplit('|', 1)[-1] in _maya_default_objects
 			)
 		]
 		if removed:
@@ -280,86 +320,154 @@ class BaseExport(object):
 		if not callable(matching_f):
 			raise err.WrongTypeError(matching_f, var_name='matching_f', types_name='callable')
 
-		def _cleanup_combined(nu_comb):
-			geo.freeze_transform(nu_comb, False)
-			pm.delete(nu_comb, ch=1)
-			return geo.reset_pivot(nu_comb, False)
-
-		def _combine_single_child_group(combined_group, parent):
-			"""
-			If the given group  doesn't have shape, but has children:
-
-			* merge them
-			* re-parent back to where it was
-			* rename with the same name that group had
-			* freeze transform
-			* reset pivot
-			:param combined_group: <pm.nt.Transform> the group which children will be combined to replace it.
-			:param parent: the parent group of this one (Island-group relatively to _IslandDn).
-			:return: <list> containing either 0 or 1 object: the combined one.
-			"""
-			combined_group = err.WrongTypeError(combined_group, _t_transform, 'child_group').raise_if_needed()
-			children = BaseExport.children(combined_group)
-
+		# 1. collect the groups to combine, across all the marked objects:
+		dag = DagSnapshot()
+		parents = list()
+		to_combine = list()
+		for group in self._objects:
+			group = err.WrongTypeError(group, _t_transform, 'group').raise_if_needed()
+			matching = [c for c in BaseExport.children(group, dag=dag) if matching_f(c)]
+			parents.extend([group] * len(matching))
+			to_combine.extend(matching)
+		if not to_combine:
+			return self
+		to_combine = geo.instance_to_object(to_combine, False)
+		dag.refresh()
+
+		# 2. combine the children of each group, all of them are still in place:
+		cleaned = list()  # the resulting objects, to be cleaned up in bulk
+		renamed = list()  # (object, old_group, name) - for those replacing their group
+		singles = list()
+		united = list()  # (object, parent)
+		for combined_group, parent in zip(to_combine, parents):
+			combined_group = err.WrongTypeError(
+				combined_group, _t_transform, 'child_group'
+			).raise_if_needed()
+			children = BaseExport.children(combined_group, dag=dag)
 			if not children:
-				if pm.listRelatives(combined_group, shapes=1):
+				if dag.shapes(combined_group, include_intermediate=True):
 					# no children BUT the transform itself is a geo-object (has shape)
-					return _cleanup_combined(combined_group)
-				return list()
+					cleaned.append(combined_group)
+				continue
 
 			name = ls.short_item_name(combined_group)
-
 			if len(children) == 1:
 				# no need to combine, just cleanup move a single child up in hierarchy
-				# extra-freeze - to prevent creating a scale-parent:
-				combined = geo.freeze_transform(children[0], False)
+				combined = children[0]
+				singles.append(combined)
 			else:
 				# we're processing the full-case: multiple children that needs to be combined:
 				combined = pm.polyUnite(children, ch=0, mergeUVSets=1)[0]
+			united.append((combined, parent))
+			renamed.append((combined_group, name))
+
+		# extra-freeze of the single children - to prevent creating a scale-parent:
+		if singles:
+			geo.freeze_transform(singles, False)
+
+		# 3. the resulting objects are still in the wrong place in hierarchy,
+		# so we need to re-parent them under exported groups (one call per parent):
+		by_parent = dict()
+		parents_order = list()
+		for i, (combined, parent) in enumerate(united):
+			key = parent.longName()
+			if key not in by_parent:
+				by_parent[key] = (parent, list())
+				parents_order.append(key)
+			by_parent[key][1].append(i)
+		combined_objects = [c for c, p in united]
+		for key in parents_order:
+			parent, ids = by_parent[key]
+			reparented = pm.parent([combined_objects[i] for i in ids], parent, absolute=1)
+			for i, obj in zip(ids, reparented):
+				combined_objects[i] = obj
+		cleaned.extend(combined_objects)
+
+		# 4. final cleanup, in bulk:
+		if cleaned:
+			geo.freeze_transform(cleaned, False)
+			pm.delete(cleaned, ch=1)
+			cmds.xform(
+				[x.longName() for x in cleaned],
+				objectSpace=True, pivots=(0, 0, 0)
+			)
 
-			# in both cases above, the resulting object is still
-			# in the wrong place in hierarchy, so we need to re-parent it under exported group:
-			combined = pm.parent(combined, parent, absolute=1)[0]
+		# 5. the old combined-groups may have left.
+		# So, before renaming the resulting objects, we need to "free some space".
+		# Some groups could be already removed as history, during the cleanup.
+		old_groups = [g for g, nm in renamed if g.exists()]
+		if old_groups:
+			pm.delete(old_groups)
+
+		# 6. rename, in the same order as groups are processed.
+		# If any result temporarily holds a name that's about to be given
+		# to another one, it's moved out of the way first:
+		names = [nm for g, nm in renamed]
+		target_names = set(names)
+		for obj in combined_objects:
+			if ls.short_item_name(obj) in target_names:
+				pm.rename(obj, '_drlCombined#')
+		for obj, nm in zip(combined_objects, names):
+			pm.rename(obj, nm)
+		return self
 
-			# final cleanup:
-			combined = _cleanup_combined(combined)[0]
-			try:
-				# the old combined-group may have left.
-				# So, before renaming the resulting object, we need to "free some space":
-				pm.delete(combined_group)
-			except pm.MayaNodeError:
-				# the combined-group is already removed as history, in _cleanup_combined
-				pass
+	def load_preset(self, preset='AIVIK-Geo'):
+		exp = self.__batch_exporter
+		exp.load_preset(preset)
+		self.__preset_path = exp.get_exporter().preset_path(preset)
+		return self
 
-			combined = pm.rename(combined, name)
-			return [combined]
+	def content_hashes(self):
+		"""
+		Content hash of each exported group, in the current state of the scene.
+
+		:return: <list of tuples> (group_name, hash), in the order of groups.
+		"""
+		sg_materials = dict()
+		return [
+			(ls.short_item_name(o), group_hash(o, sg_materials))
+			for o in self._objects
+		]
 
+	def __export_incremental(self, overwrite=2, force=False):
+		"""
+		Export only the groups which have changed since the previous export
+		to the same folder (according to the manifest stored in it).
 
-		def _process_single_group(group):
-			"""
-			Combine all the matching child groups (IslandDn) for the given parent group (Island itself).
-			:param group: parent transform (Island group)
-			:return: list of combined objects
-			"""
-			group = err.WrongTypeError(group, _t_transform, 'group').raise_if_needed()
-			children = BaseExport.children(group)
-			to_combine = [c for c in children if matching_f(c)]
-			to_combine = geo.instance_to_object(to_combine, False)
-			res = list()
-			for combined in to_combine:
-				res.extend(_combine_single_child_group(combined, group))
-			return res
+		The batch exporter needs to have the folder already set.
 
+		:param force: re-export all the groups, regardless of the manifest.
+		:return: <list of strings> paths of the FBX files actually exported.
+		"""
+		exp = self.__batch_exporter
 		objects = self._objects
-		for o in objects:
-			_process_single_group(o)
-		return self
-
-	def load_preset(self, preset='AIVIK-Geo'):
-		self.__batch_exporter.load_preset(preset)
-		return self
+		exp.set_groups(objects)
+		if not objects:
+			# let the exporter throw it's usual error:
+			return exp.export_all_groups(overwrite)
+
+		manifest = ExportManifest(exp.folder)
+		settings = settings_fingerprint(
+			self.__preset_path, pipeline=self.__class__.__name__
+		)
+		res = list()
+		skipped = 0
+		for i, (nm, content_hash) in enumerate(self.content_hashes()):
+			if not (force or manifest.is_dirty(nm, content_hash, settings)):
+				skipped += 1
+				continue
+			path, replaced, cancelled = exp.export_group(i, overwrite)
+			if cancelled:
+				continue
+			manifest.update(nm, content_hash, path, settings)
+			res.append(path)
+		if res:
+			manifest.save()
+		if skipped:
+			print('{0} unchanged group(s) skipped'.format(skipped))
+		return res
 
-	def export_to(self, folder, overwrite=2):
+	def export_to(self, folder, overwrite=2, incremental=False, force=False):
 		"""
 		Performs export of each parent object to it's own FBX file in the given folder.
 
@@ -369,13 +477,27 @@ class BaseExport(object):
 			* 0 - don't overwrite (an error is thrown if file already exist)
 			* 1 - overwrite
 			* 2 - confirmation dialog will pop up if file already exist
+		:param incremental:
+			<bool>
+
+			Skip the groups that haven't changed since the previous export
+			to this folder. The content hash of each group is stored in the manifest
+			file next to the FBX files.
+		:param force:
+			<bool>
+
+			Only for incremental export: re-export all the groups anyway
+			(the manifest is still updated).
 		:return: <list of strings> paths of exported FBX files.
 		"""
 		exp = self.__batch_exporter
+		exp.set_folder(folder)
+		if incremental:
+			return self.__export_incremental(overwrite, force)
 		objects = self._objects
-		return exp.set_folder(folder).set_groups(objects).export_all_groups(overwrite)
+		return exp.set_groups(objects).export_all_groups(overwrite)
 
-	def export_dialog(self, overwrite=2):
+	def export_dialog(self, overwrite=2, incremental=False, force=False):
 		"""
 		Performs export of each parent object to it's own FBX file.
 		The folder for export is selected interactively by a user.
@@ -385,12 +507,35 @@ class BaseExport(object):
 				* 0 - don't overwrite (an error is thrown if file already exist)
 				* 1 - overwrite
 				* 2 - confirmation dialog will pop up if file already exist
+		:param incremental: <bool> see **export_to()**.
+		:param force: <bool> see **export_to()**.
 		:return: <list of strings> paths of exported FBX files.
 		"""
 		exp = self.__batch_exporter
+		if incremental:
+			if not self._objects:
+				raise fbx.errors.NothingToExportError(self._plugin())
+			exp.set_folder(exp._get_folder_dialog())
+			return self.__export_incremental(overwrite, force)
 		objects = self._objects
 		return exp.set_groups(objects).export_all_groups_dialog(overwrite)
 
+	def _export_stage(self, overwrite=2, incremental=False, force=False, folder=None):
+		"""
+		The final stage of a pipeline: either the interactive or the silent export.
+
+		:return: <tuple> (function, stage name) to be run by the profiler.
+		"""
+		if folder:
+			return (
+				lambda: self.export_to(folder, overwrite, incremental, force),
+				'export_to({})'.format(overwrite)
+			)
+		return (
+			lambda: self.export_dialog(overwrite, incremental, force),
+			'export_dialog({})'.format(overwrite)
+		)
+
 	def del_history_smart(self, before_deformers_only=False):
 		"""
 		Delete history on all the exported objects, the smart way.
@@ -418,6 +563,14 @@ class BaseExport(object):
 		return self
 
 	def mat_faces_to_obj(self):
+		"""
+		If a material is assigned to all the faces of the exported mesh,
+		re-assign it to the shape itself.
+
+		The material snapshot is refreshed first, since the previous stages
+		(combining, history removal) change the assignments.
+		"""
 		objects = self.get_all_exported_objects()
-		cl.materials.all_faces_to_shape(objects, False)
+		self.refresh_material_index()
+		cl.materials.all_faces_to_shape(objects, False, self.material_index)
 		return self
@@ -5,6 +5,7 @@ from pymel.core import PyNode
 import re
 
 from drl.for_maya.ls import pymel as ls
+from drl.aivik.profiling import StageProfiler
 from drl_common import errors as err
 from drl_py23 import (
 	str_t as _str_t,
@@ -32,7 +33,8 @@ _kept_colors_name_starts_f = tuple(
 class Buildings(BaseExport):
 	def export(
 		self, overwrite=2, map1_res=2048,
-		kept_colors_regexps=None, kept_colors_lowercase=True
+		kept_colors_regexps=None, kept_colors_lowercase=True,
+		report_path=None, incremental=False, force=False, folder=None
 	):
 		"""
 		:param overwrite:
@@ -53,20 +55,47 @@ class Buildings(BaseExport):
 		:param kept_colors_lowercase:
 			If `True`, the name of the object is matched to regexp in lowercase.
 			(regex string should be in lowercase, too)
+		:param report_path:
+			If given, the JSON report of the per-stage profiler is saved to this file.
+		:type report_path: None|str|unicode
+		:param incremental:
+			Export only the groups that have changed since the previous export
+			to the same folder.
+		:param force: Re-export all the groups, even in incremental mode.
+		:param folder:
+			The export folder. If not given, it's selected interactively by a user.
+		:type folder: None|str|unicode
 		:return: paths of exported FBX files.
 		:rtype: list[str|unicode]
 		"""
-		self.un_turtle().del_not_exported().render_layers_cleanup()
-		self.un_parent()
-		self.uv_sets_cleanup().uvs_sew(map1_res)
-		self.color_sets_cleanup(kept_colors_regexps, kept_colors_lowercase)
-		self.del_history_smart()
-		# TODO: replace with forcefully-set initial mat:
-		# self.mat_faces_to_obj()  # takes too long to execute.
-		self.del_not_exported()  # one more time, if anything is left after un-parenting
-		self._del_object_sets()
-		self._del_unused_nodes()
-		return self.load_preset().export_dialog(overwrite)
+		p = StageProfiler(self.__class__.__name__)
+		try:
+			p.stage(self.un_turtle)
+			p.stage(self.del_not_exported)
+			p.stage(self.render_layers_cleanup)
+			p.stage(self.un_parent)
+			p.stage(self.uv_sets_cleanup)
+			p.stage(
+				lambda: self.uvs_sew(map1_res),
+				'uvs_sew({})'.format(map1_res)
+			)
+			p.stage(
+				lambda: self.color_sets_cleanup(kept_colors_regexps, kept_colors_lowercase),
+				'color_sets_cleanup'
+			)
+			p.stage(self.del_history_smart)
+			p.stage(self.mat_faces_to_obj)
+			p.stage(self.del_not_exported)  # one more time, if anything is left after un-parenting
+			p.stage(self._del_object_sets)
+			p.stage(self._del_unused_nodes)
+			p.stage(self.load_preset)
+			res = p.stage(*self._export_stage(overwrite, incremental, force, folder))
+		finally:
+			if report_path:
+				p.save(report_path)
+			else:
+				p.finish()
+		return res
 
 	def color_sets_cleanup(self, kept_regexps=None, lowercase=True):
 		"""
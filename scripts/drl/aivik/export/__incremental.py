@@ -0,0 +1,269 @@
+__author__ = 'Lex Darlog (DRL)'
+
+import hashlib
+import json
+import os
+from array import array as _array
+
+from maya import cmds
+
+from drl_py23 import (
+	str_t as _str_t,
+	str_h as _str_h,
+)
+
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
+MANIFEST_FILE_NAME = 'export_manifest.json'
+_MANIFEST_VERSION = 2
+
+
+def _array_bytes(type_code, values):
+	arr = _array(type_code, values)
+	try:
+		return arr.tobytes()
+	except AttributeError:
+		# Python 2
+		return arr.tostring()
+
+
+def _update_str(h, *values):
+	for v in values:
+		h.update(u'{0}\0'.format(v).encode('utf-8'))
+
+
+def _update_floats(h, values):
+	h.update(_array_bytes('d', values))
+
+
+def _update_ints(h, values):
+	h.update(_array_bytes('i', values))
+
+
+def _mesh_fn(path):
+	sel = _om.MSelectionList()
+	sel.add(path)
+	dag = sel.getDagPath(0)
+	return _om.MFnMesh(dag), dag.instanceNumber()
+
+
+def _hash_normals(h, fn):
+	"""
+	Normals (with the locked ones marked) and hard/soft edges.
+	"""
+	flat = list()
+	extend = flat.extend
+	for n in fn.getNormals(_om.MSpace.kObject):
+		extend((n.x, n.y, n.z))
+	_update_floats(h, flat)
+
+	normal_counts, normal_ids = fn.getNormalIds()
+	_update_ints(h, normal_counts)
+	_update_ints(h, normal_ids)
+
+	is_locked = fn.isNormalLocked
+	_update_ints(h, [i for i in range(fn.numNormals) if is_locked(i)])
+	is_smooth = fn.isEdgeSmooth
+	_update_ints(h, [i for i in range(fn.numEdges) if not is_smooth(i)])
+
+
+def _hash_mesh(h, path, sg_materials):
+	"""
+	Add the mesh data to the hash: points, topology, normals, hard edges,
+	UVs, color sets and materials.
+
+	:param sg_materials: <dict> cache of SG -> material names, updated in process.
+	"""
+	fn, instance = _mesh_fn(path)
+
+	points = fn.getPoints(_om.MSpace.kObject)
+	flat = list()
+	extend = flat.extend
+	for p in points:
+		extend((p.x, p.y, p.z))
+	_update_floats(h, flat)
+
+	counts, vertex_ids = fn.getVertices()
+	_update_ints(h, counts)
+	_update_ints(h, vertex_ids)
+
+	_update_str(h, 'normals')
+	_hash_normals(h, fn)
+
+	for uv_set in fn.getUVSetNames():
+		_update_str(h, 'uv', uv_set)
+		us, vs = fn.getUVs(uv_set)
+		_update_floats(h, us)
+		_update_floats(h, vs)
+		uv_counts, uv_ids = fn.getAssignedUVs(uv_set)
+		_update_ints(h, uv_counts)
+		_update_ints(h, uv_ids)
+
+	for color_set in fn.getColorSetNames():
+		_update_str(h, 'color', color_set)
+		flat = list()
+		extend = flat.extend
+		for c in fn.getFaceVertexColors(color_set):
+			extend((c.r, c.g, c.b, c.a))
+		_update_floats(h, flat)
+
+	shaders, face_shader_ids = fn.getConnectedShaders(instance)
+	for i in range(len(shaders)):
+		sg = _om.MFnDependencyNode(shaders[i]).name()
+		if sg not in sg_materials:
+			mat = cmds.listConnections(sg + '.surfaceShader', s=True, d=False)
+			sg_materials[sg] = mat[0] if mat else ''
+		_update_str(h, 'sg', sg, sg_materials[sg])
+	_update_ints(h, face_shader_ids)
+
+
+def group_hash(group, sg_materials=None):
+	"""
+	Content hash of the exported group, with it's entire hierarchy.
+
+	It covers the hierarchy itself (relative names and node types), transforms,
+	and for each mesh: points, topology, normals (including locked ones), hard edges,
+	UVs, color sets and materials. Any change of these, which would change the exported FBX,
+	changes the hash. The export settings aren't covered: see **settings_fingerprint()**.
+
+	:param group: <str / PyNode> the root transform of the group.
+	:param sg_materials:
+		<dict / None>
+
+		Optional SG -> material cache, shared between multiple groups.
+	:return: <str> hex digest.
+	"""
+	if _om is None:
+		raise ImportError('Maya Python API 2.0 is required for content hashing')
+	if sg_materials is None:
+		sg_materials = dict()
+	if not isinstance(group, _str_t):
+		group = group.longName()
+	root = cmds.ls(group, long=True)[0]
+
+	nodes = [root] + (cmds.listRelatives(root, allDescendents=True, fullPath=True) or [])
+	typed = cmds.ls(nodes, long=True, showType=True) or []
+	node_types = dict(zip(typed[0::2], typed[1::2]))
+	intermediates = set(cmds.ls(nodes, long=True, intermediateObjects=True) or [])
+
+	h = hashlib.sha1()
+	for node in sorted(node_types.keys()):
+		if node in intermediates:
+			continue
+		node_type = node_types[node]
+		rel_path = node[len(root):]
+		_update_str(h, 'node', rel_path, node_type)
+		if cmds.objectType(node, isAType='transform'):
+			# world-space for the root itself, local for everything under it:
+			_update_floats(h, cmds.xform(
+				node, q=True, matrix=True, worldSpace=(node == root)
+			))
+		elif node_type == 'mesh':
+			_hash_mesh(h, node, sg_materials)
+	return h.hexdigest()
+
+
+def settings_fingerprint(preset_path=None, **settings):
+	"""
+	Hash of everything besides the content that affects the exported FBX:
+	the preset file contents, Maya and FBX plugin versions, and any extra settings.
+	The groups exported with different settings are considered changed.
+
+	:param preset_path: <str / None> the full path of the loaded FBX-export preset.
+	:param settings: any other settings (their repr is hashed).
+	:return: <str> hex digest.
+	"""
+	h = hashlib.sha1()
+	_update_str(h, 'maya', cmds.about(version=True))
+	try:
+		fbx_version = cmds.pluginInfo('fbxmaya', q=True, version=True)
+	except RuntimeError:
+		fbx_version = ''
+	_update_str(h, 'fbx', fbx_version)
+
+	_update_str(h, 'preset', preset_path or '')
+	if preset_path and os.path.isfile(preset_path):
+		with open(preset_path, 'rb') as f:
+			h.update(f.read())
+
+	for k in sorted(settings.keys()):
+		_update_str(h, k, repr(settings[k]))
+	return h.hexdigest()
+
+
+class ExportManifest(object):
+	"""
+	Content hashes of the exported groups, stored as JSON next to the FBX files.
+
+	:param folder: the export folder.
+	"""
+	def __init__(self, folder):
+		super(ExportManifest, self).__init__()
+		self.__folder = folder
+		self.__groups = dict()  # type: dict[_str_h, dict]
+		self.load()
+
+	@property
+	def folder(self):
+		return self.__folder
+
+	@property
+	def path(self):
+		return os.path.join(self.__folder, MANIFEST_FILE_NAME)
+
+	def load(self):
+		"""
+		Read the manifest file, if it exists. Otherwise, the manifest is empty.
+
+		:return: self
+		"""
+		self.__groups = dict()
+		path = self.path
+		if not os.path.isfile(path):
+			return self
+		try:
+			with open(path, 'r') as f:
+				data = json.load(f)
+		except (IOError, OSError, ValueError):
+			# a broken manifest is the same as no manifest: everything is rebuilt
+			return self
+		if data.get('version') == _MANIFEST_VERSION:
+			self.__groups = dict(data.get('groups', dict()))
+		return self
+
+	def save(self):
+		data = dict(version=_MANIFEST_VERSION, groups=self.__groups)
+		with open(self.path, 'w') as f:
+			json.dump(data, f, indent=1, sort_keys=True)
+		return self
+
+	def get_hash(self, name):
+		entry = self.__groups.get(name)
+		return None if entry is None else entry.get('hash')
+
+	def is_dirty(self, name, content_hash, settings=''):
+		"""
+		Whether the group needs to be re-exported: either it's content or the export settings
+		have changed, or the previously exported FBX is missing.
+
+		:param settings: <str> the export settings fingerprint (see **settings_fingerprint()**).
+		"""
+		entry = self.__groups.get(name)
+		if (
+			entry is None or
+			entry.get('hash') != content_hash or
+			entry.get('settings', '') != settings
+		):
+			return True
+		return not os.path.isfile(os.path.join(self.__folder, entry.get('file', '')))
+
+	def update(self, name, content_hash, fbx_path, settings=''):
+		self.__groups[name] = dict(
+			hash=content_hash,
+			settings=settings,
+			file=os.path.basename(fbx_path),
+		)
+		return self
@@ -2,3 +2,8 @@ __author__ = 'Lex Darlog (DRL)'
 
 from .__buildings import Buildings
 from .__islands_pve import IslandsPVE
+from .__incremental import (
+	ExportManifest,
+	group_hash,
+	settings_fingerprint,
+)
@@ -8,6 +8,7 @@ from drl.for_maya import geo
 from drl.for_maya.ls import pymel as ls
 from drl.for_maya.ui import dialogs
 from drl.for_maya.plugins import fbx
+from drl.aivik.profiling import StageProfiler
 
 from .messages import island as m, common as m_c
 
@@ -78,7 +79,10 @@ def _match_as_enemy_base(island_child):
 
 
 class IslandsPVE(BaseExport):
-	def export(self, overwrite=2, map1_res=2048):
+	def export(
+		self, overwrite=2, map1_res=2048, report_path=None,
+		incremental=False, force=False, folder=None
+	):
 		"""
 		:param overwrite:
 			<int>, whether existing file is overwritten:
@@ -90,34 +94,51 @@ class IslandsPVE(BaseExport):
 
 			Resolution of the texture on main UV-set (map1).
 			Used to sew border UVs which are closer then 1px.
+		:param report_path:
+			<str / None>
+
+			If given, the JSON report of the per-stage profiler is saved to this file.
+		:param incremental:
+			<bool>
+
+			Export only the islands that have changed since the previous export
+			to the same folder.
+		:param force: <bool> re-export all the islands, even in incremental mode.
+		:param folder:
+			<str / None>
+
+			The export folder. If not given, it's selected interactively by a user.
 		:return: <list of strings> paths of exported FBX files.
 		"""
-		c = _Counter()
-		c.start(self.un_turtle)
-		c.mid(self.del_not_exported)
-		c.mid(self.render_layers_cleanup)
-		c.mid(self.del_trees_mesh)
-		c.mid(self.del_enemy_base_mesh)
-		c.mid(self.combine_islands_dn)
-		c.mid(self.combine_waterfalls)
-		c.mid(self.un_parent)
-		c.mid(self.uv_sets_cleanup)
-		c.mid(
-			lambda: self.uvs_sew(map1_res),
-			'uvs_sew({})'.format(map1_res)
-		)
-		c.mid(self.color_sets_cleanup)
-		c.mid(self.del_history_smart)
-		# TODO: replace with forcefully-set initial mat:
-		# self.mat_faces_to_obj()  # takes too long to execute.
-		c.mid(self.del_not_exported)  # one more time, if anything is left after un-parenting
-		c.mid(self._del_object_sets)
-		c.mid(self._del_unused_nodes)
-		c.mid(self.load_preset)
-		return c.end(
-			lambda: self.export_dialog(overwrite),
-			'export_dialog({})'.format(overwrite)
-		)
+		p = StageProfiler(self.__class__.__name__)
+		try:
+			p.stage(self.un_turtle)
+			p.stage(self.del_not_exported)
+			p.stage(self.render_layers_cleanup)
+			p.stage(self.del_trees_mesh)
+			p.stage(self.del_enemy_base_mesh)
+			p.stage(self.combine_islands_dn)
+			p.stage(self.combine_waterfalls)
+			p.stage(self.un_parent)
+			p.stage(self.uv_sets_cleanup)
+			p.stage(
+				lambda: self.uvs_sew(map1_res),
+				'uvs_sew({})'.format(map1_res)
+			)
+			p.stage(self.color_sets_cleanup)
+			p.stage(self.del_history_smart)
+			p.stage(self.mat_faces_to_obj)
+			p.stage(self.del_not_exported)  # one more time, if anything is left after un-parenting
+			p.stage(self._del_object_sets)
+			p.stage(self._del_unused_nodes)
+			p.stage(self.load_preset)
+			res = p.stage(*self._export_stage(overwrite, incremental, force, folder))
+		finally:
+			if report_path:
+				p.save(report_path)
+			else:
+				p.finish()
+		return res
 
 	def get_enemy_base_transforms(self):
 		"""
@@ -271,38 +292,3 @@ class IslandsPVE(BaseExport):
 			matching_f=lambda x: ls.short_item_name(x).lower().rstrip('1234567890s').endswith('_waterfall')
 		)
 
-
-# only for debugging:
-from time import time as _tm
-
-
-class _Counter(object):
-	"""
-	Measures the time that a given function took to execute.
-	Prints the log into output.
-
-	Optional second argument for methods can contain a string which will be displayed
-	instead of function's repr() (for lambdas etc.).
-	"""
-	def __init__(self):
-		super(_Counter, self).__init__()
-		self.t = _tm()
-
-	def start(self, f, f_name=''):
-		self.t = _tm()
-		f_name = f_name or repr(f)
-		print(f_name + ':')
-		return f()
-
-	def mid(self, f, f_name=''):
-		c = _tm()
-		print(c - self.t)
-		self.t = c
-		f_name = f_name or repr(f)
-		print('\n' + f_name + ':')
-		return f()
-
-	def end(self, f, f_name=''):
-		res = self.mid(f, f_name)
-		print(_tm() - self.t)
-		return res
\ No newline at end of file
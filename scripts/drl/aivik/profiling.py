@@ -0,0 +1,321 @@
+"""
+Stage profiler for the export pipelines.
+
+Each stage of a pipeline is run through **StageProfiler.stage()**, which records:
+	* wall time;
+	* the number of Maya commands issued during the stage;
+	* the number of nodes and poly-faces in the scene before and after the stage.
+
+At the end of the run, the JSON report can be saved, and then compared
+to a stored baseline to find the stages that got slower:
+
+	python -m drl.aivik.profiling current.json baseline.json
+
+This module doesn't require Maya on import: the reports can be compared anywhere.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import json
+from datetime import datetime as _dt
+from timeit import default_timer as _timer
+
+REPORT_VERSION = 1
+
+
+def _maya_cmds():
+	try:
+		from maya import cmds
+	except ImportError:
+		return None
+	return cmds
+
+
+class _CommandCounter(object):
+	"""
+	Counts Maya commands executed while it's active, via a command callback.
+	If it can't be registered (no Maya API), the count is None.
+	"""
+	def __init__(self):
+		super(_CommandCounter, self).__init__()
+		self.count = 0
+		self.paused = False
+		self.__cb_id = None
+		try:
+			from maya.api import OpenMaya as om
+		except ImportError:
+			return
+
+		def _on_command(*args):
+			if not self.paused:
+				self.count += 1
+
+		try:
+			self.__cb_id = om.MCommandMessage.addCommandCallback(_on_command)
+		except RuntimeError:
+			self.__cb_id = None
+
+	@property
+	def active(self):
+		return self.__cb_id is not None
+
+	def value(self):
+		return self.count if self.active else None
+
+	def remove(self):
+		if self.__cb_id is None:
+			return
+		from maya.api import OpenMaya as om
+		try:
+			om.MMessage.removeCallback(self.__cb_id)
+		except RuntimeError:
+			pass
+		self.__cb_id = None
+
+
+def scene_counts():
+	"""
+	The current number of nodes and (non-intermediate) poly-faces in the scene.
+
+	:return: <tuple of 2 ints / Nones> (nodes, faces)
+	"""
+	cmds = _maya_cmds()
+	if cmds is None:
+		return None, None
+	nodes = len(cmds.ls() or [])
+	meshes = cmds.ls(type='mesh', noIntermediate=True)
+	faces = 0
+	if meshes:
+		counted = cmds.polyEvaluate(meshes, face=True)
+		if isinstance(counted, (list, tuple)):
+			faces = sum(int(x) for x in counted)
+		elif isinstance(counted, int):
+			faces = counted
+	return nodes, faces
+
+
+class StageProfiler(object):
+	"""
+	Records per-stage statistics of a single pipeline run.
+
+	:param pipeline: name of the pipeline (i.e., class name of the exporter).
+	:param count_commands: whether to count Maya commands issued by each stage.
+	:param count_scene: whether to count nodes/faces before and after each stage.
+	:param verbose: print each stage's stats as soon as it's finished.
+	"""
+	def __init__(self, pipeline, count_commands=True, count_scene=True, verbose=True):
+		super(StageProfiler, self).__init__()
+		self.pipeline = pipeline
+		self.verbose = bool(verbose)
+		self.__count_scene = bool(count_scene)
+		self.__counter = _CommandCounter() if count_commands else None
+		self.__stages = list()
+		self.__started = _dt.now()
+		self.__start_time = _timer()
+		self.__total = None
+
+	def __scene_counts(self):
+		if not self.__count_scene:
+			return None, None
+		counter = self.__counter
+		if counter is not None:
+			counter.paused = True
+		try:
+			return scene_counts()
+		finally:
+			if counter is not None:
+				counter.paused = False
+
+	def stage(self, f, name=''):
+		"""
+		Run a single stage of the pipeline and record it's stats.
+
+		:param f: <callable with no arguments> the stage itself.
+		:param name: the name of the stage in the report (the function's name by default).
+		:return: whatever the stage returned.
+		"""
+		name = name or getattr(f, '__name__', '') or repr(f)
+		counter = self.__counter
+		nodes_before, faces_before = self.__scene_counts()
+		commands_before = counter.value() if counter is not None else None
+
+		start = _timer()
+		try:
+			return f()
+		finally:
+			seconds = _timer() - start
+			commands = None
+			if commands_before is not None:
+				commands = counter.value() - commands_before
+			nodes_after, faces_after = self.__scene_counts()
+			record = dict(
+				name=name,
+				seconds=seconds,
+				commands=commands,
+				nodes_before=nodes_before,
+				nodes_after=nodes_after,
+				faces_before=faces_before,
+				faces_after=faces_after,
+			)
+			self.__stages.append(record)
+			if self.verbose:
+				print(format_stage(record))
+
+	def finish(self):
+		"""
+		Stop the profiling: total time is fixed and the command callback is removed.
+
+		:return: the report
+		:rtype: dict
+		"""
+		if self.__total is None:
+			self.__total = _timer() - self.__start_time
+			if self.__counter is not None:
+				self.__counter.remove()
+		return self.report()
+
+	def report(self):
+		"""
+		:return: the JSON-serializable report of the run.
+		:rtype: dict
+		"""
+		total = self.__total
+		if total is None:
+			total = _timer() - self.__start_time
+		cmds = _maya_cmds()
+		scene = cmds.file(q=True, sceneName=True) if cmds is not None else ''
+		return dict(
+			version=REPORT_VERSION,
+			pipeline=self.pipeline,
+			scene=scene,
+			started=self.__started.isoformat(),
+			total_seconds=total,
+			stages=[dict(s) for s in self.__stages],
+		)
+
+	def save(self, path):
+		"""
+		Finish the run and write the JSON report to the given file.
+
+		:return: the report
+		:rtype: dict
+		"""
+		report = self.finish()
+		save_report(report, path)
+		return report
+
+
+def format_stage(record):
+	def _delta(before, after):
+		if before is None or after is None:
+			return '-'
+		return '{0:+d}'.format(after - before)
+
+	commands = record.get('commands')
+	return '{name:<32} {seconds:9.3f} s  cmds: {cmds:>7}  nodes: {nodes:>7}  faces: {faces:>9}'.format(
+		name=record['name'],
+		seconds=record['seconds'],
+		cmds='-' if commands is None else commands,
+		nodes=_delta(record.get('nodes_before'), record.get('nodes_after')),
+		faces=_delta(record.get('faces_before'), record.get('faces_after')),
+	)
+
+
+def save_report(report, path):
+	with open(path, 'w') as f:
+		json.dump(report, f, indent=1, sort_keys=True)
+
+
+def load_report(path):
+	with open(path, 'r') as f:
+		return json.load(f)
+
+
+def _stages_by_key(report):
+	"""
+	Stages of the report, keyed by name.
+	If the same stage is run multiple times, the repeated ones get **#N** postfix.
+
+	:rtype: dict[str, dict]
+	"""
+	res = dict()
+	for s in report.get('stages', list()):
+		key = s['name']
+		i = 2
+		while key in res:
+			key = '{0}#{1}'.format(s['name'], i)
+			i += 1
+		res[key] = s
+	return res
+
+
+def compare_reports(current, baseline, threshold=0.2, min_seconds=0.05):
+	"""
+	Find the stages which got slower against the baseline.
+
+	:param current: <dict> report of the checked run.
+	:param baseline: <dict> report of the reference run.
+	:param threshold: relative slowdown to consider a stage regressed (0.2 = 20% slower).
+	:param min_seconds:
+		absolute slowdown (in seconds) ignored as noise,
+		even if it's bigger than **threshold** relatively.
+	:return: regressed stages, each as a dict: (stage, baseline, current, ratio).
+	:rtype: list[dict]
+	"""
+	base_stages = _stages_by_key(baseline)
+	res = list()
+	for key, cur in sorted(_stages_by_key(current).items(), key=lambda x: -x[1]['seconds']):
+		base = base_stages.get(key)
+		if base is None:
+			continue
+		cur_t = cur['seconds']
+		base_t = base['seconds']
+		if cur_t - base_t < min_seconds:
+			continue
+		ratio = cur_t / base_t if base_t > 0 else float('inf')
+		if ratio < 1.0 + threshold:
+			continue
+		res.append(dict(stage=key, baseline=base_t, current=cur_t, ratio=ratio))
+	return res
+
+
+def main(argv=None):
+	"""
+	Command-line entry point: compare a report to the baseline.
+
+	:return: exit code: 0 if no stage regressed, 1 otherwise.
+	"""
+	import argparse
+	parser = argparse.ArgumentParser(
+		prog='python -m drl.aivik.profiling',
+		description='Compare the export-profiler report to the baseline.'
+	)
+	parser.add_argument('current', help='JSON report of the checked run')
+	parser.add_argument('baseline', help='JSON report of the reference run')
+	parser.add_argument(
+		'--threshold', type=float, default=0.2,
+		help='relative slowdown to consider a stage regressed (default: 0.2 = 20%%)'
+	)
+	parser.add_argument(
+		'--min-seconds', type=float, default=0.05,
+		help='absolute slowdown ignored as noise (default: 0.05)'
+	)
+	args = parser.parse_args(argv)
+
+	current = load_report(args.current)
+	baseline = load_report(args.baseline)
+	regressed = compare_reports(current, baseline, args.threshold, args.min_seconds)
+	print('Total: {0:.3f} s (baseline: {1:.3f} s)'.format(
+		current.get('total_seconds', 0.0), baseline.get('total_seconds', 0.0)
+	))
+	if not regressed:
+		print('No stage got slower.')
+		return 0
+	print('Slower stages:')
+	for r in regressed:
+		print('\t{stage:<32} {baseline:9.3f} s -> {current:9.3f} s  (x{ratio:.2f})'.format(**r))
+	return 1
+
+
+if __name__ == '__main__':
+	import sys
+	sys.exit(main())
@@ -1 +1,11 @@
 __author__ = 'Lex Darlog (DRL)'
+
+from .lazy_import import lazy_submodules as _lazy_submodules
+
+# the submodules are imported on the first access (i.e., <drl.for_maya.geo>):
+_lazy_submodules(__name__, (
+	'auto', 'base_class', 'geo', 'geo_math', 'hud', 'ls', 'plugins', 'py_node_types',
+	'transformations', 'ui',
+	'benchmark', 'channel_box', 'fix_default', 'info', 'input_warn', 'layers',
+	'marking_menus', 'obj', 'oop', 'scene', 'shading', 'utils',
+))
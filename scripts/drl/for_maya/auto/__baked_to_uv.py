@@ -3,9 +3,15 @@ from pymel.core.datatypes import Vector, Matrix
 from .cleanup import UVSetsRule as Rule
 from drl.for_maya.ls import pymel as ls
 from drl.for_maya.base_class import PolyObjectsProcessorBase
+from drl.for_maya.geo_math import color_to_uv as _color_to_uv
 from drl_common import errors as err
 from drl_common.srgb import linear_to_srgb as to_srgb, srgb_to_linear as from_srgb
 
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
 
 class BakedToUVs(PolyObjectsProcessorBase):
 	"""
@@ -231,20 +237,58 @@ class BakedToUVs(PolyObjectsProcessorBase):
 		pm.select(pre_sel, r=1)
 		return shape, target_set
 
+	@staticmethod
+	def __matrix_rows(mtx):
+		"""Top-left 3x3 part of the matrix, as nested lists (by rows)."""
+		return [[mtx[r][c] for c in range(3)] for r in range(3)]
+
+	@staticmethod
+	def __transfer_to_uv_per_component(shape, uv_set, mtx, to_cspace_f, from_cspace_f):
+		"""
+		The fallback when Maya API 2 isn't available: each UV is processed with separate commands.
+		"""
+		def pass_value(val):
+			return val
+		to_cspace_f = to_cspace_f or pass_value
+		from_cspace_f = from_cspace_f or pass_value
+
+		uvs = shape.map
+		for uv in uvs:
+			vfs = pm.polyListComponentConversion(uv, toVertexFace=True)
+			if not vfs:
+				continue
+			vfs = pm.ls(vfs, fl=1)  # flatten
+			avg_clr = sum(
+				Vector(to_cspace_f(
+					pm.polyColorPerVertex(vf, q=1, rgb=1, notUndoable=1)
+				))
+				for vf in vfs
+			) / len(vfs)  # type: Vector
+			pm.polyColorPerVertex(vfs, rgb=from_cspace_f(avg_clr), notUndoable=1)
+			# transform to UV space:
+			avg_clr = mtx * avg_clr  # type: Vector
+			u, v = avg_clr[:2]
+			pm.polyEditUV(uv, relative=False, uValue=u, vValue=v, uvSetName=uv_set)
+
 	@staticmethod
 	def __transfer_to_uv(
-		shape, color_set, uv_set, mtx, to_cspace_f, from_cspace_f
+		shape, color_set, uv_set, mtx, to_cspace_f=None, from_cspace_f=None
 	):
 		"""
 		For each UV in given UV-set of the shape:
 			*
-				read all the color from vertex-faces with get_color_f(vf) -
+				read all the color from vertex-faces (converted with to_cspace_f) -
 				UVs are already have to be cut according to hard edges.
 			* calc average vertexFace-colors of each UV
 			* re-set vertexFace-colors with average value
 			* transform color to 2D-space with the given matrix
 			* pass resulting XY coordinates as UVs
+
+		All the mesh data is read at once, the math is done on arrays (see <geo_math.color_to_uv>)
+		and the result is written back with a single call for colors and another one for UVs.
+
 		This function is generic for color-transform either in linear or sRGB space.
+		None for to_cspace_f/from_cspace_f means no conversion.
 		"""
 		color_set = (
 			err.NotStringError(color_set, 'color_set').raise_if_needed_or_empty()
@@ -259,23 +303,36 @@ class BakedToUVs(PolyObjectsProcessorBase):
 			))
 		shape.setCurrentColorSetName(color_set)
 		shape.setCurrentUVSetName(uv_set)
-		uvs = shape.map
-		for uv in uvs:
-			vfs = pm.polyListComponentConversion(uv, toVertexFace=True)
-			if not vfs:
-				continue
-			vfs = pm.ls(vfs, fl=1)  # flatten
-			avg_clr = sum(
-				Vector(to_cspace_f(
-					pm.polyColorPerVertex(vf, q=1, rgb=1, notUndoable=1)
-				))
-				for vf in vfs
-			) / len(vfs)  # type: Vector
-			pm.polyColorPerVertex(vfs, rgb=from_cspace_f(avg_clr), notUndoable=1)
-			# transform to UV space:
-			avg_clr = mtx * avg_clr  # type: Vector
-			u, v = avg_clr[:2]
-			pm.polyEditUV(uv, relative=False, uValue=u, vValue=v, uvSetName=uv_set)
+		if _om is None:
+			BakedToUVs.__transfer_to_uv_per_component(
+				shape, uv_set, mtx, to_cspace_f, from_cspace_f
+			)
+			return
+
+		sel = _om.MSelectionList()
+		sel.add(shape.longName())
+		fn = _om.MFnMesh(sel.getDagPath(0))
+		vertex_counts, vertex_ids = fn.getVertices()
+		uv_counts, uv_ids = fn.getAssignedUVs(uv_set)
+		us, vs = fn.getUVs(uv_set)
+		fv_colors = fn.getFaceVertexColors(color_set, _om.MColor((0.0, 0.0, 0.0, 1.0)))
+
+		res = _color_to_uv.transfer(
+			vertex_counts, uv_counts, uv_ids,
+			[(c.r, c.g, c.b) for c in fv_colors], us, vs,
+			BakedToUVs.__matrix_rows(mtx), to_cspace_f, from_cspace_f
+		)
+		if not res.face_vertices:
+			return
+		face_ids, fv_vertex_ids = _color_to_uv.face_vertex_ids(
+			vertex_counts, vertex_ids, res.face_vertices
+		)
+		colors = _om.MColorArray([
+			_om.MColor((r, g, b, fv_colors[i].a))
+			for (r, g, b), i in zip(res.colors, res.face_vertices)
+		])
+		fn.setFaceVertexColors(colors, face_ids, fv_vertex_ids)
+		fn.setUVs(res.us, res.vs, uv_set)
 
 	@staticmethod
 	def _transfer_to_uv_linear(shape, color_set, uv_set, mtx):
@@ -288,12 +345,7 @@ class BakedToUVs(PolyObjectsProcessorBase):
 		:param mtx: RGB-to-UV transformation matrix.
 		:type mtx: Matrix
 		"""
-		def pass_value(val):
-			return val
-		BakedToUVs.__transfer_to_uv(
-			shape, color_set, uv_set, mtx,
-			to_cspace_f=pass_value, from_cspace_f=pass_value
-		)
+		BakedToUVs.__transfer_to_uv(shape, color_set, uv_set, mtx)
 
 	@staticmethod
 	def _transfer_to_uv_srgb(shape, color_set, uv_set, mtx):
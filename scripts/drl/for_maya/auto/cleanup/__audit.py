@@ -0,0 +1,512 @@
+"""
+Scene audit engine.
+
+The scene is traversed only once: each node is checked by all the registered rules,
+which produce a list of findings. The report can be saved as JSON, and then all
+the fixes are applied in bulk - grouped by operation (deletes, renames, attribute
+changes, UV-set changes), each rule fixing all of it's findings at once.
+
+A new check is added as a subclass of **AuditRule**:
+	* **node_types** - node types it's interested in (None = all nodes);
+	* **check()** - called for each node, returns a **Finding** or None;
+	* **fix()** - applies all the findings of this rule.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import json
+
+from maya import cmds
+
+from drl.for_maya.geo.components import uv_sets as _uv_sets
+from drl.for_maya.ls.dag_snapshot import DagSnapshot
+
+from .__uv_sets import UVSetsRule
+from . import __bulk as _bulk
+
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
+# the order in which the fixes are applied:
+OPERATIONS = ('delete', 'rename', 'set_attr', 'uv_sets')
+
+
+def short_name(path):
+	return path.rsplit('|', 1)[-1]
+
+
+def _single_uuid(node):
+	"""
+	UUID of the node, if the name matches exactly one existing node. None otherwise.
+	"""
+	res = cmds.ls(node, uuid=True)
+	return res[0] if res and len(res) == 1 else None
+
+
+def _current_path(uuid, fallback):
+	"""
+	The current full path of the node with the given UUID, or the fallback if it's gone.
+	"""
+	if uuid is None:
+		return fallback
+	res = cmds.ls(uuid, long=True)
+	return res[0] if res else fallback
+
+
+class Finding(object):
+	"""
+	A single problem found by a rule on a single node.
+
+	:param rule: <str> the rule's name.
+	:param node: <str> the node's full path (at the moment of audit).
+	:param uuid: <str / None> the node's UUID, used to find the node again at fix time.
+	:param operation: <str> the kind of the fix (see **OPERATIONS**).
+	:param message: <str> human-readable description.
+	:param value: any JSON-serializable data the rule needs for the fix.
+	"""
+	def __init__(self, rule, node, uuid, operation, message, value=None):
+		super(Finding, self).__init__()
+		self.rule = rule
+		self.node = node
+		self.uuid = uuid
+		self.operation = operation
+		self.message = message
+		self.value = value
+
+	def to_dict(self):
+		return dict(
+			rule=self.rule, node=self.node, uuid=self.uuid,
+			operation=self.operation, message=self.message, value=self.value,
+		)
+
+	def __repr__(self):
+		return '<Finding {0}: {1} - {2}>'.format(self.rule, self.node, self.message)
+
+
+class AuditScene(object):
+	"""
+	The data of the entire scene, captured once and shared by all the rules.
+	"""
+	def __init__(self):
+		super(AuditScene, self).__init__()
+		typed = cmds.ls(long=True, showType=True) or []
+		self.paths = typed[0::2]  # type: list[str]
+		self.types = typed[1::2]  # type: list[str]
+		uuids = cmds.ls(long=True, uuid=True) or []
+		if len(uuids) != len(self.paths):
+			uuids = [None] * len(self.paths)
+		self.uuids = uuids  # type: list[str]
+		self.__shapes = set(cmds.ls(shapes=True, long=True, noIntermediate=True) or [])
+		self.__dag = None
+
+	@property
+	def dag(self):
+		"""
+		The DAG hierarchy snapshot, built on the first access.
+
+		:rtype: DagSnapshot
+		"""
+		if self.__dag is None:
+			self.__dag = DagSnapshot()
+		return self.__dag
+
+	def nodes(self):
+		"""
+		:return: <iterator of tuples> (path, node_type, uuid) for each node in the scene.
+		"""
+		return zip(self.paths, self.types, self.uuids)
+
+	def is_shape(self, path):
+		"""
+		Whether the node is a (non-intermediate) shape.
+		"""
+		return path in self.__shapes
+
+	@staticmethod
+	def current_path(uuid, path=None):
+		"""
+		The current path of the node (it could be renamed since the audit).
+
+		:return: <str / None>
+		"""
+		if uuid is not None:
+			res = cmds.ls(uuid, long=True)
+			if res:
+				return res[0]
+		if path is not None and cmds.objExists(path):
+			return path
+		return None
+
+	def current_paths(self, findings):
+		res = (self.current_path(f.uuid, f.node) for f in findings)
+		return [p for p in res if p is not None]
+
+	@staticmethod
+	def bool_attr(path, attr):
+		"""
+		Read a boolean attribute, via Maya API if it's available.
+		"""
+		if _om is None:
+			return bool(cmds.getAttr(path + '.' + attr))
+		sel = _om.MSelectionList()
+		sel.add(path + '.' + attr)
+		return sel.getPlug(0).asBool()
+
+
+class AuditRule(object):
+	"""
+	The base class for a single check.
+
+	Subclasses override **check()** and **fix()** and set the class attributes.
+	"""
+	name = 'rule'
+	title = ''  # printed before the list of fixed nodes
+	operation = ''  # one of OPERATIONS
+	node_types = None  # type: tuple|None
+
+	def applies_to(self, node_type):
+		types = self.node_types
+		return types is None or node_type in types
+
+	def begin(self, scene):
+		"""
+		Called once, before the traversal. Pre-fetch the bulk data here.
+
+		:type scene: AuditScene
+		"""
+		pass
+
+	def check(self, path, node_type, uuid, scene):
+		"""
+		:type scene: AuditScene
+		:return: <Finding / list of Findings / None>
+		"""
+		return None
+
+	def fix(self, findings, scene):
+		"""
+		Apply all the findings of this rule at once.
+
+		:type findings: list[Finding]
+		:type scene: AuditScene
+		:return: <list> fixed nodes.
+		"""
+		return list()
+
+	def finding(self, path, uuid, message, value=None):
+		return Finding(self.name, path, uuid, self.operation, message, value)
+
+
+class IsolateSetsRule(AuditRule):
+	"""
+	TextureEditor-isolateSets are removed.
+	"""
+	name = 'isolate_sets'
+	title = 'Deleted <isolateSelect> sets:'
+	operation = 'delete'
+	node_types = ('objectSet', )
+
+	def check(self, path, node_type, uuid, scene):
+		if 'textureEditorIsolateSelectSet' in short_name(path):
+			return self.finding(path, uuid, 'textureEditor isolate-set')
+		return None
+
+	def fix(self, findings, scene):
+		paths = scene.current_paths(findings)
+		if paths:
+			cmds.delete(paths)
+		return paths
+
+
+class PastedNamesRule(AuditRule):
+	"""
+	"pasted__" prefix is removed from the nodes' names.
+	"""
+	name = 'pasted'
+	title = 'Renamed "pasted" nodes:'
+	operation = 'rename'
+	prefix = 'pasted__'
+
+	def check(self, path, node_type, uuid, scene):
+		nm = short_name(path)
+		if nm.startswith(self.prefix):
+			return self.finding(
+				path, uuid, 'pasted node', nm.replace(self.prefix, '')
+			)
+		return None
+
+	def fix(self, findings, scene):
+		res = list()
+		for f in findings:
+			path = scene.current_path(f.uuid, f.node)
+			if path is None:
+				continue
+			uuid = f.uuid or _single_uuid(path)
+			new_nm = cmds.rename(path, short_name(path).replace(self.prefix, ''))
+			# the returned name could be a non-unique short one:
+			res.append(_current_path(uuid, new_nm))
+		return res
+
+
+class DoubleSidedRule(AuditRule):
+	"""
+	All the poly-meshes are made double-sided.
+	"""
+	name = 'double_sided'
+	title = 'Set Double-sided attribute for:'
+	operation = 'set_attr'
+	node_types = ('mesh', )
+
+	def check(self, path, node_type, uuid, scene):
+		if not scene.bool_attr(path, 'doubleSided'):
+			return self.finding(path, uuid, 'single-sided mesh', True)
+		return None
+
+	def fix(self, findings, scene):
+		return _bulk.set_attr_bulk(scene.current_paths(findings), 'doubleSided', True)
+
+
+class ShapeNamesRule(AuditRule):
+	"""
+	Shape names match their transform parent, with regular "Shape" postfix.
+
+	The renames are planned for the whole scene at once (see <shape_rename_plan()>),
+	so the extra shapes of the same transform are expected to have a number appended.
+	"""
+	name = 'shape_names'
+	title = 'Renamed shapes:'
+	operation = 'rename'
+	postfix = 'Shape'
+
+	def __init__(self):
+		super(ShapeNamesRule, self).__init__()
+		self.__planned = dict()
+
+	def begin(self, scene):
+		# only the final name matters for the report, temporary ones are overridden:
+		self.__planned = dict(_bulk.shape_rename_plan(self.postfix, scene.dag))
+
+	def check(self, path, node_type, uuid, scene):
+		nn = self.__planned.get(path)
+		if nn is None:
+			return None
+		return self.finding(path, uuid, 'shape name mismatch', nn)
+
+	def fix(self, findings, scene):
+		# the parents could be renamed, too. So the plan is re-evaluated:
+		return _bulk.apply_rename_plan(_bulk.shape_rename_plan(self.postfix))
+
+
+class UVSetsAuditRule(AuditRule):
+	"""
+	The 1st UV-set is named "map1", and the extra UV-sets are removed.
+
+	:param rename_first: <bool> ensure the 1st UV-set is named "map1".
+	:param remove_extra: <bool> remove the sets not matching **kept_sets_rule**.
+	:param kept_sets_rule: see <UVSetsRule>. If None, all the sets are kept.
+	"""
+	name = 'uv_sets'
+	title = 'Cleaned-up UV-sets for:'
+	operation = 'uv_sets'
+	node_types = ('mesh', )
+	first_set_name = 'map1'
+
+	def __init__(self, rename_first=True, remove_extra=True, kept_sets_rule=None):
+		super(UVSetsAuditRule, self).__init__()
+		self.rename_first = bool(rename_first)
+		self.remove_extra = bool(remove_extra)
+		if kept_sets_rule is None:
+			kept_sets_rule = UVSetsRule((), is_keep=False)
+		if not isinstance(kept_sets_rule, UVSetsRule):
+			kept_sets_rule = UVSetsRule(kept_sets_rule)
+		self.kept_sets_rule = kept_sets_rule
+		self.__layouts = dict()
+
+	def begin(self, scene):
+		# all the meshes' UV-sets are read at once:
+		meshes = [
+			p for p, t in zip(scene.paths, scene.types)
+			if t == 'mesh' and scene.is_shape(p)
+		]
+		self.__layouts = dict(zip(meshes, _uv_sets.read_layouts(meshes)))
+
+	def check(self, path, node_type, uuid, scene):
+		layout = self.__layouts.get(path)
+		if layout is None:
+			return None
+		all_sets, current = layout
+		if not all_sets:
+			return None
+		renamed = None
+		if self.rename_first and all_sets[0] != self.first_set_name:
+			renamed = all_sets[0]
+			if current == renamed:
+				current = self.first_set_name
+			all_sets = (self.first_set_name, ) + tuple(all_sets[1:])
+		removed = list()
+		if self.remove_extra:
+			removed = self.kept_sets_rule.compiled().removed(all_sets, current)
+		if renamed is None and not removed:
+			return None
+
+		msg = list()
+		if renamed is not None:
+			msg.append('1st UV-set is "{0}"'.format(renamed))
+		if removed:
+			msg.append('extra UV-sets: {0}'.format(', '.join(removed)))
+		return self.finding(path, uuid, '; '.join(msg), dict(rename=renamed, remove=removed))
+
+	def fix(self, findings, scene):
+		renamed = dict()  # old set name -> shapes
+		removed = dict()  # set name -> shapes
+		res = list()
+		for f in findings:
+			path = scene.current_path(f.uuid, f.node)
+			if path is None:
+				continue
+			res.append(path)
+			if f.value.get('rename') is not None:
+				renamed.setdefault(f.value['rename'], list()).append(path)
+			for set_nm in f.value.get('remove') or []:
+				removed.setdefault(set_nm, list()).append(path)
+		_uv_sets.rename_bulk(renamed, self.first_set_name)
+		_uv_sets.remove_bulk(removed)
+		return res
+
+
+def default_rules(uv_sets_kept=None):
+	"""
+	The rules checked by **cleanup_all()** by default.
+
+	:rtype: list[AuditRule]
+	"""
+	return [
+		IsolateSetsRule(),
+		PastedNamesRule(),
+		DoubleSidedRule(),
+		ShapeNamesRule(),
+		UVSetsAuditRule(kept_sets_rule=uv_sets_kept),
+	]
+
+
+class AuditReport(object):
+	"""
+	The findings of a single audit run.
+	"""
+	def __init__(self, findings, scene):
+		super(AuditReport, self).__init__()
+		self.findings = findings  # type: list[Finding]
+		self.scene = scene  # type: AuditScene
+
+	def by_rule(self):
+		"""
+		:rtype: dict[str, list[Finding]]
+		"""
+		res = dict()
+		for f in self.findings:
+			res.setdefault(f.rule, list()).append(f)
+		return res
+
+	def to_dict(self):
+		counts = dict((r, len(fs)) for r, fs in self.by_rule().items())
+		return dict(
+			scene=cmds.file(q=True, sceneName=True),
+			nodes=len(self.scene.paths),
+			counts=counts,
+			findings=[f.to_dict() for f in self.findings],
+		)
+
+	def to_json(self, indent=1):
+		return json.dumps(self.to_dict(), indent=indent, sort_keys=True)
+
+	def save(self, path):
+		with open(path, 'w') as f:
+			f.write(self.to_json())
+		return self
+
+	def __len__(self):
+		return len(self.findings)
+
+	def __bool__(self):
+		return bool(self.findings)
+
+	__nonzero__ = __bool__
+
+
+class Audit(object):
+	"""
+	The audit engine: runs all the rules in a single scene traversal, then fixes the findings.
+
+	:param rules: <list of AuditRule> the default ones (**default_rules()**) if None.
+	"""
+	def __init__(self, rules=None):
+		super(Audit, self).__init__()
+		self.rules = list(default_rules() if rules is None else rules)  # type: list[AuditRule]
+
+	def add_rule(self, rule):
+		self.rules.append(rule)
+		return self
+
+	def run(self):
+		"""
+		Traverse the scene and check each node with all the rules.
+
+		:rtype: AuditReport
+		"""
+		scene = AuditScene()
+		rules = self.rules
+		for r in rules:
+			r.begin(scene)
+
+		rules_per_type = dict()
+		findings = list()
+		for path, node_type, uuid in scene.nodes():
+			applicable = rules_per_type.get(node_type)
+			if applicable is None:
+				applicable = [r for r in rules if r.applies_to(node_type)]
+				rules_per_type[node_type] = applicable
+			for r in applicable:
+				found = r.check(path, node_type, uuid, scene)
+				if found is None:
+					continue
+				if isinstance(found, Finding):
+					findings.append(found)
+				else:
+					findings.extend(found)
+		return AuditReport(findings, scene)
+
+	def __ordered_rules(self):
+		def _key(indexed_rule):
+			i, r = indexed_rule
+			op = r.operation
+			return (OPERATIONS.index(op) if op in OPERATIONS else len(OPERATIONS), i)
+		return [r for i, r in sorted(enumerate(self.rules), key=_key)]
+
+	def fix(self, report):
+		"""
+		Apply the fixes for all the findings: grouped by operation, in bulk per rule.
+		It's a single undo step.
+
+		The fixed nodes could be renamed by the subsequent rules,
+		so they're tracked by UUIDs and returned as their final full paths.
+
+		:type report: AuditReport
+		:return: <list of tuples> (rule, fixed_nodes), in the order the fixes were applied.
+		"""
+		by_rule = report.by_rule()
+		applied = list()
+		cmds.undoInfo(openChunk=True)
+		try:
+			for r in self.__ordered_rules():
+				findings = by_rule.get(r.name)
+				if not findings:
+					continue
+				fixed = r.fix(findings, report.scene)
+				applied.append((r, fixed, [_single_uuid(n) for n in fixed]))
+		finally:
+			cmds.undoInfo(closeChunk=True)
+		return [
+			(r, [_current_path(u, n) for n, u in zip(fixed, uuids)])
+			for r, fixed, uuids in applied
+		]
@@ -0,0 +1,171 @@
+"""
+Bulk scene edits, shared by the cleanup functions and the audit rules.
+
+The data is read with a single query (or a single API traversal), the changes
+are planned in memory and then applied with as few commands as possible.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+from maya import cmds, mel
+
+from drl.for_maya.ls.dag_snapshot import DagSnapshot
+
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
+_mel_chunk_size = 1000
+_tmp_name = '_drlTmpName'
+
+
+def short_name(path):
+	return path.rsplit('|', 1)[-1]
+
+
+def all_mesh_bool_attr(attr):
+	"""
+	Read a boolean attribute of all the meshes in the scene, at once.
+
+	:return: <list of tuples> (mesh_full_path, value)
+	"""
+	if _om is None:
+		return [
+			(m, bool(cmds.getAttr(m + '.' + attr)))
+			for m in (cmds.ls(type='mesh', long=True) or [])
+		]
+	res = list()
+	append = res.append
+	it = _om.MItDependencyNodes(_om.MFn.kMesh)
+	while not it.isDone():
+		obj = it.thisNode()
+		plug = _om.MFnDependencyNode(obj).findPlug(attr, False)
+		append((_om.MFnDagNode(obj).fullPathName(), plug.asBool()))
+		it.next()
+	return res
+
+
+def set_attr_bulk(paths, attr, value):
+	"""
+	Set the same numeric value to the attribute of all the given nodes.
+
+	It's done with a few MEL evaluations (each setting up to a thousand nodes),
+	so it's still a regular undoable edit.
+	"""
+	value = repr(value if not isinstance(value, bool) else int(value))
+	for i in range(0, len(paths), _mel_chunk_size):
+		mel.eval(''.join(
+			'setAttr "{0}.{1}" {2};'.format(p, attr, value)
+			for p in paths[i:i + _mel_chunk_size]
+		))
+	return paths
+
+
+def _order_renames(renames):
+	"""
+	Order the renames of sibling nodes, so that none of them is renamed
+	to the name currently held by another one from the list.
+	Cycles are broken by moving one of the nodes to a temporary name first.
+
+	:param renames: <list of tuples> (key, current_name, new_name)
+	:return: <list of tuples> (key, new_name) - the steps. A key could appear twice.
+	"""
+	holders = dict((cur, key) for key, cur, new in renames)
+	pending = list(renames)
+	steps = list()
+	tmp_i = 0
+	while pending:
+		rest = list()
+		for key, cur, new in pending:
+			holder = holders.get(new)
+			if holder is not None and holder != key:
+				rest.append((key, cur, new))
+				continue
+			steps.append((key, new))
+			holders.pop(cur, None)
+		if len(rest) == len(pending):
+			# a cycle: move the 1st one away
+			key, cur, new = rest[0]
+			tmp_i += 1
+			tmp = '{0}{1}'.format(_tmp_name, tmp_i)
+			steps.append((key, tmp))
+			holders.pop(cur, None)
+			rest[0] = (key, tmp, new)
+		pending = rest
+	return steps
+
+
+def shape_rename_plan(postfix='Shape', dag=None):
+	"""
+	Plan the renames making all the shapes' names match their transform parent,
+	with the given postfix.
+
+	When a transform has multiple shapes, only one of them can get the name.
+	The others get a number appended (the same way Maya itself does it),
+	skipping the names already taken by any sibling.
+
+	:param dag: <DagSnapshot / None> the snapshot of the current scene.
+	:return: <list of tuples> (shape_path, new_name), in the order they should be applied.
+	"""
+	if dag is None:
+		dag = DagSnapshot()
+	shapes = cmds.ls(dag=True, shapes=True, noIntermediate=True, long=True) or []
+
+	by_parent = dict()
+	parents_order = list()
+	for s in shapes:
+		parent = s.rsplit('|', 1)[0]
+		if not parent:
+			continue
+		if parent not in by_parent:
+			by_parent[parent] = list()
+			parents_order.append(parent)
+		by_parent[parent].append(s)
+
+	res = list()
+	for parent in parents_order:
+		target = short_name(parent) + postfix
+		siblings = set(short_name(x) for x in dag.children(parent, include_intermediate=True))
+		renamed = [s for s in by_parent[parent] if short_name(s) != target]
+		if not renamed:
+			continue
+		taken = siblings - set(short_name(s) for s in renamed)
+		# if nobody has the right name yet, the 1st shape takes it:
+		candidates = [target] if target not in taken else list()
+
+		planned = list()
+		i = 0
+		for s in renamed:
+			while not candidates:
+				i += 1
+				nm = '{0}{1}'.format(target, i)
+				if nm not in taken:
+					candidates.append(nm)
+			nm = candidates.pop(0)
+			taken.add(nm)
+			if nm != short_name(s):
+				planned.append((s, short_name(s), nm))
+		res.extend(_order_renames(planned))
+	return res
+
+
+def apply_rename_plan(plan):
+	"""
+	Apply the planned renames. The paths are kept up-to-date in process,
+	so the same node can be renamed multiple times (i.e., via a temporary name).
+
+	:param plan: <list of tuples> (path, new_name)
+	:return: <list of strings> the final full paths of the renamed nodes.
+	"""
+	current = dict()
+	order = list()
+	for path, nm in plan:
+		src = current.get(path, path)
+		parent = src.rsplit('|', 1)[0]
+		new_nm = cmds.rename(src, nm)
+		# a top-level node's parent is '' (world), and the new name could be non-unique:
+		new_path = '{0}|{1}'.format(parent, short_name(new_nm)) if src.startswith('|') else new_nm
+		if path not in current:
+			order.append(path)
+		current[path] = new_path
+	return [current[p] for p in order]
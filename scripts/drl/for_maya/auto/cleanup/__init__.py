@@ -12,6 +12,20 @@ from drl.for_maya.ls import pymel as ls
 
 from .__uv_sets import UVSets, UVSetsRule
 from .__uvs import UVs
+from . import __bulk as _bulk
+from .__audit import (
+	Audit,
+	AuditReport,
+	AuditRule,
+	AuditScene,
+	Finding,
+	IsolateSetsRule,
+	PastedNamesRule,
+	DoubleSidedRule,
+	ShapeNamesRule,
+	UVSetsAuditRule,
+	default_rules,
+)
 
 _this = __sys.modules[__name__]
 
@@ -69,40 +83,32 @@ def del_unused_nodes():
 	pm.mel.MLdeleteUnused()
 
 
-def __all_poly_shapes():
-	return pm.ls(type='mesh')
-
-
 def make_all_double_sided():
 	"""
 	Make all geometry objects in the scene double-sided.
 
+	The attribute is read for all the meshes at once, and set with a few bulk edits.
+
 	:return: <list of PyNode> Nodes which attribute has been changed to True.
 	"""
-	res = list()
-	for s in __all_poly_shapes():
-		a = s.doubleSided
-		assert isinstance(a, pm.Attribute)
-		if not a.get():
-			s.doubleSided.set(True)
-			res.append(s)
-	return res
+	changed = [path for path, on in _bulk.all_mesh_bool_attr('doubleSided') if not on]
+	if not changed:
+		return list()
+	_bulk.set_attr_bulk(changed, 'doubleSided', True)
+	return [pm.PyNode(x) for x in changed]
 
 
 def rename_all_shapes():
 	"""
 	Make all the shape nodes' names match their transform parent, with regular "Shape" postfix.
 
+	The renames are planned in memory first. If a transform has multiple shapes,
+	the extra ones get a number appended.
+
 	:return: <list of PyNode> Renamed shapes.
 	"""
-	res = list()
-	for s in ls.all_shapes():
-		p = ls.to_parent(s, False)[0]
-		nn = ls.short_item_name(p) + 'Shape'
-		if ls.short_item_name(s) != nn:
-			pm.rename(s, nn)
-			res.append(s)
-	return res
+	renamed = _bulk.apply_rename_plan(_bulk.shape_rename_plan())
+	return [pm.PyNode(x) for x in renamed]
 
 
 def create_debug_normals_layer_if_needed(
@@ -181,58 +187,57 @@ def cleanup_all(
 	uv_sets_rename_first=True,
 	uv_sets_remove_extra=True, uv_sets_kept=None,
 	pasted=True, isolate_sets=True,
-	debug_normals=True, switch_to_debug_lr=True
+	debug_normals=True, switch_to_debug_lr=True,
+	report_path=None, extra_rules=None
 ):
+	"""
+	Prepare the whole scene for baking.
+
+	All the checks are performed by <Audit> in a single scene traversal,
+	then all the found problems are fixed in bulk.
+
+	:param report_path: <str / None> if given, the JSON report of the findings is saved there.
+	:param extra_rules: <list of AuditRule / None> additional checks.
+	:return: <AuditReport> the findings (as they were before the fix).
+	"""
 	from pprint import pprint as pp
-	res = list()
+	rules = list()
 	if isolate_sets:
-		res_n = del_isolate_sets()
-		if res_n:
-			print('\nDeleted <isolateSelect> sets:')
-			pp(res_n)
+		rules.append(IsolateSetsRule())
 	if pasted:
-		res_n = rename_pasted()
-		res += res_n
-		if res_n:
-			print('\nRenamed "pasted" nodes:')
-			pp(res_n)
+		rules.append(PastedNamesRule())
 	if double_sided:
-		res_n = make_all_double_sided()
-		res += res_n
-		if res_n:
-			print('\nSet Double-sided attribute for:')
-			pp(res_n)
+		rules.append(DoubleSidedRule())
 	if rename_shapes:
-		res_n = rename_all_shapes()
-		res += res_n
-		if res_n:
-			print('\nRenamed shapes:')
-			pp(res_n)
-
+		rules.append(ShapeNamesRule())
 	if uv_sets_rename_first or uv_sets_remove_extra:
-		all_shapes = __all_poly_shapes()
-		cleaner = UVSets(all_shapes, False, kept_sets_rule=uv_sets_kept)
-
-		if uv_sets_rename_first:
-			res_n = cleaner.rename_first_set()
-			if res_n:
-				res += res_n
-				print('\nFirst UV-set renamed to "map1" for:')
-				pp(res_n)
-		if uv_sets_remove_extra:
-			res_n = cleaner.remove_extra_sets()
-			if res_n:
-				res += [x[0] for x in res_n]
-				print('\nRemoved extra UV-sets:')
-				pp(res_n)
+		rules.append(UVSetsAuditRule(uv_sets_rename_first, uv_sets_remove_extra, uv_sets_kept))
+	if extra_rules:
+		rules.extend(extra_rules)
+
+	audit = Audit(rules)
+	report = audit.run()
+	if report_path:
+		report.save(report_path)
+
+	res = list()
+	for rule, fixed in audit.fix(report):
+		if not fixed:
+			continue
+		if not isinstance(rule, IsolateSetsRule):
+			res += fixed
+		print('\n' + rule.title)
+		pp(fixed)
 
 	if debug_normals:
 		rl, created = create_debug_normals_layer_if_needed(switch_to_debug_lr)
 		if created:
 			print('\nCreated <debug layer> for testing normals:\n' + repr(rl))
 
+	res = [x for x in res if pm.objExists(x)]
 	if res:
 		pm.select(res, r=True)
 	else:
 		pm.select(cl=True)
-		print('No problems detected. The meshes are ready to bake!')
\ No newline at end of file
+		print('No problems detected. The meshes are ready to bake!')
+	return report
@@ -7,10 +7,7 @@ from drl.for_maya.ls import pymel as ls
 from drl.for_maya.geo.components import uv_sets
 from drl.for_maya.base_class import PolyObjectsProcessorBase as __BaseProcessor
 
-from drl_common import (
-	errors as err,
-	utils,
-)
+from drl_common import errors as err
 from drl_py23 import (
 	str_t as _str_t,
 	str_h as _str_h,
@@ -124,70 +121,39 @@ class UVSetsRule(object):
 		obj = obj[0]
 		return obj if isinstance(obj, _t_shape_any) else ls.to_shapes(obj, False)[0]
 
-	def __get_matching_sets(self, shape, all_sets=None):
-		"""
-		Get all matching sets of this rule, applied to a specific poly shape
+	def compiled(self):
 		"""
-		if all_sets is None:
-			all_sets = uv_sets.get_object_sets(shape)
-		num_sets = len(all_sets)
+		The rule, compiled to a matcher working on a shape's list of UV-set names.
 
-		def _single_rule(single_rule):
-			"""
-			Return the matching UV set (if any) for a single rule element.
-			I.e., for ('LM_out', 'LM', 10, -5) it will return:
-			* 'LM_out', if exist
-			* 'LM', if exist
-			* 10th UV-set's name, counting from start - if there are at least 10 UV-sets
-			* 5th UV-set's name, counting from end - if there are at least 5 UV-sets
-			* None, if no match is found
-			"""
-			for itm in single_rule:
-
-				if isinstance(itm, int):
-					#item is int:
-					if itm == 0:
-						# 0 = current set
-						return uv_sets.get_current(shape)
-					if itm > 0:
-						# positive = set number, starting at 1
-						set_id = itm - 1
-						if set_id < num_sets:
-							return all_sets[set_id]
-					# negative = set number, counted from end
-					if abs(itm) <= num_sets:
-						return all_sets[itm]
-
-				set_nm = err.NotStringError(itm, 'rule item').raise_if_needed()
-				if not set_nm:
-					return uv_sets.get_current(shape)
-				if set_nm in all_sets:
-					return set_nm
-
-			return None
+		Compiled matchers are cached, so it's cheap to call it multiple times.
 
-		res = list()
-		for r in self.__rule:
-			match = _single_rule(r)
-			if not (match is None):
-				res.append(match)
-		return utils.remove_duplicates(res)
+		:rtype: CompiledUVSetsRule
+		"""
+		return _compiled_rule(self.__rule, self.__is_keep)
 
 	def kept_sets_for_object(self, obj, selection_if_none=True):
 		shape = UVSetsRule.__checked_shape(obj, selection_if_none)
 		all_sets = uv_sets.get_object_sets(shape)
-		match = self.__get_matching_sets(shape, all_sets)
-		if self.is_keep:
-			return match
-		return [x for x in all_sets if not (x in match)]
+		return self.compiled().kept(all_sets, lambda: uv_sets.get_current(shape))
 
 	def removed_sets_for_object(self, obj, selection_if_none=True):
 		shape = UVSetsRule.__checked_shape(obj, selection_if_none)
 		all_sets = uv_sets.get_object_sets(shape)
-		match = self.__get_matching_sets(shape, all_sets)
-		if not self.is_keep:
-			return match
-		return [x for x in all_sets if not (x in match)]
+		return self.compiled().removed(all_sets, lambda: uv_sets.get_current(shape))
+
+	def removed_set_names(self, all_sets, current_set=None):
+		"""
+		The same as **removed_sets_for_object()**, but for the already known list of UV-sets,
+		without any queries to the scene.
+
+		:param all_sets: <list of strings> all the UV-sets of a shape, in their order.
+		:param current_set: <str / None> the current UV-set (the 1st one, if None).
+		:rtype: list[str]
+		"""
+		all_sets = tuple(all_sets)
+		if current_set is None and all_sets:
+			current_set = all_sets[0]
+		return self.compiled().removed(all_sets, current_set)
 
 	def __repr__(self):
 		return 'UVSetsRule({0}, {1})'.format(repr(self.__rule), repr(self.__is_keep))
@@ -238,6 +204,122 @@ class UVSetsRule(object):
 		return hash(tuple(sorted(self.__dict__.items())))
 
 
+class CompiledUVSetsRule(object):
+	"""
+	<UVSetsRule>, pre-processed to be evaluated on a list of UV-set names, without
+	any type checks. The results are cached per unique UV-set layout, so thousands of
+	shapes with the same sets cost the same as a single one.
+
+	Each rule item is compiled to one of:
+		* (0, None) - the current set
+		* (1, index) - the set by it's index (negative - from the end)
+		* (2, name) - the set by name
+	"""
+	CURRENT = 0
+	INDEX = 1
+	NAME = 2
+
+	def __init__(self, rule, is_keep=True):
+		super(CompiledUVSetsRule, self).__init__()
+		self.__is_keep = bool(is_keep)
+		self.__rule = tuple(
+			tuple(CompiledUVSetsRule.__compile_item(x) for x in fallback)
+			for fallback in rule
+		)
+		self.__needs_current = any(
+			kind == CompiledUVSetsRule.CURRENT
+			for fallback in self.__rule for kind, _ in fallback
+		)
+		self.__cache = dict()
+
+	@staticmethod
+	def __compile_item(itm):
+		if isinstance(itm, float):
+			itm = int(itm)
+		if isinstance(itm, int):
+			if itm == 0:
+				return CompiledUVSetsRule.CURRENT, None
+			# positive = set number, starting at 1. Negative = counted from the end:
+			return CompiledUVSetsRule.INDEX, (itm - 1 if itm > 0 else itm)
+		set_nm = err.NotStringError(itm, 'rule item').raise_if_needed()
+		if not set_nm:
+			return CompiledUVSetsRule.CURRENT, None
+		return CompiledUVSetsRule.NAME, set_nm
+
+	@property
+	def is_keep(self):
+		return self.__is_keep
+
+	@property
+	def needs_current(self):
+		"""
+		Whether the rule refers to the current UV-set (so it has to be known).
+		"""
+		return self.__needs_current
+
+	def __evaluate(self, all_sets, current):
+		num_sets = len(all_sets)
+		present = frozenset(all_sets)
+		matched = list()
+		for fallback in self.__rule:
+			for kind, val in fallback:
+				if kind == CompiledUVSetsRule.CURRENT:
+					match = current
+				elif kind == CompiledUVSetsRule.INDEX:
+					match = all_sets[val] if -num_sets <= val < num_sets else None
+				else:
+					match = val if val in present else None
+				if match is not None:
+					if match not in matched:
+						matched.append(match)
+					break
+		matched_set = frozenset(matched)
+		others = [x for x in all_sets if x not in matched_set]
+		return (matched, others) if self.__is_keep else (others, matched)
+
+	def __kept_removed(self, all_sets, current=None):
+		"""
+		:param current: <str / callable / None> the current set, or a function returning it.
+		"""
+		all_sets = tuple(all_sets)
+		if not self.__needs_current:
+			current = None
+		elif callable(current):
+			current = current()
+		key = (all_sets, current)
+		res = self.__cache.get(key)
+		if res is None:
+			res = self.__evaluate(all_sets, current)
+			self.__cache[key] = res
+		return res
+
+	def kept(self, all_sets, current=None):
+		"""
+		:return: the kept UV-sets, for the shape with the given sets.
+		:rtype: list[str]
+		"""
+		return list(self.__kept_removed(all_sets, current)[0])
+
+	def removed(self, all_sets, current=None):
+		"""
+		:return: the removed UV-sets, for the shape with the given sets.
+		:rtype: list[str]
+		"""
+		return list(self.__kept_removed(all_sets, current)[1])
+
+
+_compiled_rules = dict()
+
+
+def _compiled_rule(rule, is_keep):
+	key = (rule, bool(is_keep))
+	res = _compiled_rules.get(key)
+	if res is None:
+		res = CompiledUVSetsRule(rule, is_keep)
+		_compiled_rules[key] = res
+	return res
+
+
 def _keep_all_rule():
 	return UVSetsRule((), is_keep=False)
 
@@ -304,15 +386,37 @@ class UVSets(__BaseProcessor):
 				* <tuple of strings> UV-set names
 		"""
 		shapes = self.get_shapes()
-		rule = self.__kept_sets_rule
+		if not shapes:
+			return list()
+		matcher = self.__kept_sets_rule.compiled()
 		res = list()
-		for s in shapes:
-			removed_sets = rule.removed_sets_for_object(s, False)
-			removed = uv_sets.remove(s, removed_sets, False)
-			if removed:
-				res.extend(removed)
-		return res
+		shapes_by_set = dict()
+		for (all_sets, current), group in uv_sets.group_by_layout(shapes).items():
+			removed = matcher.removed(all_sets, current)
+			if not removed:
+				continue
+			removed = tuple(sorted(set(removed)))
+			for set_nm in removed:
+				shapes_by_set.setdefault(set_nm, list()).extend(group)
+			res.extend((s, removed) for s in group)
+		uv_sets.remove_bulk(shapes_by_set)
+
+		# keep the order of the shapes:
+		order = dict((s, i) for i, s in enumerate(shapes))
+		return sorted(res, key=lambda x: order[x[0]])
 
 	def rename_first_set(self, name='map1'):
+		"""
+		Ensure the 1st UV-set has the given name, for all the shapes.
+
+		:return: <list of PyNodes> shapes with the renamed set.
+		"""
 		shapes = self.get_shapes()
-		return uv_sets.rename(shapes, 1, name, False)
\ No newline at end of file
+		if not shapes:
+			return list()
+		shapes_by_set = dict()
+		for (all_sets, current), group in uv_sets.group_by_layout(shapes).items():
+			if all_sets and all_sets[0] != name:
+				shapes_by_set.setdefault(all_sets[0], list()).extend(group)
+		renamed = set(uv_sets.rename_bulk(shapes_by_set, name))
+		return [s for s in shapes if s in renamed]
\ No newline at end of file
@@ -1,18 +1,68 @@
 __author__ = 'Lex Darlog (DRL)'
 
-from functools import partial as _part
-
+from maya import cmds as _cmds
 import pymel.core as _pm
 
 from drl_common.utils import group_items as _group_items
 
 from drl.for_maya.geo.components import uv_sets as _sets
+from drl.for_maya.geo_math import uv_weld as _weld
 from drl.for_maya.ls.convert.components import Poly as _PolyConvert
 
 from math import sqrt as __sqrt
 
 _sqrt_2 = __sqrt(2.0)
 
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
+
+def _uv_count(shape_nm):
+	return int(_cmds.polyEvaluate(shape_nm, uvcoord=True) or 0)
+
+
+def _weld_shape_with_api(shape_nm, uv_ids, distance):
+	"""
+	Weld the seams of a single history-less mesh, in the current UV-set.
+
+	:param uv_ids: <set of ints / None> UV ids to weld. None = all of them.
+	:return: <int> the number of merged UVs.
+	"""
+	sel = _om.MSelectionList()
+	sel.add(shape_nm)
+	fn = _om.MFnMesh(sel.getDagPath(0))
+	uv_set = fn.currentUVSetName()
+	us, vs = fn.getUVs(uv_set)
+	if uv_ids is not None and len(uv_ids) >= len(us):
+		uv_ids = None
+	vertex_counts, vertex_ids = fn.getVertices()
+	uv_counts, assigned = fn.getAssignedUVs(uv_set)
+
+	res = _weld.weld(
+		us, vs, vertex_counts, vertex_ids, uv_counts, assigned,
+		distance, allowed=uv_ids
+	)
+	if res is None:
+		return 0
+	fn.clearUVs(uv_set)
+	fn.setUVs(res.us, res.vs, uv_set)
+	fn.assignUVs(uv_counts, res.uv_ids, uv_set)
+	return res.merged
+
+
+def _weld_shape_with_command(uvs, distance):
+	"""
+	The fallback for meshes with construction history: Maya's own polyMergeUV.
+
+	:return: <int> the number of merged UVs.
+	"""
+	shape_nm = uvs[0].node().longName()
+	before = _uv_count(shape_nm)
+	_pm.polyMergeUV(uvs, ch=False, worldSpace=False, distance=distance)
+	return before - _uv_count(shape_nm)
+
 
 class UVs(_PolyConvert):
 	def __init__(self, items=None, selection_if_none=True, hierarchy=False, uv_set=None):
@@ -21,6 +71,7 @@ class UVs(_PolyConvert):
 			hierarchy=hierarchy
 		)
 		self.uv_set = uv_set
+		self.sewn_seams = dict()  # shape -> the number of merged UVs, after sew_extra_seams()
 
 	def switch_uv_set(self, uv_set=None):
 		"""
@@ -38,6 +89,16 @@ class UVs(_PolyConvert):
 		return _sets.set_current(self.get_geo_items(), uv_set, selection_if_none=False)
 
 	def sew_extra_seams(self, resolution=1024, pixel_fraction=0.5):
+		"""
+		Merge the UVs on seams, which are closer to each other than the given fraction of pixel.
+		Only the UVs of the same vertex are merged.
+
+		History-less meshes are processed in memory (see <geo_math.uv_weld>),
+		the others - with <polyMergeUV>.
+
+		The number of merged UVs for each shape is stored in **sewn_seams** dict.
+		"""
+		self.sewn_seams = dict()
 		self.switch_uv_set(self.uv_set)
 
 		uvs = self.to_uvs(flatten=False)
@@ -50,11 +111,17 @@ class UVs(_PolyConvert):
 		uvs_per_shape = _group_items(uvs, key_f=lambda x: x.node().name())  # list of tuples
 
 		allowed_delta = float(pixel_fraction) * _sqrt_2 * 1.001 / resolution
-		process_single_shape_uvs = _part(
-			_pm.polyMergeUV,
-			ch=False, worldSpace=False, distance=allowed_delta
-		)
-		map(process_single_shape_uvs, uvs_per_shape)
+		sewn = self.sewn_seams
+		for shape_uvs in uvs_per_shape:
+			shape_nm = shape_uvs[0].node().longName()
+			has_history = bool(_cmds.listConnections(shape_nm + '.inMesh', s=True, d=False))
+			if _om is None or has_history:
+				sewn[shape_nm] = _weld_shape_with_command(shape_uvs, allowed_delta)
+				continue
+			uv_ids = set()
+			for c in shape_uvs:
+				uv_ids.update(c.indices())
+			sewn[shape_nm] = _weld_shape_with_api(shape_nm, uv_ids, allowed_delta)
 
 		try:
 			_pm.select(prev_sl, r=1)
@@ -66,4 +133,4 @@ class UVs(_PolyConvert):
 		except:
 			pass
 
-		return self
\ No newline at end of file
+		return self
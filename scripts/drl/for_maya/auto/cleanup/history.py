@@ -1,6 +1,7 @@
 __author__ = 'Lex Darlog (DRL)'
 
 import sys as __sys
+from maya import cmds
 from pymel import core as pm
 
 from drl_py23 import (
@@ -9,6 +10,12 @@ from drl_py23 import (
 )
 
 from drl.for_maya.ls import pymel as ls
+from drl.for_maya.ls.dag_snapshot import DagSnapshot
+
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
 
 from drl.for_maya import py_node_types as _pnt
 _t_transform = _pnt.transform
@@ -25,6 +32,80 @@ def __is_deformed(node):
 	])
 
 
+def _deformed_shape_uuids():
+	"""
+	A single scan of the entire scene: UUIDs of all the shapes affected by any deformer.
+
+	It's the same check as in **__is_deformed()**, but reversed: instead of looking
+	for a deformer in each object's history, the future of each deformer is traversed
+	(pruned at DAG nodes, the same way as <listHistory -pruneDagObjects>).
+
+	:return: <set of strings / None> None if Maya API isn't available.
+	"""
+	if _om is None:
+		return None
+	deformers = cmds.ls(type='geometryFilter')
+	res = set()
+	if not deformers:
+		return res
+
+	sel = _om.MSelectionList()
+	for d in deformers:
+		sel.add(d)
+	visited = set()
+	it_cls = _om.MItDependencyGraph
+	for i in range(sel.length()):
+		it = it_cls(
+			sel.getDependNode(i), _om.MFn.kInvalid,
+			it_cls.kDownstream, it_cls.kDepthFirst, it_cls.kNodeLevel
+		)
+		while not it.isDone():
+			node = it.currentNode()
+			key = _om.MObjectHandle(node).hashCode()
+			if key in visited:
+				it.prune()
+				it.next()
+				continue
+			visited.add(key)
+			if node.hasFn(_om.MFn.kDagNode):
+				if node.hasFn(_om.MFn.kShape):
+					res.add(_om.MFnDependencyNode(node).uuid().asString())
+				it.prune()
+			it.next()
+	return res
+
+
+def __classify_deformed(objects):
+	"""
+	Split the given geo-nodes to deformed and not deformed ones, with a single scan.
+
+	:param objects: <iterable of PyNodes> transforms / shapes.
+	:return: <tuple of 2 lists> (deformed, not_deformed), preserving the order of objects.
+	"""
+	objects = list(objects)
+	deformed_uuids = _deformed_shape_uuids()
+	if deformed_uuids is None:
+		deformed = [o for o in objects if __is_deformed(o)]
+		deformed_set = set(deformed)
+		return deformed, [o for o in objects if o not in deformed_set]
+	if not deformed_uuids:
+		return list(), objects
+
+	dag = DagSnapshot()
+	deformed = list()
+	not_deformed = list()
+	for o in objects:
+		if isinstance(o, _t_shape_any):
+			uuids = [dag.uuid(o)]
+		else:
+			uuids = [dag.uuid(s) for s in dag.shapes(o)]
+		if deformed_uuids.intersection(uuids):
+			deformed.append(o)
+		else:
+			not_deformed.append(o)
+	return deformed, not_deformed
+
+
 def is_deformed(item=None, selection_if_none=True):
 	"""
 	Checks whether the given node is a deformed object.
@@ -170,12 +251,15 @@ def delete_smart(items=None, selection_if_none=True, before_deformers_only=False
 		with delete_non_deformer()
 	"""
 	objects = __to_nodes(items, selection_if_none)
-	res = list()
-	res_append = res.append
-	for o in objects:
-		if __is_deformed(o):
-			delete_non_deformer(o, False, before_deformers_only)
-			res_append(o)
-		else:
-			delete(o, False)
-	return res
\ No newline at end of file
+	if not objects:
+		return list()
+	deformed, not_deformed = __classify_deformed(objects)
+
+	if deformed:
+		pm.bakePartialHistory(deformed, **__non_deformer_kwargs(before_deformers_only))
+	if not_deformed:
+		pm.delete(not_deformed, ch=True)
+		inters = __to_intermediates(not_deformed)
+		if inters:
+			pm.delete(inters)
+	return deformed
\ No newline at end of file
@@ -1,6 +1,7 @@
 __author__ = 'Lex Darlog (DRL)'
 
 import sys as __sys
+from maya import cmds as _cmds
 from pymel import core as _pm
 
 from drl_py23 import (
@@ -9,6 +10,7 @@ from drl_py23 import (
 )
 
 from drl.for_maya.ls import pymel as _ls
+from drl.for_maya.ls.material_index import MaterialIndex as _MaterialIndex
 
 from drl.for_maya import py_node_types as _pnt
 _t_shape_poly = _pnt.shape.poly
@@ -21,19 +23,74 @@ _mat = _ls.materials
 _this = __sys.modules[__name__]
 
 
-def all_faces_to_shape(items=None, selection_if_none=True):
+def _poly_faces_to_shape(shapes, material_index):
+	"""
+	The fast path for poly-shapes.
+
+	The face->SG table is taken from the pre-built snapshot, so no per-face queries
+	are performed. Shapes which have all their faces in a single SG are grouped by this SG,
+	and then each group is re-assigned at once: a single bulk removal of faces
+	and a single bulk <sets -forceElement> per SG.
+
+	:param shapes: <list of PyNodes> poly-shapes.
+	:type material_index: _MaterialIndex
+	:return: <list of PyNodes> Shapes that was cleaned-up.
+	"""
+	by_sg = dict()  # SG -> list of (shape_path, PyNode)
+	for shape in shapes:
+		path = shape.longName()
+		sg = material_index.single_face_sg(path)
+		if sg is None:
+			continue
+		by_sg.setdefault(sg, list()).append((path, shape))
+
+	res = list()
+	for sg in sorted(by_sg.keys()):
+		group = by_sg[sg]
+		paths = [p for p, s in group]
+		faces = [
+			'{0}.f[0:{1}]'.format(p, material_index.face_count(p) - 1)
+			for p in paths
+		]
+		_cmds.sets(faces, remove=sg)
+		_cmds.sets(paths, e=True, forceElement=sg)
+		res.extend(s for p, s in group)
+	return res
+
+
+def all_faces_to_shape(items=None, selection_if_none=True, material_index=None):
 	"""
 	Reassign material to the shape itself, if it's assigned to all of the faces.
 	Currently only polygonal and NURBS faces are supported.
 
+	Poly-shapes are processed in bulk, with the face->SG table
+	taken from the material snapshot.
+
+	:param material_index:
+		<MaterialIndex / None>
+
+		A pre-built material snapshot. If not given, it's built here.
+		If any shape is re-assigned, the given snapshot is refreshed.
 	:return: <list of PyNodes> Shapes that was cleaned-up.
 	"""
 	shapes = _mat.items_to_shapes(items, selection_if_none)
+	if not shapes:
+		return list()
+
+	poly_shapes = [s for s in shapes if isinstance(s, _t_shape_poly)]
+	# NURBS-shapes still go through the accurate per-face check below:
+	shapes = [s for s in shapes if isinstance(s, _t_shape_nurbs)]
 
 	res = list()
+	if poly_shapes:
+		if material_index is None:
+			material_index = _MaterialIndex()
+		res.extend(_poly_faces_to_shape(poly_shapes, material_index))
+		if res:
+			material_index.refresh()
+
 	res_append = res.append
 
-	to_comps_mesh = lambda s: s.faces
 	to_comps_nurbs = lambda s: s.sf
 
 	def _check_known_shape(sg, shape, components, to_comps_f):
@@ -50,9 +107,6 @@ def all_faces_to_shape(items=None, selection_if_none=True):
 		_pm.sets(sg, forceElement=shape)
 		res_append(shape)
 
-	def _check_mesh(sg, shape, components):
-		_check_known_shape(sg, shape, components, to_comps_mesh)
-
 	def _check_nurbs(sg, shape, components):
 		_check_known_shape(sg, shape, components, to_comps_nurbs)
 
@@ -68,12 +122,9 @@ def all_faces_to_shape(items=None, selection_if_none=True):
 			return
 		# ... and group is not empty
 
-		if isinstance(shape, _t_shape_poly):
-			return _check_mesh(sg, shape, s_items)
-
-		if isinstance(shape, _t_shape_nurbs):
-			return _check_nurbs(sg, shape, s_items)
+		return _check_nurbs(sg, shape, s_items)
 
-	map(_check_shape, shapes)
+	for s in shapes:
+		_check_shape(s)
 
 	return res
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""
+Benchmarks measuring the overhead of the core package functions.
+
+They're intended to be run manually from Maya's script editor, i.e.:
+
+	from drl.for_maya import benchmark
+	benchmark.handle_input_overhead()
+
+**import_times()** is the exception: it runs each import in a separate mayapy process.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+from timeit import default_timer as _timer
+
+
+def _best_time(f, repeats=3):
+	"""
+	Run the function multiple times and return the best (minimal) time.
+
+	:type f: callable
+	:param repeats: how many times the function is called.
+	:return: seconds
+	:rtype: float
+	"""
+	best = None
+	for _ in range(max(1, repeats)):
+		start = _timer()
+		f()
+		spent = _timer() - start
+		if best is None or spent < best:
+			best = spent
+	return best
+
+
+def _print_report(title, timings, count):
+	print('\n{0} ({1} items):'.format(title, count))
+	for case, spent in timings:
+		per_item = spent * 1000000.0 / count if count else 0.0
+		print('\t{0:<32} {1:9.4f} s\t{2:9.2f} us/item'.format(case, spent, per_item))
+
+
+def handle_input_overhead(count=10000, repeats=3, verbose=True):
+	"""
+	Measure the overhead of **ls.pymel.default_input.handle_input()**
+	for the different kinds of input.
+
+	A temporary poly-plane with (at least) **count** faces is created,
+	and it's faces are used as the input. The plane is removed afterwards.
+
+	:param count: the number of input items.
+	:param repeats: each case is run this many times, the best time is reported.
+	:param verbose: print the report.
+	:return: <list of tuples> (case_name, seconds)
+	"""
+	from pymel import core as pm
+	from drl.for_maya.ls.pymel import default_input as _def
+
+	count = max(1, int(count))
+	width = min(count, 100)
+	height = (count + width - 1) // width
+	plane = pm.polyPlane(sx=width, sy=height, ch=False)[0]
+	try:
+		shape_nm = plane.getShape().name()
+		names = ['{0}.f[{1}]'.format(shape_nm, i) for i in range(count)]
+		py_nodes = _def.handle_input(names, False)
+		half = count // 2
+		nested = [names[:half], (names[half:], )]
+
+		cases = (
+			('strings', lambda: _def.handle_input(names, False)),
+			('strings, lazy', lambda: _def.handle_input(names, False, lazy=True)),
+			('strings, lazy, names()', lambda: _def.handle_input(names, False, lazy=True).names()),
+			('nested strings', lambda: _def.handle_input(nested, False)),
+			('PyNodes (already normalized)', lambda: _def.handle_input(py_nodes, False)),
+		)
+		timings = [
+			(case, _best_time(f, repeats)) for case, f in cases
+		]
+	finally:
+		pm.delete(plane)
+
+	if verbose:
+		_print_report('handle_input() overhead', timings, count)
+	return timings
+
+
+def uv_weld_vs_poly_merge(faces_per_side=160, resolution=1024, pixel_fraction=0.5, verbose=True):
+	"""
+	Compare the seam welder (**geo_math.uv_weld**) to Maya's <polyMergeUV>.
+
+	A temporary poly-plane is created, with each face cut into it's own UV-shell
+	(so there are 4 UVs per face, ~100k UVs with the default size).
+	Then each method welds it's own copy of the plane, and both copies are removed.
+
+	:param faces_per_side: the plane has this number of faces along each side.
+	:return: <list of tuples> (case_name, seconds)
+	"""
+	from math import sqrt
+	from maya import cmds
+	from drl.for_maya.auto.cleanup import UVs
+
+	distance = float(pixel_fraction) * sqrt(2.0) * 1.001 / resolution
+	n = max(1, int(faces_per_side))
+	plane = cmds.polyPlane(sx=n, sy=n, ch=False)[0]
+	cmds.polyMapCut(plane + '.e[*]', ch=False)
+	copy = cmds.duplicate(plane)[0]
+	try:
+		count = cmds.polyEvaluate(plane, uvcoord=True)
+		timings = [
+			('polyMergeUV', _best_time(
+				lambda: cmds.polyMergeUV(plane + '.map[*]', ch=False, distance=distance), 1
+			)),
+			('uv_weld', _best_time(
+				lambda: UVs(copy, False).sew_extra_seams(resolution, pixel_fraction), 1
+			)),
+		]
+	finally:
+		cmds.delete(plane, copy)
+
+	if verbose:
+		_print_report('UV seam welding', timings, count)
+	return timings
+
+
+_import_time_script = '''
+import importlib, sys
+from timeit import default_timer as timer
+try:
+	import maya.standalone
+	maya.standalone.initialize()
+except Exception:
+	pass
+before = len(sys.modules)
+start = timer()
+importlib.import_module({name!r})
+spent = timer() - start
+print('DRL_IMPORT_TIME {{0!r}} {{1}}'.format(spent, len(sys.modules) - before))
+'''
+
+
+def _measure_import(name, interpreter, env):
+	import subprocess
+	out = subprocess.check_output(
+		[interpreter, '-c', _import_time_script.format(name=name)],
+		env=env, stderr=subprocess.STDOUT
+	)
+	if not isinstance(out, str):
+		out = out.decode('utf-8', 'replace')
+	for line in out.splitlines():
+		if line.startswith('DRL_IMPORT_TIME '):
+			_, spent, loaded = line.split()
+			return float(spent), int(loaded)
+	raise RuntimeError('Failed to measure import of {0}:\n{1}'.format(name, out))
+
+
+def import_times(package='drl_user_buttons', submodules=None, interpreter=None, verbose=True):
+	"""
+	Measure the startup cost of each submodule of the package:
+	each one is imported in it's own fresh interpreter (after Maya standalone is initialized),
+	so the results don't depend on what's already loaded in the current session.
+
+	The package itself is measured first: with lazy submodules, it should be nearly free.
+
+	:param package: <str> the package name.
+	:param submodules: <list of str / None> the submodules to measure. All of them by default.
+	:param interpreter: the executable to run (mayapy by default).
+	:return: <list of tuples> (module_name, seconds, number_of_modules_loaded)
+	"""
+	import os
+	import importlib
+	import pkgutil
+	import drl
+	from drl.aivik.batch import default_interpreter
+
+	if interpreter is None:
+		interpreter = default_interpreter()
+	if submodules is None:
+		pkg = importlib.import_module(package)
+		submodules = sorted(
+			nm for _, nm, _ in pkgutil.iter_modules(pkg.__path__)
+			if not nm.startswith('_')
+		)
+
+	scripts_root = os.path.dirname(os.path.dirname(os.path.abspath(drl.__file__)))
+	env = dict(os.environ)
+	env['PYTHONPATH'] = os.pathsep.join(
+		filter(None, (scripts_root, env.get('PYTHONPATH')))
+	)
+
+	names = [package] + ['{0}.{1}'.format(package, nm) for nm in submodules]
+	res = list()
+	for name in names:
+		spent, loaded = _measure_import(name, interpreter, env)
+		res.append((name, spent, loaded))
+
+	if verbose:
+		print('\nImport time ({0}):'.format(interpreter))
+		for name, spent, loaded in res:
+			print('\t{0:<40} {1:9.4f} s\t{2:6d} modules'.format(name, spent, loaded))
+	return res
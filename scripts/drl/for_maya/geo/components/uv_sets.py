@@ -1,5 +1,6 @@
 __author__ = 'Lex Darlog (DRL)'
 
+from maya import cmds
 from pymel import core as pm
 from drl.for_maya.ls import pymel as ls
 from drl_common import errors as err
@@ -16,6 +17,11 @@ _t_shape_any = _pnt.shape.any
 _t_shape_poly = _pnt.shape.poly
 _t_int_or_str = tuple([int] + list(_str_t))
 
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
 
 class MultipleShapesError(RuntimeError):
 	def __init__(self, obj=None, formatted_message=None):
@@ -414,3 +420,143 @@ def filter_by_set(
 						yield shape
 
 	return list(gen_kept(items))
+
+
+# -----------------------------------------------------------------------------
+# bulk operations on many shapes
+
+
+def _shape_path(shape):
+	if isinstance(shape, _str_t):
+		return shape
+	return shape.longName()
+
+
+_mel_chunk_size = 1000
+
+
+def _mel_per_shape(shapes, command_f):
+	"""
+	Run a MEL command for each of the shapes, with a single <mel.eval> per up to a thousand shapes
+	(the same way as <auto.cleanup> does bulk edits). So it's a handful of calls even for
+	thousands of shapes, and it's still a regular undoable edit.
+
+	:param command_f: <callable> takes the shape's full path, returns a single MEL command.
+	"""
+	from maya import mel
+	paths = [_shape_path(s) for s in shapes]
+	for i in range(0, len(paths), _mel_chunk_size):
+		mel.eval(''.join(command_f(p) for p in paths[i:i + _mel_chunk_size]))
+
+
+def read_layouts(shapes):
+	"""
+	Read UV-sets of many poly-shapes at once (via Maya API, if it's available).
+
+	:param shapes: <list of PyNodes / strings> mesh shapes.
+	:return:
+		<list of tuples> (all_sets, current_set) for each shape, in the same order.
+		All sets are given as a tuple of names.
+		Even if the same shape is given multiple times, there's an item for each of them.
+	"""
+	paths = [_shape_path(s) for s in shapes]
+	unique = utils.remove_duplicates(paths)
+
+	def _read_cmds(p):
+		all_sets = cmds.polyUVSet(p, q=True, allUVSets=True) or []
+		current = cmds.polyUVSet(p, q=True, currentUVSet=True) or [None]
+		return tuple(all_sets), current[0]
+
+	def _read_fn(fn):
+		return tuple(fn.getUVSetNames()), fn.currentUVSetName()
+
+	layouts = None
+	if _om is not None:
+		# a single selection list for all the (unique) paths:
+		sel = _om.MSelectionList()
+		for p in unique:
+			sel.add(p)
+		if sel.length() == len(unique):
+			layouts = dict(
+				(p, _read_fn(_om.MFnMesh(sel.getDagPath(i))))
+				for i, p in enumerate(unique)
+			)
+	if layouts is None:
+		# different strings pointing to the same node are merged in a selection list,
+		# so the order can't be trusted - read each one on it's own:
+		layouts = dict((p, _read_cmds(p)) for p in unique)
+	return [layouts[p] for p in paths]
+
+
+def group_by_layout(shapes, layouts=None):
+	"""
+	Group shapes by their UV-sets layout (the sets and the current set).
+
+	:return: <dict> (all_sets, current_set) -> list of shapes, preserving the order.
+	"""
+	if layouts is None:
+		layouts = read_layouts(shapes)
+	res = dict()
+	for s, layout in zip(shapes, layouts):
+		res.setdefault(layout, list()).append(s)
+	return res
+
+
+def rename_bulk(shapes_by_set, new_name='map1'):
+	"""
+	Rename UV-sets on many shapes: a single MEL evaluation per source set name
+	(and per thousand shapes).
+
+	:param shapes_by_set: <dict> source set name -> list of shapes.
+	:return: <list> all the shapes with a renamed set.
+	"""
+	res = list()
+	for src_set, shapes in shapes_by_set.items():
+		if not shapes or src_set == new_name:
+			continue
+		_mel_per_shape(
+			shapes,
+			lambda p: 'polyUVSet -rename -uvSet "{0}" -newUVSet "{1}" "{2}";'.format(
+				src_set, new_name, p
+			)
+		)
+		res.extend(shapes)
+	return res
+
+
+def remove_bulk(shapes_by_set):
+	"""
+	Remove UV-sets from many shapes: a single MEL evaluation per set name
+	(and per thousand shapes).
+
+	:param shapes_by_set: <dict> set name -> list of shapes.
+	"""
+	for set_nm, shapes in shapes_by_set.items():
+		if not shapes:
+			continue
+		_mel_per_shape(
+			shapes,
+			lambda p: 'polyUVSet -delete -uvSet "{0}" "{1}";'.format(set_nm, p)
+		)
+
+
+def copy_bulk(shapes, src_set, dst_set):
+	"""
+	Copy UVs from one set to another on many shapes (see **rename_bulk()**).
+	"""
+	_mel_per_shape(
+		shapes,
+		lambda p: 'polyCopyUV -uvSetNameInput "{0}" -uvSetName "{1}" "{2}";'.format(
+			src_set, dst_set, p
+		)
+	)
+
+
+def set_current_bulk(shapes, uv_set):
+	"""
+	Make the given UV-set current on many shapes (see **rename_bulk()**).
+	"""
+	_mel_per_shape(
+		shapes,
+		lambda p: 'polyUVSet -currentUVSet -uvSet "{0}" "{1}";'.format(uv_set, p)
+	)
@@ -8,6 +8,8 @@ from drl_py23 import (
 	str_h as _str_h,
 )
 from drl.for_maya.ls.convert import components as comp
+from drl.for_maya.geo_math import uv_shells as _shells
+from drl.for_maya.geo_math import uv_transform as _uv_tr
 from drl.for_maya import ui
 
 from drl.for_maya.geo.components import uv_sets
@@ -17,10 +19,16 @@ def _perform_with_mesh_uvs(
 	objs=None, uv_set=None, selection_if_none=True,
 	modify_u_f=None, modify_v_f=None,
 	do_u_f=None, do_v_f=None,
+	vectorized=False,
 	**kwargs
 ):
 	"""
 	Common function for performing some UV modifications for the given mesh objects (not uv components).
+
+	:param vectorized:
+		When True, modify_u_f/modify_v_f get the whole array of coordinates at once
+		(<numpy.ndarray> if NumPy is available, list otherwise) and return the new array.
+		Otherwise, they're called for each coordinate.
 	"""
 	meshes = [
 		x for x in ls.to_shapes(objs, selection_if_none)
@@ -45,10 +53,16 @@ def _perform_with_mesh_uvs(
 		)
 		new_u, new_v = m.getUVs(cur_set)
 
-		if do_u:
-			new_u = [modify_u_f(src, **kwargs) for src in new_u]
-		if do_v:
-			new_v = [modify_v_f(src, **kwargs) for src in new_v]
+		if vectorized:
+			if do_u:
+				new_u = _uv_tr.to_list(modify_u_f(_uv_tr.as_array(new_u), **kwargs))
+			if do_v:
+				new_v = _uv_tr.to_list(modify_v_f(_uv_tr.as_array(new_v), **kwargs))
+		else:
+			if do_u:
+				new_u = [modify_u_f(src, **kwargs) for src in new_u]
+			if do_v:
+				new_v = [modify_v_f(src, **kwargs) for src in new_v]
 
 		m.setUVs(new_u, new_v, cur_set)
 
@@ -62,29 +76,85 @@ def gamma_uvs(objs=None, uv_set=None, u=None, v=None, selection_if_none=True):
 	def do_v(**kwargs):
 		return not(v is None or v == 1.0)
 
-	def _modify_comp(x, u_or_v):
-		if u_or_v == 0.0 or x == 0.0:
-			return 0.0
-
-		if x < 0.0:
-			return -((-x) ** u_or_v)
-
-		return x ** u_or_v
-
-	def modify_u(x, **kwargs):
-		return _modify_comp(x, u)
+	def modify_u(values, **kwargs):
+		return _uv_tr.gamma(values, u)
 
-	def modify_v(x, **kwargs):
-		return _modify_comp(x, v)
+	def modify_v(values, **kwargs):
+		return _uv_tr.gamma(values, v)
 
 	return _perform_with_mesh_uvs(
 		objs, uv_set, selection_if_none,
 		modify_u, modify_v,
 		do_u, do_v,
+		vectorized=True,
 		u=u, v=v
 	)
 
 
+def _mesh_uv_sets(mesh, uv_set):
+	"""
+	Names of the mesh's UV-sets to process, in the form accepted by **transform_uvs()**.
+	Missing sets are skipped.
+	"""
+	if uv_set is None or (isinstance(uv_set, int) and not isinstance(uv_set, bool) and uv_set == 0):
+		return [mesh.getCurrentUVSetName()]
+	all_sets = uv_sets.get_object_sets(mesh)
+	if uv_set is True:
+		return list(all_sets)
+	if not isinstance(uv_set, (list, tuple)):
+		uv_set = [uv_set]
+	res = list()
+	for s in uv_set:
+		try:
+			nm = uv_sets.get_set_name(mesh, s, all_sets)
+		except uv_sets.NoSuchUVSetError:
+			continue
+		if nm not in res:
+			res.append(nm)
+	return res
+
+
+def transform_uvs(transforms, objs=None, uv_set=None, selection_if_none=True):
+	"""
+	Apply vectorized UV-transforms (affine, gamma, remap curves - see <geo_math.uv_transform>)
+	to many meshes and UV-sets in one call.
+
+	Each UV-set is read and written once, no matter how many transforms are applied.
+
+	:param transforms: <UVTransformBase / list of them> applied in the given order.
+	:param objs: objects to process.
+	:param uv_set:
+		The UV-sets to process:
+			* None/0 - current UV-set of each mesh;
+			* <str> - name;
+			* <int> - 1-based UV-set number;
+			* <list> of those - multiple sets (missing ones are skipped);
+			* True - all the UV-sets.
+	:param selection_if_none: <bool> whether to use current selection if objs is None.
+	:return: <list of tuples> (mesh, uv_set_name) that were modified.
+	"""
+	if isinstance(transforms, (list, tuple)):
+		transforms = _uv_tr.chain(*transforms)
+	err.WrongTypeError(transforms, _uv_tr.UVTransformBase, 'transforms').raise_if_needed()
+	if transforms.is_identity():
+		return []
+
+	meshes = [
+		x for x in ls.to_shapes(objs, selection_if_none)
+		if isinstance(x, pm.nodetypes.Mesh)
+	]
+	res = list()
+	for m in meshes:
+		for set_nm in _mesh_uv_sets(m, uv_set):
+			us, vs = m.getUVs(set_nm)
+			if not us:
+				continue
+			new_us, new_vs = _uv_tr.apply(transforms, us, vs)
+			m.setUVs(new_us, new_vs, set_nm)
+			res.append((m, set_nm))
+	return res
+
+
 def _get_bbox(uvs):
 	"""
 	Bounding box of the given UVs. Requires UVs list to be flattened.
@@ -92,7 +162,9 @@ def _get_bbox(uvs):
 	:param uvs: WARNING! it has to be a flattened list of pyMel's UVs.
 	:return: (min_u, min_v), (max_u, max_v)
 	"""
-	all_us, all_vs = zip(*[pm.polyEditUV(uv, q=1) for uv in uvs])
+	coords = pm.polyEditUV(uvs, q=1)  # single query: [u0, v0, u1, v1, ...]
+	all_us = coords[0::2]
+	all_vs = coords[1::2]
 	return (min(all_us), min(all_vs)), (max(all_us), max(all_vs))
 
 
@@ -109,6 +181,17 @@ def bounding_box(items=None, selection_if_none=True):
 	return _get_bbox(uvs)
 
 
+def _range_arg(val):
+	"""
+	Ensures the given range argument is int.
+	"""
+	if isinstance(val, int):
+		return val
+	if isinstance(val, float):
+		return int(round(val))
+	raise err.WrongTypeError(val, var_name='one of range boundaries', types=(int, float))
+
+
 def _move_uvs_to_range(uvs, min_u=-1, min_v=-1, max_u=2, max_v=2, round_mode=2):
 	"""
 	Low-level function, transforming the given UVs to a specified UV range.
@@ -129,50 +212,19 @@ def _move_uvs_to_range(uvs, min_u=-1, min_v=-1, max_u=2, max_v=2, round_mode=2):
 	\n When UVs fit in the range, proper round (to nearest) is used anyway.
 	:return: <list> given UVs if they were moved, empty list otherwise.
 	"""
-	import math
-
 	if not uvs:
 		return []
 	uvs_flat = pm.ls(uvs, fl=1)
 	if not uvs_flat:
 		return []
 
-	def _test_arg(val):
-		"""
-		Ensures the given range argument is int.
-		"""
-		if isinstance(val, int):
-			return val
-		if isinstance(val, float):
-			return int(round(val))
-		raise err.WrongTypeError(val, var_name='one of range boundaries', types=(int, float))
-
-	min_u, min_v, max_u, max_v = [_test_arg(x) for x in (min_u, min_v, max_u, max_v)]
+	min_u, min_v, max_u, max_v = [_range_arg(x) for x in (min_u, min_v, max_u, max_v)]
 
 	# the actual boundaries of the given UVs:
 	uvs_min, uvs_max = _get_bbox(uvs_flat)
 
-	rounding_f = [math.floor, math.ceil, round][round_mode]
-
-	def _calc_single_offset(uvs_mi, uvs_ma, range_mi, range_ma):
-		"""
-		Calculates the offset for a single axis (U/V). Returns an int value.
-		"""
-		if uvs_mi > range_mi and uvs_ma < range_ma:
-			return 0
-
-		uvs_min_square = int(uvs_mi)
-		uvs_max_square = int(math.ceil(uvs_ma))
-		uvs_len_square = uvs_max_square - uvs_min_square
-		range_len_square = range_ma - range_mi
-		cur_round_f = round if uvs_len_square <= range_len_square else rounding_f
-
-		uvs_center = (uvs_mi + uvs_ma) * 0.5
-		range_center = (range_mi + range_ma) * 0.5
-		return int(cur_round_f(range_center - uvs_center))
-
 	offsets = [
-		_calc_single_offset(u_mi, u_ma, r_mi, r_ma)
+		_shells.range_offset(u_mi, u_ma, r_mi, r_ma, round_mode)
 		for u_mi, u_ma, r_mi, r_ma
 		in zip(uvs_min, uvs_max, (min_u, min_v), (max_u, max_v))
 	]
@@ -184,24 +236,82 @@ def _move_uvs_to_range(uvs, min_u=-1, min_v=-1, max_u=2, max_v=2, round_mode=2):
 	return uvs
 
 
+def _uv_ids_per_mesh(items, selection_if_none=True):
+	"""
+	Convert the given items to UVs (of the current UV-set) and group their ids by mesh.
+
+	:return: <list of tuples> (mesh, set of UV ids), meshes in the order they're met.
+	"""
+	res = list()
+	per_mesh = dict()
+	for c in comp.Poly(items, selection_if_none).to_uvs(flatten=False):
+		m = c.node()
+		if m not in per_mesh:
+			per_mesh[m] = set()
+			res.append((m, per_mesh[m]))
+		per_mesh[m].update(c.indices())
+	return res
+
+
+def _offset_mesh_shells(mesh, uv_ids, offsets_f):
+	"""
+	The batch shell engine, for a single mesh in it's current UV-set:
+		* UVs and shell ids are read once;
+		* bounding boxes are calculated for all the shells containing any of the given UVs;
+		* offsets_f calculates all the offsets from these bounds (see <geo_math.uv_shells>);
+		* all the moved UVs are written back with a single setUVs.
+
+	:param uv_ids: <set of ints> UVs defining which shells to process.
+	:param offsets_f: <function> list of shell bounds -> list of (offset_u, offset_v).
+	:return: <list> collapsed UVs of the moved shells.
+	"""
+	uv_set = mesh.getCurrentUVSetName()
+	us, vs = mesh.getUVs(uv_set)
+	shell_ids, num_shells = mesh.getUvShellsIds(uv_set)
+	shells = set(shell_ids[i] for i in uv_ids if i < len(shell_ids))
+	if not shells:
+		return []
+
+	bounds = _shells.shell_bounds(us, vs, shell_ids, num_shells, shells)
+	res = _shells.offset_uvs(us, vs, shell_ids, offsets_f(bounds))
+	if res is None:
+		return []
+	mesh.setUVs(res.us, res.vs, uv_set)
+	return comp.components_from_indices(mesh, res.moved_uvs, 'map')
+
+
+def _offset_shells(items, uv_set, selection_if_none, offsets_f):
+	# switch to the given UV-set if it's specified:
+	uv_sets.set_current(items, uv_set, selection_if_none)
+
+	def _do_func(mesh_uvs, i, res):
+		res.extend(_offset_mesh_shells(mesh_uvs[0], mesh_uvs[1], offsets_f))
+
+	return ui.ProgressWindow.do_with_each(
+		_uv_ids_per_mesh(items, selection_if_none), _do_func,
+		'Move UV-shells', 'Mesh: {0} / {1}'
+	)
+
 
 def move_shells_to_range(
 	items=None,
 	min_u=-1, min_v=-1, max_u=2, max_v=2, round_mode=2,
 	uv_set=None, selection_if_none=True
 ):
-	# switch to the given UV-set if it's specified:
-	uv_sets.set_current(items, uv_set, selection_if_none)
+	"""
+	Move each UV-shell at integer steps, so that it's within the given range
+	(see **_move_uvs_to_range()** for arguments).
 
-	shells = comp.uv_shells(items, selection_if_none, collapse=True)
+	All the shells of a mesh are processed at once.
 
-	def _do_func(uvs, i, res):
-		# assert isinstance(res, list)
-		res.extend(_move_uvs_to_range(uvs, min_u, min_v, max_u, max_v, round_mode))
+	:return: <list> of UVs that were moved.
+	"""
+	min_u, min_v, max_u, max_v = [_range_arg(x) for x in (min_u, min_v, max_u, max_v)]
 
-	return ui.ProgressWindow.do_with_each(
-		shells, _do_func, 'Move UV-shells', 'Shell: {0} / {1}'
-	)
+	def offsets_f(bounds):
+		return _shells.range_offsets(bounds, min_u, min_v, max_u, max_v, round_mode)
+
+	return _offset_shells(items, uv_set, selection_if_none, offsets_f)
 
 
 def _snap_uvs_bbox_to_zero(uvs):
@@ -224,15 +334,4 @@ def snap_shells_to_zero(items=None, uv_set=None, selection_if_none=True):
 	:return: <list> of UVs that were moved.
 	"""
 
-	# switch to the given UV-set if it's specified:
-	uv_sets.set_current(items, uv_set, selection_if_none)
-
-	shells = comp.uv_shells(items, selection_if_none, collapse=True)
-
-	def _do_func(uvs, i, res):
-		# assert isinstance(res, list)
-		res.extend(_snap_uvs_bbox_to_zero(uvs))
-
-	return ui.ProgressWindow.do_with_each(
-		shells, _do_func, 'Move UV-shells', 'Shell: {0} / {1}'
-	)
+	return _offset_shells(items, uv_set, selection_if_none, _shells.zero_offsets)
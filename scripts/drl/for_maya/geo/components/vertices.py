@@ -5,10 +5,10 @@ from pymel import core as pm
 
 from drl.for_maya.ls import pymel as ls
 from drl.for_maya.ls.convert import components as comp
+from drl.for_maya.geo_math import nearest as _nearest
 from drl.for_maya.ui import ProgressWindow
 
 
-
 def snap_point_to_point(
 	items=None, selection_if_none=True,
 	max_distance=None, min_distance=0.01,
@@ -20,6 +20,9 @@ def snap_point_to_point(
 	Select the components you want to snap first,
 	and lastly, select the mesh you want to snap them to.
 
+	The closest points are found with a spatial grid (see <geo_math.nearest>),
+	and each mesh gets all the new positions at once.
+
 	:param items: items (objects/components) to snap. The same order expected.
 	:param selection_if_none: whether to use selection when no items given.
 	:param max_distance: When provided, points will snap only if distance below this range.
@@ -43,33 +46,46 @@ def snap_point_to_point(
 	src = ls.to_shapes(src, False, exact_type=pm.nt.Mesh)[0]
 	assert isinstance(src, pm.nt.Mesh)
 	src_pos = src.getPoints(space=transfer_space)
-
-	def find_closest(pt):
-		closest = src_pos[0]
-		closest_len = pt.distanceTo(closest)
-		for cur in src_pos[1:]:
-			cur_len = pt.distanceTo(cur)
-			if cur_len < closest_len:
-				closest_len = cur_len
-				closest = cur
-		return closest, closest_len
+	src_xyz = [(p.x, p.y, p.z) for p in src_pos]
 
 	def do_snap(distance):
 		return (
+			distance is not None and
 			min_distance < distance and (max_distance is None or distance < max_distance)
 		)
 
 	res = []
 
-	def snap_item(mesh, base_msg):
-		vtxs = comp.Poly(mesh, False).to_vertices(flatten=True)
-		ProgressWindow.message = base_msg + '\t\tverts: %s' % len(vtxs)
-		for vrt in vtxs:
-			p = vrt.getPosition(space=transfer_space)
-			snap_to_p, dist = find_closest(p)
+	def snap_shape(shape, indices):
+		points = shape.getPoints(space=transfer_space)
+		closest, distances = _nearest.closest_points(
+			[(points[i].x, points[i].y, points[i].z) for i in indices],
+			src_xyz, max_distance
+		)
+		snapped = list()
+		for i, snap_to, dist in zip(indices, closest, distances):
 			if do_snap(dist):
-				vrt.setPosition(snap_to_p, space=transfer_space)
-				res.append(vrt)
+				points[i] = src_pos[snap_to]
+				snapped.append(i)
+		if snapped:
+			shape.setPoints(points, space=transfer_space)
+			res.extend(comp.components_from_indices(shape, snapped, 'vtx', flatten=True))
+		return len(snapped)
+
+	def snap_item(mesh, base_msg):
+		vtxs = comp.Poly(mesh, False).to_vertices(flatten=False)
+		per_shape = dict()
+		shapes = list()
+		for v in vtxs:
+			shape = v.node()
+			if shape not in per_shape:
+				per_shape[shape] = set()
+				shapes.append(shape)
+			per_shape[shape].update(v.indices())
+		num_verts = sum(len(x) for x in per_shape.values())
+		ProgressWindow.message = base_msg + '\t\tverts: %s' % num_verts
+		for shape in shapes:
+			snap_shape(shape, sorted(per_shape[shape]))
 
 	# for i in items:
 	# 	snap_item(i)
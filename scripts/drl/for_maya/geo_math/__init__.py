@@ -0,0 +1,7 @@
+"""
+Geometry math working on plain arrays (lists of floats/ints), as they're returned
+by Maya API's <MFnMesh> methods.
+
+Nothing here depends on Maya, so the algorithms can be run (and tested) headless.
+"""
+__author__ = 'Lex Darlog (DRL)'
@@ -0,0 +1,178 @@
+"""
+Vertex colors to UVs conversion (the math behind <auto.BakedToUVs>).
+
+For each UV, the colors of all the face-vertices it's assigned to are averaged
+(optionally, in another color space, like sRGB), the face-vertices get this
+average color, and the color itself is projected to UV space with a 3x3 matrix.
+
+The input is the mesh data in the form returned by Maya API (<MFnMesh>):
+	* **vertex_counts**, **vertex_ids** - polygon vertices (from <getVertices()>).
+	* **uv_counts**, **uv_ids** - UVs assigned to each polygon (from <getAssignedUVs()>).
+	* **colors** - RGB of each face-vertex, in the same face-vertex order (from <getFaceVertexColors()>).
+
+Face-vertices are referred to by their index in this face-vertex order.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+try:
+	import numpy as _np
+except ImportError:
+	_np = None
+
+
+def face_vertex_uvs(vertex_counts, uv_counts, uv_ids):
+	"""
+	UV id for each face-vertex. Faces which don't have a UV for each vertex get -1.
+
+	:rtype: list[int]
+	"""
+	res = list()
+	extend = res.extend
+	ui = 0
+	for nv, nuv in zip(vertex_counts, uv_counts):
+		if nuv == nv:
+			extend(uv_ids[ui:ui + nuv])
+		else:
+			extend([-1] * nv)
+		ui += nuv
+	return res
+
+
+def face_vertex_ids(vertex_counts, vertex_ids, face_vertices):
+	"""
+	Face and vertex ids for the given face-vertex indices,
+	as expected by <MFnMesh.setFaceVertexColors()>.
+
+	:return: <tuple of lists> (face_ids, vertex_ids)
+	"""
+	faces = list()
+	extend = faces.extend
+	for f, nv in enumerate(vertex_counts):
+		extend([f] * nv)
+	return [faces[i] for i in face_vertices], [vertex_ids[i] for i in face_vertices]
+
+
+class ColorToUVResult(object):
+	"""
+	The new data for the mesh.
+
+	UVs are given for all the UV ids, the ones which aren't used by any face-vertex keep their values.
+	Colors are given only for face-vertices having UVs, in the original color space.
+	"""
+	def __init__(self, us, vs, face_vertices, colors):
+		super(ColorToUVResult, self).__init__()
+		self.us = us  # type: list[float]
+		self.vs = vs  # type: list[float]
+		self.face_vertices = face_vertices  # type: list[int]
+		self.colors = colors  # type: list[tuple[float, float, float]]
+
+
+def _apply_each(f, colors):
+	return [tuple(f(c)) for c in colors]
+
+
+def _transfer_python(fv_uvs, colors, us, vs, mtx, to_space_f, from_space_f):
+	fvs = [i for i, uv in enumerate(fv_uvs) if uv >= 0]
+	fv_colors = [colors[i] for i in fvs]
+	if to_space_f is not None:
+		fv_colors = _apply_each(to_space_f, fv_colors)
+
+	sums = dict()
+	for i, c in zip(fvs, fv_colors):
+		uv = fv_uvs[i]
+		s = sums.get(uv)
+		if s is None:
+			sums[uv] = [c[0], c[1], c[2], 1]
+		else:
+			s[0] += c[0]
+			s[1] += c[1]
+			s[2] += c[2]
+			s[3] += 1
+
+	us = list(us)
+	vs = list(vs)
+	(m00, m01, m02), (m10, m11, m12) = mtx[0][:3], mtx[1][:3]
+	uv_colors = dict()
+	for uv, (r, g, b, n) in sums.items():
+		r /= n
+		g /= n
+		b /= n
+		us[uv] = m00 * r + m01 * g + m02 * b
+		vs[uv] = m10 * r + m11 * g + m12 * b
+		uv_colors[uv] = (r, g, b)
+
+	if from_space_f is not None:
+		keys = list(uv_colors.keys())
+		uv_colors = dict(zip(keys, _apply_each(from_space_f, [uv_colors[k] for k in keys])))
+	return ColorToUVResult(us, vs, fvs, [uv_colors[fv_uvs[i]] for i in fvs])
+
+
+def _transfer_numpy(fv_uvs, colors, us, vs, mtx, to_space_f, from_space_f):
+	fv_uvs = _np.asarray(fv_uvs, dtype=_np.int64)
+	fvs = _np.nonzero(fv_uvs >= 0)[0]
+	uv_of_fv = fv_uvs[fvs]
+	if to_space_f is not None:
+		fv_colors = _np.asarray(
+			_apply_each(to_space_f, [colors[i] for i in fvs.tolist()]), dtype=_np.float64
+		).reshape(-1, 3)
+	else:
+		fv_colors = _np.asarray(colors, dtype=_np.float64).reshape(-1, 3)[fvs]
+
+	num_uvs = len(us)
+	counts = _np.bincount(uv_of_fv, minlength=num_uvs)
+	used = _np.nonzero(counts)[0]
+	avg = _np.empty((len(used), 3))
+	for k in range(3):
+		avg[:, k] = _np.bincount(uv_of_fv, weights=fv_colors[:, k], minlength=num_uvs)[used]
+	avg /= counts[used][:, None]
+
+	projected = avg.dot(_np.asarray([row[:3] for row in mtx[:2]], dtype=_np.float64).T)
+	new_us = _np.asarray(us, dtype=_np.float64).copy()
+	new_vs = _np.asarray(vs, dtype=_np.float64).copy()
+	new_us[used] = projected[:, 0]
+	new_vs[used] = projected[:, 1]
+
+	if from_space_f is not None:
+		avg = _np.asarray(_apply_each(from_space_f, avg.tolist()), dtype=_np.float64).reshape(-1, 3)
+	uv_colors = _np.zeros((num_uvs, 3))
+	uv_colors[used] = avg
+	return ColorToUVResult(
+		new_us.tolist(), new_vs.tolist(), fvs.tolist(),
+		[tuple(c) for c in uv_colors[uv_of_fv].tolist()]
+	)
+
+
+def transfer(
+	vertex_counts, uv_counts, uv_ids, colors, us, vs, mtx,
+	to_space_f=None, from_space_f=None, use_numpy=True
+):
+	"""
+	Average face-vertex colors per UV and project them to UV space.
+
+	:param colors: <sequence of (r, g, b)> face-vertex colors.
+	:param us: <sequence of floats> the current U coordinates, indexed by UV id.
+	:param vs: <sequence of floats> the current V coordinates.
+	:param mtx:
+		<3x3 nested sequence> RGB-to-UV matrix, by rows.
+		A color is treated as a column vector: ``uv = mtx * rgb``. Only the first two rows are used.
+	:param to_space_f:
+		<callable / None> converts a single (r, g, b) color to the color space
+		where averaging and projection are done (e.g., linear to sRGB).
+	:param from_space_f: <callable / None> the inverse of **to_space_f**.
+	:param use_numpy: <bool> use vectorized math, if NumPy is available.
+	:rtype: ColorToUVResult
+	"""
+	fv_uvs = face_vertex_uvs(vertex_counts, uv_counts, uv_ids)
+	if len(fv_uvs) != len(colors):
+		raise ValueError(
+			'Face-vertex colors number ({0}) doesn\'t match the mesh ({1}).'.format(
+				len(colors), len(fv_uvs)
+			)
+		)
+	if len(us) != len(vs):
+		raise ValueError('Different number of U and V coordinates.')
+	if fv_uvs and max(fv_uvs) >= len(us):
+		raise ValueError('UV ids are out of range.')
+
+	f = _transfer_numpy if (use_numpy and _np is not None and fv_uvs) else _transfer_python
+	return f(fv_uvs, colors, us, vs, mtx, to_space_f, from_space_f)
@@ -0,0 +1,388 @@
+"""
+Nearest-point search in 3D.
+
+When SciPy is available, it's k-d tree (<scipy.spatial.cKDTree>) does the search.
+
+Otherwise, the target points are put to a uniform grid (spatial hash), so each query checks
+only the points in the cells around it, instead of all the targets.
+The cell size is derived from the actual occupancy of the cells, not just from the bounding box:
+it's shrunk until a typical point shares it's cell with only a few others,
+so clustered targets (or a few distant outliers) don't end up all in a single cell.
+
+When NumPy is available, the queries are processed all at once: for each of
+the 27 cells around the query point, the candidates are compared as arrays.
+Queries for which the closest point could be farther than a single cell
+are then resolved one by one, with an expanding search in the pure-python grid
+(which is also used as-is when there's no NumPy).
+
+Points are given as sequences of (x, y, z) triplets.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+from math import (
+	floor as _floor,
+	sqrt as _sqrt,
+)
+
+try:
+	import numpy as _np
+except ImportError:
+	_np = None
+
+try:
+	from scipy.spatial import cKDTree as _cKDTree
+except ImportError:
+	_cKDTree = None
+
+_inf = float('inf')
+
+# the desired average number of target points per (non-empty) cell:
+_points_per_cell = 2.0
+# the cell is shrunk while a point shares it with more points than this, on average:
+_max_occupancy = 16.0
+_max_refine_steps = 12
+# the grid never has more cells than this along any axis (keeps cell keys within int64):
+_max_cells_per_axis = 1 << 20
+
+
+def _bounds(points):
+	lo = list(points[0][:3])
+	hi = list(lo)
+	for p in points:
+		for k in range(3):
+			v = p[k]
+			if v < lo[k]:
+				lo[k] = v
+			elif v > hi[k]:
+				hi[k] = v
+	return lo, hi
+
+
+def auto_cell_size(lo, hi, count):
+	"""
+	Pick the grid cell size for the given bounding box and number of points,
+	assuming they are distributed evenly over the non-flat dimensions.
+	"""
+	extents = [h - l for l, h in zip(lo, hi)]
+	size = max(extents)
+	if size <= 0.0 or count < 2:
+		return 1.0
+	eps = size * 1e-6
+	used = [e for e in extents if e > eps]
+	volume = 1.0
+	for e in used:
+		volume *= e
+	return (volume * _points_per_cell / count) ** (1.0 / len(used))
+
+
+def _cell_counts_python(points, lo, cell_size):
+	inv = 1.0 / cell_size
+	counts = dict()
+	for p in points:
+		key = (
+			int(_floor((p[0] - lo[0]) * inv)),
+			int(_floor((p[1] - lo[1]) * inv)),
+			int(_floor((p[2] - lo[2]) * inv)),
+		)
+		counts[key] = counts.get(key, 0) + 1
+	return list(counts.values())
+
+
+def _cell_counts_numpy(points, lo, cell_size):
+	cells = _np.floor((points - lo) * (1.0 / cell_size)).astype(_np.int64)
+	dims = cells.max(axis=0) + 1
+	keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+	return _np.unique(keys, return_counts=True)[1]
+
+
+def occupancy_cell_size(points, cell_size=None):
+	"""
+	Pick the grid cell size by the actual distribution of the points.
+
+	Starting from the bounding-box estimate (**auto_cell_size()**), the cell is shrunk
+	while the average occupancy of a point's cell (sum of squared counts / number of points)
+	is too high. I.e., for clustered points the cell matches the spacing within clusters.
+
+	:param points: <sequence of (x, y, z) / numpy array of shape (N, 3)>
+	:param cell_size: <float / None> the initial size. The bounding-box estimate if not given.
+	:rtype: float
+	"""
+	is_np = _np is not None and isinstance(points, _np.ndarray)
+	if is_np:
+		lo = points.min(axis=0).tolist()
+		hi = points.max(axis=0).tolist()
+	else:
+		lo, hi = _bounds(points)
+	count = len(points)
+	if cell_size is None:
+		cell_size = auto_cell_size(lo, hi, count)
+	size = max(h - l for l, h in zip(lo, hi))
+	if size <= 0.0 or count < 2:
+		return cell_size
+	eps = size * 1e-6
+	num_dims = max(1, len([1 for l, h in zip(lo, hi) if h - l > eps]))
+	min_cell_size = size / _max_cells_per_axis
+	cell_size = max(cell_size, min_cell_size)
+
+	for _ in range(_max_refine_steps):
+		if is_np:
+			counts = _cell_counts_numpy(points, points.min(axis=0), cell_size).astype(_np.float64)
+			occupancy = float((counts * counts).sum()) / count
+		else:
+			occupancy = float(sum(c * c for c in _cell_counts_python(points, lo, cell_size))) / count
+		if occupancy <= _max_occupancy:
+			break
+		new_size = max(
+			cell_size * (_points_per_cell / occupancy) ** (1.0 / num_dims),
+			min_cell_size
+		)
+		if new_size >= cell_size:
+			break
+		cell_size = new_size
+	return cell_size
+
+
+class PointGrid(object):
+	"""
+	Pure-python uniform grid over the target points.
+	"""
+	def __init__(self, points, cell_size=None):
+		super(PointGrid, self).__init__()
+		self.points = [tuple(p[:3]) for p in points]
+		if not self.points:
+			raise ValueError('No target points given.')
+		lo, hi = _bounds(self.points)
+		if cell_size is None:
+			cell_size = occupancy_cell_size(self.points)
+		if not cell_size > 0.0:
+			raise ValueError('Wrong grid cell size: {0}'.format(cell_size))
+		self.cell_size = float(cell_size)
+		self.__inv_cell = 1.0 / self.cell_size
+		self.lo = tuple(lo)
+
+		cells = dict()
+		for i, p in enumerate(self.points):
+			key = self._key(p)
+			if key in cells:
+				cells[key].append(i)
+			else:
+				cells[key] = [i]
+		self.cells = cells
+		keys = list(cells.keys())
+		self.key_lo = tuple(min(k[d] for k in keys) for d in range(3))
+		self.key_hi = tuple(max(k[d] for k in keys) for d in range(3))
+
+	def _key(self, p):
+		inv = self.__inv_cell
+		lo = self.lo
+		return (
+			int(_floor((p[0] - lo[0]) * inv)),
+			int(_floor((p[1] - lo[1]) * inv)),
+			int(_floor((p[2] - lo[2]) * inv)),
+		)
+
+	def __ring(self, center, r):
+		"""Keys of the existing cells at exactly the given Chebyshev distance from the center."""
+		cx, cy, cz = center
+		klo = self.key_lo
+		khi = self.key_hi
+		cells = self.cells
+		z_lo = max(cz - r, klo[2])
+		z_hi = min(cz + r, khi[2])
+		if z_lo > z_hi:
+			return
+		for x in range(max(cx - r, klo[0]), min(cx + r, khi[0]) + 1):
+			x_edge = x in (cx - r, cx + r)
+			for y in range(max(cy - r, klo[1]), min(cy + r, khi[1]) + 1):
+				if x_edge or y in (cy - r, cy + r):
+					zs = range(z_lo, z_hi + 1)
+				else:
+					zs = [z for z in (cz - r, cz + r) if z_lo <= z <= z_hi]
+				for z in zs:
+					key = (x, y, z)
+					if key in cells:
+						yield key
+
+	def closest(self, p, max_distance=None):
+		"""
+		:return: <tuple> (index, distance) of the closest target point. (-1, None) if nothing found within max_distance.
+		"""
+		center = self._key(p)
+		klo = self.key_lo
+		khi = self.key_hi
+		r_start = max(
+			max(klo[d] - center[d], center[d] - khi[d], 0) for d in range(3)
+		)
+		r_end = max(
+			max(abs(center[d] - klo[d]), abs(center[d] - khi[d])) for d in range(3)
+		)
+		max_d2 = _inf if max_distance is None else float(max_distance) ** 2
+		px, py, pz = p[:3]
+		points = self.points
+		cells = self.cells
+		cell = self.cell_size
+
+		num_cells = len(cells)
+		best = [-1, _inf]
+
+		def _check_cell(key):
+			best_i, best_d2 = best
+			for i in cells[key]:
+				t = points[i]
+				dx = t[0] - px
+				dy = t[1] - py
+				dz = t[2] - pz
+				d2 = dx * dx + dy * dy + dz * dz
+				if d2 < best_d2:
+					best_d2 = d2
+					best_i = i
+			best[0] = best_i
+			best[1] = best_d2
+
+		for r in range(r_start, r_end + 1):
+			# the points in this ring are at least that far:
+			ring_min_d = (r - 1) * cell
+			if ring_min_d > 0.0 and ring_min_d * ring_min_d > min(best[1], max_d2):
+				break
+			if 6 * (2 * r + 1) ** 2 > num_cells:
+				# the ring is bigger than the grid itself (sparse targets / distant query):
+				# just check all the remaining cells once
+				cx, cy, cz = center
+				for key in cells:
+					if max(abs(key[0] - cx), abs(key[1] - cy), abs(key[2] - cz)) >= r:
+						_check_cell(key)
+				break
+			for key in self.__ring(center, r):
+				_check_cell(key)
+
+		best_i, best_d2 = best
+
+		if best_i < 0 or best_d2 > max_d2:
+			return -1, None
+		return best_i, _sqrt(best_d2)
+
+
+def _closest_np(queries, targets, cell_size):
+	"""
+	Vectorized search within the 3x3x3 block of cells around each query.
+
+	:return:
+		<tuple of arrays> (indices, squared distances).
+		The result is exact only where the squared distance is within cell_size squared.
+	"""
+	q = _np.asarray(queries, dtype=_np.float64).reshape(-1, 3)
+	t = _np.asarray(targets, dtype=_np.float64).reshape(-1, 3)
+	lo = t.min(axis=0)
+	inv = 1.0 / cell_size
+
+	# cell coords are shifted by 2, so any neighbour of a valid query cell is non-negative
+	# (the cell size is limited by **occupancy_cell_size()**, so the keys fit in int64):
+	t_cells = _np.floor((t - lo) * inv).astype(_np.int64) + 2
+	dims = t_cells.max(axis=0) + 3
+
+	def _keys(c):
+		return (c[:, 0] * dims[1] + c[:, 1]) * dims[2] + c[:, 2]
+
+	t_keys = _keys(t_cells)
+	order = _np.argsort(t_keys, kind='mergesort')
+	sorted_keys = t_keys[order]
+
+	best_i = _np.full(len(q), -1, dtype=_np.int64)
+	best_d2 = _np.full(len(q), _inf)
+
+	q_cells = _np.floor((q - lo) * inv)
+	# queries farther than a cell from the whole grid can't have a hit here:
+	valid = _np.all((q_cells >= -1) & (q_cells <= dims - 4), axis=1)
+	valid_ids = _np.nonzero(valid)[0]
+	if not len(valid_ids):
+		return best_i, best_d2
+	q_cells = q_cells[valid_ids].astype(_np.int64) + 2
+	q_valid = q[valid_ids]
+
+	for dx in (-1, 0, 1):
+		for dy in (-1, 0, 1):
+			for dz in (-1, 0, 1):
+				keys = _keys(q_cells + _np.array((dx, dy, dz), dtype=_np.int64))
+				start = _np.searchsorted(sorted_keys, keys, side='left')
+				count = _np.searchsorted(sorted_keys, keys, side='right') - start
+				for k in range(int(count.max()) if len(count) else 0):
+					sel = _np.nonzero(count > k)[0]
+					ti = order[start[sel] + k]
+					delta = t[ti] - q_valid[sel]
+					d2 = _np.einsum('ij,ij->i', delta, delta)
+					qi = valid_ids[sel]
+					better = d2 < best_d2[qi]
+					qi = qi[better]
+					best_d2[qi] = d2[better]
+					best_i[qi] = ti[better]
+	return best_i, best_d2
+
+
+def _closest_kdtree(queries, targets, max_distance):
+	q = _np.asarray(queries, dtype=_np.float64).reshape(-1, 3)
+	max_d = _inf if max_distance is None else float(max_distance)
+	# the bound itself is exclusive there, while max_distance is inclusive:
+	bound = max_d * (1.0 + 1e-9) + 1e-12
+	distances, indices = _cKDTree(targets).query(q, k=1, distance_upper_bound=bound)
+	found = _np.isfinite(distances) & (distances <= max_d)
+	indices = _np.where(found, indices, -1).tolist()
+	distances = [
+		d if ok else None
+		for d, ok in zip(distances.tolist(), found.tolist())
+	]
+	return indices, distances
+
+
+def closest_points(queries, targets, max_distance=None, cell_size=None, use_numpy=True):
+	"""
+	Find the closest target point for each query point.
+
+	:param queries: <sequence of (x, y, z)> points to find the closest targets for.
+	:param targets: <sequence of (x, y, z)> points to search among.
+	:param max_distance: <float / None> when given, farther targets aren't considered.
+	:param cell_size:
+		<float / None> grid cell size. Picked automatically if not given
+		(and then SciPy's k-d tree is used instead of the grid, if it's available).
+	:param use_numpy: <bool> use the vectorized search, if NumPy is available.
+	:return:
+		<tuple of lists> (indices, distances), one item for each query.
+		Where nothing found, index is -1 and distance is None.
+	"""
+	if not len(queries):
+		return list(), list()
+	if not len(targets):
+		return [-1] * len(queries), [None] * len(queries)
+	max_d2 = _inf if max_distance is None else float(max_distance) ** 2
+
+	grid = [None]
+
+	def _grid():
+		if grid[0] is None:
+			grid[0] = PointGrid(targets, cell_size)
+		return grid[0]
+
+	if not (use_numpy and _np is not None):
+		res = [_grid().closest(p, max_distance) for p in queries]
+		return [i for i, d in res], [d for i, d in res]
+
+	t = _np.asarray(targets, dtype=_np.float64).reshape(-1, 3)
+	if _cKDTree is not None and cell_size is None:
+		return _closest_kdtree(queries, t, max_distance)
+
+	cell_size = occupancy_cell_size(t, cell_size)
+	best_i, best_d2 = _closest_np(queries, t, cell_size)
+
+	indices = best_i.tolist()
+	distances = _np.sqrt(best_d2).tolist()
+	resolved = best_d2 <= cell_size * cell_size
+	for qi in _np.nonzero(~resolved)[0].tolist():
+		if max_d2 <= cell_size * cell_size:
+			# anything within max distance would have been found already
+			indices[qi] = -1
+			distances[qi] = None
+			continue
+		indices[qi], distances[qi] = _grid().closest(queries[qi], max_distance)
+	for qi in _np.nonzero(resolved & (best_d2 > max_d2))[0].tolist():
+		indices[qi] = -1
+		distances[qi] = None
+	return indices, distances
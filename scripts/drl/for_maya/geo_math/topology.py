@@ -0,0 +1,58 @@
+"""
+Mesh connectivity comparison.
+
+Two meshes have the same topology if they have the same number of vertices
+and exactly the same polygons, each built of the same vertex ids in the same order
+(the data returned by <MFnMesh.getVertices()>). Only then the per-face-vertex data
+(like UV assignment) can be copied from one to another as-is.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import hashlib
+from array import array as _array
+
+
+def _array_bytes(type_code, values):
+	arr = _array(type_code, values)
+	try:
+		return arr.tobytes()
+	except AttributeError:
+		# Python 2
+		return arr.tostring()
+
+
+def topology_hash(num_vertices, vertex_counts, vertex_ids):
+	"""
+	The hash of the mesh connectivity. Vertex positions and UVs don't affect it.
+
+	:param num_vertices: <int> the total number of vertices in the mesh.
+	:param vertex_counts: <list of ints> the number of vertices in each polygon.
+	:param vertex_ids: <list of ints> polygon vertices, one after another.
+	:return: <str> hex digest.
+	"""
+	h = hashlib.sha1()
+	h.update(u'{0}:{1}:{2}\0'.format(
+		num_vertices, len(vertex_counts), len(vertex_ids)
+	).encode('utf-8'))
+	h.update(_array_bytes('i', vertex_counts))
+	h.update(_array_bytes('i', vertex_ids))
+	return h.hexdigest()
+
+
+def assignment_matches(vertex_counts, uv_counts, uv_ids, num_uvs):
+	"""
+	Check the UV assignment data is consistent with the polygons it's going to be applied to:
+	each face either has no UVs or has one per vertex, and all the ids are in range.
+
+	:return: <bool>
+	"""
+	if len(vertex_counts) != len(uv_counts):
+		return False
+	total = 0
+	for nv, nuv in zip(vertex_counts, uv_counts):
+		if nuv and nuv != nv:
+			return False
+		total += nuv
+	if total != len(uv_ids):
+		return False
+	return not uv_ids or (0 <= min(uv_ids) and max(uv_ids) < num_uvs)
@@ -0,0 +1,207 @@
+"""
+Batch operations on UV-shells of a single mesh.
+
+UVs are given as U/V arrays indexed by UV id, and each UV's shell
+as another array (the one returned by <MFnMesh.getUvShellsIds()>).
+Bounding boxes of all the shells are computed in one pass,
+offsets are calculated per shell and then applied to all the UVs at once.
+
+Shell bounds are <tuple> (min_u, min_v, max_u, max_v), or None for a shell
+that has no UVs or is excluded from processing.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import math as _math
+
+try:
+	import numpy as _np
+except ImportError:
+	_np = None
+
+
+def _shell_bounds_python(us, vs, shell_ids, num_shells):
+	res = [None] * num_shells
+	for u, v, s in zip(us, vs, shell_ids):
+		b = res[s]
+		if b is None:
+			res[s] = [u, v, u, v]
+			continue
+		if u < b[0]:
+			b[0] = u
+		elif u > b[2]:
+			b[2] = u
+		if v < b[1]:
+			b[1] = v
+		elif v > b[3]:
+			b[3] = v
+	return [None if b is None else tuple(b) for b in res]
+
+
+def _shell_bounds_numpy(us, vs, shell_ids, num_shells):
+	ids = _np.asarray(shell_ids, dtype=_np.int64)
+	order = _np.argsort(ids, kind='mergesort')
+	sorted_ids = ids[order]
+	starts = _np.flatnonzero(_np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+	u = _np.asarray(us, dtype=_np.float64)[order]
+	v = _np.asarray(vs, dtype=_np.float64)[order]
+
+	res = [None] * num_shells
+	for s, b in zip(
+		sorted_ids[starts].tolist(),
+		zip(
+			_np.minimum.reduceat(u, starts).tolist(),
+			_np.minimum.reduceat(v, starts).tolist(),
+			_np.maximum.reduceat(u, starts).tolist(),
+			_np.maximum.reduceat(v, starts).tolist(),
+		)
+	):
+		res[s] = b
+	return res
+
+
+def shell_bounds(us, vs, shell_ids, num_shells, shells=None, use_numpy=True):
+	"""
+	Bounding boxes of all the shells.
+
+	:param num_shells: <int> the total number of shells.
+	:param shells: <set of ints / None> if given, only these shells get their bounds, the others get None.
+	:param use_numpy: <bool> use vectorized math, if NumPy is available.
+	:return: <list> bounds for each shell.
+	"""
+	if len(us) != len(vs) or len(us) != len(shell_ids):
+		raise ValueError('U, V and shell ids arrays have different length.')
+	if not len(shell_ids):
+		return [None] * num_shells
+	f = _shell_bounds_numpy if (use_numpy and _np is not None) else _shell_bounds_python
+	res = f(us, vs, shell_ids, num_shells)
+	if shells is not None:
+		res = [b if i in shells else None for i, b in enumerate(res)]
+	return res
+
+
+def range_offset(uvs_min, uvs_max, range_min, range_max, round_mode=2):
+	"""
+	Integer offset for a single axis (U/V), moving the given interval to the range.
+	See <geo.components.uvs.move_shells_to_range()> for round_mode.
+	"""
+	if uvs_min > range_min and uvs_max < range_max:
+		return 0
+
+	rounding_f = [_math.floor, _math.ceil, round][round_mode]
+
+	uvs_min_square = int(uvs_min)
+	uvs_max_square = int(_math.ceil(uvs_max))
+	uvs_len_square = uvs_max_square - uvs_min_square
+	range_len_square = range_max - range_min
+	cur_round_f = round if uvs_len_square <= range_len_square else rounding_f
+
+	uvs_center = (uvs_min + uvs_max) * 0.5
+	range_center = (range_min + range_max) * 0.5
+	return int(cur_round_f(range_center - uvs_center))
+
+
+def range_offsets(bounds, min_u=-1, min_v=-1, max_u=2, max_v=2, round_mode=2):
+	"""
+	Integer offsets moving each shell to the given UV range.
+
+	:return: <list> (offset_u, offset_v) for each shell, None where there are no bounds.
+	"""
+	return [
+		None if b is None else (
+			range_offset(b[0], b[2], min_u, max_u, round_mode),
+			range_offset(b[1], b[3], min_v, max_v, round_mode),
+		)
+		for b in bounds
+	]
+
+
+def zero_offsets(bounds):
+	"""
+	Offsets snapping each shell's bounding box lower-left corner to (0, 0).
+
+	:return: <list> (offset_u, offset_v) for each shell, None where there are no bounds.
+	"""
+	return [
+		None if b is None else (-b[0], -b[1])
+		for b in bounds
+	]
+
+
+class ShellsOffsetResult(object):
+	def __init__(self, us, vs, moved_shells, moved_uvs):
+		super(ShellsOffsetResult, self).__init__()
+		self.us = us  # type: list[float]
+		self.vs = vs  # type: list[float]
+		self.moved_shells = moved_shells  # type: list[int]
+		self.moved_uvs = moved_uvs  # type: list[int]
+
+
+def offset_uvs(us, vs, shell_ids, offsets, use_numpy=True):
+	"""
+	Move each UV by the offset of it's shell.
+
+	:param offsets: <list> (offset_u, offset_v) or None for each shell. Zero offsets are skipped.
+	:return: <ShellsOffsetResult / None> None if nothing is moved.
+	"""
+	moved_shells = [
+		i for i, o in enumerate(offsets)
+		if o is not None and (o[0] or o[1])
+	]
+	if not moved_shells:
+		return None
+
+	if use_numpy and _np is not None:
+		off = _np.zeros((len(offsets), 2))
+		for i in moved_shells:
+			off[i] = offsets[i]
+		is_moved = _np.zeros(len(offsets), dtype=bool)
+		is_moved[moved_shells] = True
+		ids = _np.asarray(shell_ids, dtype=_np.int64)
+		new_us = _np.asarray(us, dtype=_np.float64) + off[ids, 0]
+		new_vs = _np.asarray(vs, dtype=_np.float64) + off[ids, 1]
+		return ShellsOffsetResult(
+			new_us.tolist(), new_vs.tolist(), moved_shells,
+			_np.flatnonzero(is_moved[ids]).tolist()
+		)
+
+	moved_set = set(moved_shells)
+	new_us = list(us)
+	new_vs = list(vs)
+	moved_uvs = list()
+	for i, s in enumerate(shell_ids):
+		if s not in moved_set:
+			continue
+		du, dv = offsets[s]
+		new_us[i] += du
+		new_vs[i] += dv
+		moved_uvs.append(i)
+	return ShellsOffsetResult(new_us, new_vs, moved_shells, moved_uvs)
+
+
+def shells_csr(shell_ids, num_shells, use_numpy=True):
+	"""
+	Group UV ids by shell, in CSR form (compressed sparse rows).
+
+	:param shell_ids: <sequence of ints> shell id for each UV.
+	:param num_shells: <int> the total number of shells.
+	:return:
+		<tuple of lists> (offsets, uv_ids):
+		UVs of shell i are ``uv_ids[offsets[i]:offsets[i + 1]]``, in ascending order.
+		There are num_shells + 1 offsets.
+	"""
+	if use_numpy and _np is not None and len(shell_ids):
+		ids = _np.asarray(shell_ids, dtype=_np.int64)
+		counts = _np.bincount(ids, minlength=num_shells)
+		offsets = _np.zeros(num_shells + 1, dtype=_np.int64)
+		_np.cumsum(counts, out=offsets[1:])
+		return offsets.tolist(), _np.argsort(ids, kind='mergesort').tolist()
+
+	buckets = [list() for _ in range(num_shells)]
+	for uv, s in enumerate(shell_ids):
+		buckets[s].append(uv)
+	offsets = [0]
+	uv_ids = list()
+	for b in buckets:
+		uv_ids.extend(b)
+		offsets.append(len(uv_ids))
+	return offsets, uv_ids
@@ -0,0 +1,239 @@
+"""
+Vectorized UV transforms.
+
+Each transform is a callable taking U and V arrays (all the UVs of a UV-set)
+and returning the new ones. With NumPy, the arrays are <numpy.ndarray>,
+otherwise - plain lists, and the math is done with list comprehensions.
+
+Transforms are combined with <chain()> and applied to the mesh data with <apply()>.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import bisect as _bisect
+import math as _math
+
+try:
+	import numpy as _np
+except ImportError:
+	_np = None
+
+
+def as_array(values, use_numpy=True):
+	"""
+	Convert the values to the array type transforms work with.
+	"""
+	if use_numpy and _np is not None:
+		return _np.asarray(values, dtype=_np.float64)
+	return [float(x) for x in values]
+
+
+def to_list(values):
+	if _np is not None and isinstance(values, _np.ndarray):
+		return values.tolist()
+	return list(values)
+
+
+def _is_np(values):
+	return _np is not None and isinstance(values, _np.ndarray)
+
+
+def gamma(values, power):
+	"""
+	Sign-preserving power: ``sign(x) * abs(x) ** power``.
+	Zero values stay zero, and zero power turns everything to zero.
+	"""
+	power = float(power)
+	if not _is_np(values):
+		if power == 0.0:
+			return [0.0] * len(values)
+		return [
+			0.0 if x == 0.0 else (
+				-((-x) ** power) if x < 0.0 else x ** power
+			)
+			for x in values
+		]
+
+	if power == 0.0:
+		return _np.zeros_like(values)
+	with _np.errstate(divide='ignore', invalid='ignore'):
+		res = _np.sign(values) * _np.power(_np.abs(values), power)
+	res[values == 0.0] = 0.0
+	return res
+
+
+def remap(values, curve):
+	"""
+	Piecewise-linear remap by the given curve.
+	Outside of the curve, the values are clamped to it's end points.
+
+	:param curve: <sequence of (x, y) pairs> sorted by x.
+	"""
+	xs = [float(p[0]) for p in curve]
+	ys = [float(p[1]) for p in curve]
+	if not xs:
+		raise ValueError('Empty remap curve.')
+	if any(b < a for a, b in zip(xs, xs[1:])):
+		raise ValueError('Remap curve points have to be sorted: {0}'.format(curve))
+	if _is_np(values):
+		return _np.interp(values, xs, ys)
+
+	last = len(xs) - 1
+
+	def _remap_single(x):
+		i = _bisect.bisect_right(xs, x)
+		if i == 0:
+			return ys[0]
+		if i > last:
+			return ys[last]
+		x0 = xs[i - 1]
+		x1 = xs[i]
+		t = (x - x0) / (x1 - x0) if x1 != x0 else 0.0
+		return ys[i - 1] + (ys[i] - ys[i - 1]) * t
+
+	return [_remap_single(x) for x in values]
+
+
+class UVTransformBase(object):
+	"""
+	The base for all the UV transforms.
+	"""
+	def is_identity(self):
+		"""Whether the transform doesn't change anything (so the mesh may not be touched at all)."""
+		return False
+
+	def __call__(self, us, vs):
+		"""
+		:return: <tuple> the new (us, vs) arrays.
+		"""
+		raise NotImplementedError()
+
+
+class Gamma(UVTransformBase):
+	"""
+	Sign-preserving gamma (power) per axis. None or 1.0 leaves the axis intact.
+	"""
+	def __init__(self, u=None, v=None):
+		super(Gamma, self).__init__()
+		self.u = u
+		self.v = v
+
+	@staticmethod
+	def _is_skipped(power):
+		return power is None or power == 1.0
+
+	def is_identity(self):
+		return self._is_skipped(self.u) and self._is_skipped(self.v)
+
+	def __call__(self, us, vs):
+		if not self._is_skipped(self.u):
+			us = gamma(us, self.u)
+		if not self._is_skipped(self.v):
+			vs = gamma(vs, self.v)
+		return us, vs
+
+
+class Remap(UVTransformBase):
+	"""
+	Piecewise-linear remap curve per axis (see **remap()**). None leaves the axis intact.
+	"""
+	def __init__(self, u_curve=None, v_curve=None):
+		super(Remap, self).__init__()
+		self.u_curve = u_curve
+		self.v_curve = v_curve
+
+	def is_identity(self):
+		return not (self.u_curve or self.v_curve)
+
+	def __call__(self, us, vs):
+		if self.u_curve:
+			us = remap(us, self.u_curve)
+		if self.v_curve:
+			vs = remap(vs, self.v_curve)
+		return us, vs
+
+
+class Affine(UVTransformBase):
+	"""
+	2D affine transform, given as 2x3 matrix (by rows):
+		((a, b, tu), (c, d, tv))
+	I.e.:
+		* u' = a * u + b * v + tu
+		* v' = c * u + d * v + tv
+	"""
+	_identity = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+
+	def __init__(self, matrix=None):
+		super(Affine, self).__init__()
+		if matrix is None:
+			matrix = Affine._identity
+		self.matrix = tuple(
+			tuple(float(x) for x in row[:3]) for row in matrix[:2]
+		)
+
+	@classmethod
+	def from_srt(cls, scale=(1.0, 1.0), rotate=0.0, translate=(0.0, 0.0), pivot=(0.0, 0.0)):
+		"""
+		Build the transform from it's components, applied in this order: scale, rotate, translate.
+
+		:param rotate: <float> counter-clockwise angle, in degrees.
+		:param pivot: <(u, v)> the point to scale and rotate around.
+		"""
+		a = _math.radians(rotate)
+		cos_a = _math.cos(a)
+		sin_a = _math.sin(a)
+		su, sv = scale
+		pu, pv = pivot
+		tu, tv = translate
+		m00 = cos_a * su
+		m01 = -sin_a * sv
+		m10 = sin_a * su
+		m11 = cos_a * sv
+		return cls((
+			(m00, m01, pu - m00 * pu - m01 * pv + tu),
+			(m10, m11, pv - m10 * pu - m11 * pv + tv),
+		))
+
+	def is_identity(self):
+		return self.matrix == Affine._identity
+
+	def __call__(self, us, vs):
+		(a, b, tu), (c, d, tv) = self.matrix
+		if _is_np(us):
+			return a * us + b * vs + tu, c * us + d * vs + tv
+		return (
+			[a * u + b * v + tu for u, v in zip(us, vs)],
+			[c * u + d * v + tv for u, v in zip(us, vs)],
+		)
+
+
+class Chain(UVTransformBase):
+	"""
+	Multiple transforms applied one after another.
+	"""
+	def __init__(self, transforms):
+		super(Chain, self).__init__()
+		self.transforms = [t for t in transforms if not t.is_identity()]
+
+	def is_identity(self):
+		return not self.transforms
+
+	def __call__(self, us, vs):
+		for t in self.transforms:
+			us, vs = t(us, vs)
+		return us, vs
+
+
+def chain(*transforms):
+	return Chain(transforms)
+
+
+def apply(transform, us, vs, use_numpy=True):
+	"""
+	Apply the transform to U/V arrays of any type.
+
+	:return: <tuple of lists> the new (us, vs), or None if the transform does nothing.
+	"""
+	if transform.is_identity():
+		return None
+	new_us, new_vs = transform(as_array(us, use_numpy), as_array(vs, use_numpy))
+	return to_list(new_us), to_list(new_vs)
@@ -0,0 +1,181 @@
+"""
+UV seam welder.
+
+It finds pairs of UVs which belong to the same vertex and are closer than the threshold,
+and merges them. The same thing polyMergeUV does, but the proximity search is performed
+with a spatial hash: each seam UV is put to a grid cell (the cell size is the threshold),
+keyed by the vertex, too. So each UV is compared only to the UVs of the same vertex
+in the 9 neighbour cells.
+
+The input is the mesh data in the form returned by Maya API (<MFnMesh>):
+	* **us**, **vs** - UV coordinates, indexed by UV id.
+	* **vertex_counts**, **vertex_ids** - polygon vertices (from <getVertices()>).
+	* **uv_counts**, **uv_ids** - UVs assigned to each polygon (from <getAssignedUVs()>).
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+from math import floor as _floor
+
+_neighbour_offsets = tuple(
+	(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+)
+
+
+def _vertex_uvs(vertex_counts, vertex_ids, uv_counts, uv_ids, allowed=None):
+	"""
+	For each vertex - all the UVs assigned to it.
+	Faces which have no UVs (or not each vertex has one) are skipped.
+
+	:rtype: dict[int, set[int]]
+	"""
+	res = dict()
+	vi = 0
+	ui = 0
+	for nv, nuv in zip(vertex_counts, uv_counts):
+		if nuv == nv:
+			for k in range(nv):
+				uv = uv_ids[ui + k]
+				if allowed is not None and uv not in allowed:
+					continue
+				v = vertex_ids[vi + k]
+				if v in res:
+					res[v].add(uv)
+				else:
+					res[v] = {uv}
+		vi += nv
+		ui += nuv
+	return res
+
+
+def seam_pairs(us, vs, vertex_counts, vertex_ids, uv_counts, uv_ids, threshold, allowed=None):
+	"""
+	Find the pairs of seam-UVs to be welded: they share a vertex
+	and the distance between them is within the threshold.
+
+	:param threshold: <float> max distance (inclusive) in UV space.
+	:param allowed: <set of ints / None> if given, only these UV ids are considered.
+	:return: <list of tuples> (uv_a, uv_b), with uv_a < uv_b.
+	"""
+	threshold = float(threshold)
+	if threshold < 0.0:
+		raise ValueError('Negative weld threshold: {0}'.format(threshold))
+	inv_cell = 1.0 / threshold if threshold > 0.0 else 1.0
+
+	grid = dict()
+	seam = list()
+	for v, v_uvs in _vertex_uvs(vertex_counts, vertex_ids, uv_counts, uv_ids, allowed).items():
+		if len(v_uvs) < 2:
+			continue
+		for uv in v_uvs:
+			cx = int(_floor(us[uv] * inv_cell))
+			cy = int(_floor(vs[uv] * inv_cell))
+			key = (v, cx, cy)
+			if key in grid:
+				grid[key].append(uv)
+			else:
+				grid[key] = [uv]
+			seam.append((v, uv, cx, cy))
+
+	max_dist_sq = threshold * threshold
+	res = list()
+	append = res.append
+	grid_get = grid.get
+	for v, a, cx, cy in seam:
+		ua = us[a]
+		va = vs[a]
+		for dx, dy in _neighbour_offsets:
+			bucket = grid_get((v, cx + dx, cy + dy))
+			if not bucket:
+				continue
+			for b in bucket:
+				if b <= a:
+					continue
+				du = us[b] - ua
+				dv = vs[b] - va
+				if du * du + dv * dv <= max_dist_sq:
+					append((a, b))
+	return res
+
+
+def _clusters(pairs):
+	"""
+	Union-find of the welded pairs. The root of each cluster is it's smallest UV id.
+
+	:return: <dict> uv_id -> root uv_id, for each UV in any pair.
+	"""
+	parent = dict()
+
+	def _find(x):
+		while parent[x] != x:
+			parent[x] = parent[parent[x]]
+			x = parent[x]
+		return x
+
+	for a, b in pairs:
+		parent.setdefault(a, a)
+		parent.setdefault(b, b)
+		ra = _find(a)
+		rb = _find(b)
+		if ra == rb:
+			continue
+		if rb < ra:
+			ra, rb = rb, ra
+		parent[rb] = ra
+	return dict((x, _find(x)) for x in parent)
+
+
+class WeldResult(object):
+	"""
+	The new UV data of the mesh, after welding.
+
+	UV ids are compacted: the merged (and any unused) UVs are removed,
+	the remaining ones keep their order.
+	"""
+	def __init__(self, us, vs, uv_ids, merged, clusters):
+		super(WeldResult, self).__init__()
+		self.us = us  # type: list[float]
+		self.vs = vs  # type: list[float]
+		self.uv_ids = uv_ids  # type: list[int]
+		self.merged = merged  # the number of UVs merged into others
+		self.clusters = clusters  # the number of resulting welded UVs
+
+
+def weld(us, vs, vertex_counts, vertex_ids, uv_counts, uv_ids, threshold, allowed=None):
+	"""
+	Weld the seam-UVs sharing a vertex and being within the threshold (see **seam_pairs()**).
+	Each group of welded UVs is moved to it's average position.
+
+	:return: <WeldResult / None> None if there's nothing to weld.
+	"""
+	pairs = seam_pairs(us, vs, vertex_counts, vertex_ids, uv_counts, uv_ids, threshold, allowed)
+	if not pairs:
+		return None
+	roots = _clusters(pairs)
+
+	sums = dict()
+	for uv, root in roots.items():
+		if root in sums:
+			s = sums[root]
+			s[0] += us[uv]
+			s[1] += vs[uv]
+			s[2] += 1
+		else:
+			sums[root] = [us[uv], vs[uv], 1]
+
+	mapped = [roots.get(uv, uv) for uv in uv_ids]
+	new_id = dict((uv, i) for i, uv in enumerate(sorted(set(mapped))))
+	new_us = [0.0] * len(new_id)
+	new_vs = [0.0] * len(new_id)
+	for uv, i in new_id.items():
+		s = sums.get(uv)
+		if s is None:
+			new_us[i] = us[uv]
+			new_vs[i] = vs[uv]
+		else:
+			new_us[i] = s[0] / s[2]
+			new_vs[i] = s[1] / s[2]
+
+	return WeldResult(
+		new_us, new_vs, [new_id[uv] for uv in mapped],
+		merged=len(roots) - len(sums), clusters=len(sums)
+	)
@@ -0,0 +1,83 @@
+"""
+Lazy submodules for a package: each one is imported on the first attribute access.
+
+Use it at the end of the package's **__init__**:
+
+	from drl.for_maya.lazy_import import lazy_submodules
+	lazy_submodules(__name__, ('uvs', 'vertices'))
+
+In Python 3.7+, it's done with module-level <__getattr__> (PEP 562).
+In older versions, the package in <sys.modules> is replaced with a proxy module.
+
+This module is imported at Maya startup, so it must not import anything heavy.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import importlib as _importlib
+import sys as _sys
+import types as _types
+
+_has_module_getattr = _sys.version_info[:2] >= (3, 7)
+
+
+def _load(module_name, attr, submodules):
+	if attr not in submodules:
+		raise AttributeError(
+			'module {0} has no attribute {1}'.format(repr(module_name), repr(attr))
+		)
+	# the import machinery itself sets it as the package attribute:
+	return _importlib.import_module('.' + attr, module_name)
+
+
+def _dir(module_dict, submodules):
+	return sorted(set(module_dict.keys()) | set(submodules))
+
+
+class _LazyModule(_types.ModuleType):
+	"""
+	Proxy for the package, for the Python versions without PEP 562.
+	The package's **__init__** keeps running in the original module,
+	so anything defined there after the proxy is installed is looked up in it.
+	"""
+	def __init__(self, original, submodules):
+		super(_LazyModule, self).__init__(original.__name__, original.__doc__)
+		self.__dict__.update(original.__dict__)
+		# keep the original alive: in py2, when a module is destroyed, it's globals are set to None
+		self.__dict__['_lazy_original'] = original
+		self.__dict__['_lazy_submodules'] = submodules
+
+	def __getattr__(self, item):
+		original_dict = self.__dict__['_lazy_original'].__dict__
+		if item in original_dict:
+			return original_dict[item]
+		if item.startswith('__'):
+			raise AttributeError(item)
+		return _load(self.__name__, item, self.__dict__['_lazy_submodules'])
+
+	def __dir__(self):
+		module_dict = dict(self.__dict__['_lazy_original'].__dict__)
+		module_dict.update(self.__dict__)
+		return _dir(module_dict, self.__dict__['_lazy_submodules'])
+
+
+def lazy_submodules(module_name, submodules):
+	"""
+	Make the given submodules of the package load on the first access.
+
+	:param module_name: <str> the package's **__name__**.
+	:param submodules: <iterable of str> names of the submodules (without the package prefix).
+	:return: the package module (in old Python versions, it's the proxy).
+	"""
+	submodules = frozenset(submodules)
+	module = _sys.modules[module_name]
+
+	if _has_module_getattr:
+		module_dict = module.__dict__
+		module_dict['__getattr__'] = lambda attr: _load(module_name, attr, submodules)
+		module_dict['__dir__'] = lambda: _dir(module_dict, submodules)
+		return module
+
+	proxy = _LazyModule(module, submodules)
+	_sys.modules[module_name] = proxy
+	return proxy
+
@@ -165,11 +165,13 @@ def assigned_mat_to_face(face=None, SGs=None):
 	}
 
 
-def objects_by_material(objects=None):
+def objects_by_material(objects=None, material_index=None):
 	"""
 	Returns dictionary of lists, in which the given objects are grouped by their material.
 	Only 1st material for the object is used, only 1st shape of the object checked.
 	:param objects: list of objects
+	:param material_index: optional pre-built <material_index.MaterialIndex> snapshot.
+		When given, materials are looked up in it instead of querying the scene.
 	:return: dictionary, in which keys are material names and values are lists of objects using it
 	"""
 	if not objects:
@@ -182,7 +184,10 @@ def objects_by_material(objects=None):
 		shape = child_shapes([o])
 		if shape:
 			shape = shape[0]
-			mat = assigned_materials(shape)['mats']
+			if material_index is None:
+				mat = assigned_materials(shape)['mats']
+			else:
+				mat = material_index.shape_to_materials(shape)
 			if mat:
 				mat = mat[0]
 				if not mat in res:
@@ -191,17 +196,22 @@ def objects_by_material(objects=None):
 	return res
 
 
-def shapes_to_materials(shapes=None, **ls_args):
+def shapes_to_materials(shapes=None, material_index=None, **ls_args):
 	"""
 	For the given list of shapes list the assigned materials.
 
 	:param shapes: list of shape nodes
+	:param material_index: optional pre-built <material_index.MaterialIndex> snapshot.
+		When given, materials are looked up in it instead of querying the scene
+		(and <ls_args> are ignored).
 	:param ls_args: optional arguments passed to the ls command
 	:return: list of the material nodes
 	"""
 	shapes = wrn_items(shapes, stacklevel_offset=1)
 	if not shapes:
 		return []
+	if material_index is not None:
+		return material_index.shapes_to_materials(shapes)
 	res = []
 	for s in shapes:
 		res += assigned_materials(s, **ls_args)['mats']
@@ -6,6 +6,7 @@ from .base_class import PolyCompConverter as Poly
 from .base_class import vfs_grouped_by_vertex, vfs_grouped_by_face
 
 from drl.for_maya.geo.components import uv_sets
+from drl.for_maya.geo_math import uv_shells as _shells
 from drl.for_maya import ui
 
 from drl_common import errors as err
@@ -15,6 +16,45 @@ from drl_py23 import (
 )
 
 
+def index_ranges(indices):
+	"""
+	Compress component indices into continuous (first, last) ranges.
+
+	:param indices: <iterable of ints> in any order, duplicates allowed.
+	:return: <list of lists> [first, last]
+	"""
+	res = list()
+	for i in sorted(set(indices)):
+		if res and res[-1][1] + 1 == i:
+			res[-1][1] = i
+		else:
+			res.append([i, i])
+	return res
+
+
+def components_from_indices(shape, indices, component='map', flatten=False):
+	"""
+	Get components of the shape by their indices, with a single query.
+
+	:param shape: <PyNode> mesh shape.
+	:param indices: <iterable of ints>
+	:param component: <string> component attribute: 'map', 'vtx', 'e', 'f', etc.
+	:param flatten: <bool> if False, continuous indices are combined to ranges.
+	:return: <list> of PyNode components.
+	"""
+	ranges = index_ranges(indices)
+	if not ranges:
+		return []
+	nm = shape.name()
+	return pm.ls(
+		[
+			'{0}.{1}[{2}:{3}]'.format(nm, component, first, last)
+			for first, last in ranges
+		],
+		flatten=flatten
+	)
+
+
 def _uv_shells_from_mesh(mesh, uv_set=None):
 	"""
 	Low-level function which returns UVs grouped by shell, as tuple of lists.
@@ -43,6 +83,30 @@ def _uv_shells_from_mesh(mesh, uv_set=None):
 	return res
 
 
+def uv_shell_indices(mesh, uv_set=None):
+	"""
+	Low-level function which returns UV-shells as index arrays (CSR-style),
+	for any UV-set, without making it current.
+
+	:param mesh: source mesh to get UVs for
+	:param uv_set:
+		uv-set to check.
+
+		* None or 0 for the current set,
+		* name or number (starting from 1) to get the specific UV-set.
+	:return:
+		<tuple of lists> (offsets, uv_ids):
+		UV ids of shell i are ``uv_ids[offsets[i]:offsets[i + 1]]``, sorted.
+	"""
+	err.WrongTypeError(mesh, pm.nt.Mesh, 'mesh').raise_if_needed()
+	uv_set = (
+		uv_sets.get_set_name(mesh, uv_set) if uv_set
+		else mesh.getCurrentUVSetName()
+	)
+	shell_ids, num_shells = mesh.getUvShellsIds(uv_set)
+	return _shells.shells_csr(shell_ids, num_shells)
+
+
 def uv_shells(
 	items=None, selection_if_none=True,
 	extend_to_full_shell=True, uv_set=None, collapse=False
@@ -73,7 +137,8 @@ def uv_shells(
 		* None or 0 for the current set,
 		* name or number (starting from 1) to get the specific UV-set.
 
-		WARNING! Though it's possible to specify a uv-set here, the function will work MUCH faster if just currently active UV-set is used.
+		If it's not the current one, the set is temporarily made current
+		(given items are converted to UVs of the current set).
 	:param collapse:
 		<bool>
 
@@ -116,39 +181,30 @@ def uv_shells(
 				uv_sets.set_current_for_singe_obj(s, uv_set_name)
 			prev_sets.append((s, cur_set))
 
-	# now, let's prepare current items converted to UVs.
-	# Set is better then a list since order doesn't matter:
-	all_uvs = set(
-		Poly(items, selection_if_none).convert(to_uv=True, flatten=True)
-	)
+	# now, let's prepare current items converted to UVs, as ids per shape:
+	uv_ids_per_shape = dict()
+	for c in Poly(items, selection_if_none).convert(to_uv=True):
+		uv_ids_per_shape.setdefault(c.node(), set()).update(c.indices())
 
 	progress_window.end()
 
-	def _add_sets_from_single_shape(shape, all_uvs_set, out_res_list):
-		all_cur_shells = _uv_shells_from_mesh(shape)  # UV-shells for current shape.
-			# No need to pass a uv-set, since it's shape already active
-			# So far, all uv-shells are returned,
-			# as a next step we'll intersect it with a given items.
-
-		cur_shells = list()
-		for i, shell in enumerate(all_cur_shells):
-			cur_shells.append(
-				[uv for uv in shell if (uv in all_uvs_set)]  # only selected UVs kept
-			)
-			all_uvs_set -= set(shell)  # remove already added UVs for performance reasons
-
-		# forget about shells we didn't select:
-		if extend_to_full_shell:
-			cur_shells = [all_cur_shells[i] for i, shell in enumerate(cur_shells) if shell]
-		else:
-			cur_shells = [x for x in cur_shells if x]
-
-		if collapse:
-			cur_shells = [
-				Poly(uvs, False).convert(to_uv=True)
-				for uvs in cur_shells
-			]
-		return out_res_list + cur_shells  # add the shells of this shape to the overall result
+	def _add_sets_from_single_shape(shape, out_res_list):
+		selected = uv_ids_per_shape.get(shape)
+		if not selected:
+			return out_res_list
+		# UV-shells for current shape, as arrays.
+		# No need to pass a uv-set, since it's shape already active:
+		offsets, uv_ids = uv_shell_indices(shape)
+
+		for i in _xrange(len(offsets) - 1):
+			shell = uv_ids[offsets[i]:offsets[i + 1]]
+			if not selected.isdisjoint(shell):
+				if not extend_to_full_shell:
+					shell = [uv for uv in shell if uv in selected]  # only selected UVs kept
+				out_res_list.append(
+					components_from_indices(shape, shell, 'map', flatten=not collapse)
+				)
+		return out_res_list
 
 	# and finally, let's combine together all the UV-shells from different shapes,
 	# keeping only those UVs which were related to the given items:
@@ -159,7 +215,7 @@ def uv_shells(
 	while progress_window.is_active():
 		s = shapes[i]
 		progress_window.message = 'Shape: {0} / {1}'.format(i + 1, num)
-		res = _add_sets_from_single_shape(s, all_uvs, res)
+		res = _add_sets_from_single_shape(s, res)
 		i += 1
 		progress_window.increment()
 
@@ -5,7 +5,9 @@ __author__ = 'Lex Darlog (DRL)'
 
 import maya.cmds as cmds
 from drl_common import errors as err
-from drl.for_maya.ls.pymel import default_input
+from drl_common.utils import remove_duplicates as _remove_duplicates
+from drl.for_maya.ls import default_input
+from drl.for_maya.ls.convert import path_cache as _path_cache
 
 
 def listRel_args(main_args, fullPath=True, **extra_args):
@@ -59,15 +61,26 @@ def to_transforms(items=None, selection_if_empty=True, fullPath=False):
 	return to_parents(items, selection_if_empty=False, fullPath=fullPath)
 
 
-def to_parents(items=None, selection_if_empty=True, fullPath=False, **lsRel_args):
+def to_parents(items=None, selection_if_empty=True, fullPath=False, dag=None, **lsRel_args):
 	"""
 	Converts given list of objects/components to their parents.
 	:param items:
 	:param selection_if_empty: True by default. If true, and no items is provided, current selection is used.
 	:param fullPath: The result may be forced to have full path on each element.
+	:param dag: Optional <ls.dag_snapshot.DagSnapshot>. If given, the query is performed in memory
+		(lsRel_args are ignored then, and the result always has full paths).
 	:param lsRel_args: Additional arguments may be passed to Maya's listRelatives function.
 	:return: List of strings with parents' names. Empty list if nothing selected.
 	"""
+	if dag is not None:
+		list_f = default_input.selection_if_empty_f(selection_if_empty)
+		return dag.parents(list_f(items))
+	if fullPath and not lsRel_args and items:
+		cached = _cached_full_paths(items)
+		if cached is not None:
+			# the parent's path is just the beginning of the child's full path:
+			parents = (p.rsplit('|', 1)[0] for p in cached)
+			return _remove_duplicates([p for p in parents if p])
 	list_f = default_input.selection_if_empty_f(selection_if_empty)
 	items = list_f(items)
 	kwargs = listRel_args(dict(parent=True), fullPath=fullPath, **lsRel_args)
@@ -75,7 +88,10 @@ def to_parents(items=None, selection_if_empty=True, fullPath=False, **lsRel_args
 	return default_input.items_list(items)
 
 
-def to_children(items=None, selection_if_empty=True, immediate_only=True, fullPath=False, **lsRel_args):
+def to_children(
+	items=None, selection_if_empty=True, immediate_only=True, fullPath=False, dag=None,
+	**lsRel_args
+):
 	"""
 	Converts given list of objects/components to their hierarchy.
 	:param items:
@@ -83,11 +99,17 @@ def to_children(items=None, selection_if_empty=True, immediate_only=True, fullPa
 	:param immediate_only: True by default. If true, returns only immediate hierarchy.
 		Otherwise, returns also all grand-hierarchy, grand-grand hierarchy etc.
 	:param fullPath: The result may be forced to have full path on each element.
+	:param dag: Optional <ls.dag_snapshot.DagSnapshot>. If given, the query is performed in memory
+		(lsRel_args are ignored then, and the result always has full paths).
 	:param lsRel_args: Additional arguments may be passed to Maya's listRelatives function.
 	:return: List of strings with parents' names. Empty list if nothing selected.
 	"""
 	list_f = default_input.selection_if_empty_f(selection_if_empty)
 	items = list_f(items)
+	if dag is not None:
+		if immediate_only:
+			return dag.children(items, include_intermediate=True)
+		return dag.descendants(items, include_intermediate=True)
 	if immediate_only:
 		kwargs = dict(children=True)
 	else:
@@ -97,7 +119,30 @@ def to_children(items=None, selection_if_empty=True, immediate_only=True, fullPa
 	return default_input.items_list(items)
 
 
+def _cached_full_paths(items):
+	"""
+	Resolve full paths via the shared <path_cache>.
+
+	:return:
+		<list of strings / None>
+			* Full paths, the same as ls -long would return.
+			* None if the cache is unavailable or any of the items is not a plain node name
+			(component, wildcard), so Maya needs to be queried directly.
+	"""
+	cache = _path_cache.get_cache()
+	if cache is None:
+		return None
+	items = default_input.items_list(items)
+	if not all(_path_cache.is_plain_name(x) for x in items):
+		return None
+	return _remove_duplicates(cache.full_paths(items))
+
+
 def to_names(items=None, selection_if_empty=True, **ls_args):
+	if items and not ls_args:
+		cached = _cached_full_paths(items)
+		if cached is not None:
+			return [x.rsplit('|', 1)[-1] for x in cached]
 	list_f = default_input.selection_if_empty_f(selection_if_empty)
 	items = list_f(items, **ls_args)
 	items = [x.strip('|').split('|')[-1] for x in items]
@@ -107,9 +152,16 @@ def to_names(items=None, selection_if_empty=True, **ls_args):
 def to_full_paths(items=None, selection_if_empty=True, **ls_args):
 	"""
 	Converts item names to full paths.
+
+	Plain node names are resolved through the shared <path_cache>,
+	unless extra <ls_args> are given.
 	:param selection_if_empty: True by default. If true, and no items is provided, current selection is used.
 	:return: List of strings with items' full paths. Empty list if nothing selected.
 	"""
+	if items and not ls_args:
+		cached = _cached_full_paths(items)
+		if cached is not None:
+			return cached
 	list_f = default_input.selection_if_empty_f(selection_if_empty)
 	return list_f(items, long=True, **ls_args)
 
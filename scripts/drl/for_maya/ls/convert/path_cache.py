@@ -0,0 +1,446 @@
+"""
+A cache for full-path resolution of DAG nodes.
+
+Resolved nodes are stored by their full path (each instance separately),
+so the cache survives any scene edit which doesn't affect the node's path.
+Each name spelling the node was requested with is remembered as an alias pointing to the path.
+Node UUIDs and an index of cached descendants are kept only to find what to invalidate.
+
+When a node is renamed or re-parented, only the entries under it's old path are dropped
+(the node itself and all it's descendants, even if the node itself isn't cached).
+When a DAG node is added, renamed or instanced, the partial-name aliases which may now
+resolve to another node (the ones ending with the same short name) are dropped, too.
+It's done either:
+	* automatically, via Maya scene callbacks (the default, if the Maya API is available);
+	* or explicitly, with **invalidate()** - for headless runs without callbacks.
+
+Only plain node names are cached. Components, wildcards and any extra ls-filters
+are always passed to Maya as is.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+from maya import cmds
+
+from drl_py23 import (
+	str_t as _str_t,
+	str_h as _str_h,
+)
+
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
+_not_plain_name_chars = frozenset('.*?[')
+
+
+def is_plain_name(name):
+	"""
+	Whether the given string is a node name/path that can be cached
+	(not a component, and not a wildcard pattern).
+	"""
+	return (
+		isinstance(name, _str_t) and bool(name) and
+		not _not_plain_name_chars.intersection(name)
+	)
+
+
+class PathCache(object):
+	"""
+	Cache of DAG-nodes' full paths.
+
+	Each alias (a name the node was requested with) points to the full path.
+	Paths are kept per instance: instances share a UUID, but each has it's own path.
+	UUIDs and the ancestors index (path -> cached descendants) are used only for invalidation,
+	so each change touches only the entries it affects.
+
+	:param use_callbacks:
+		Whether to track renames/re-parenting/deletion via Maya callbacks.
+		If it's False (or callbacks can't be registered), the cache has to be
+		updated explicitly with **invalidate()**.
+	"""
+	def __init__(self, use_callbacks=True):
+		super(PathCache, self).__init__()
+		self.clear()
+		self.__callback_ids = list()
+		if use_callbacks:
+			self.install_callbacks()
+
+	# -----------------------------------------------------------
+	# callbacks
+
+	@property
+	def has_callbacks(self):
+		return bool(self.__callback_ids)
+
+	def install_callbacks(self):
+		"""
+		Register scene callbacks which keep the cache up-to-date.
+
+		:return: <bool> whether callbacks are registered.
+		"""
+		if self.__callback_ids:
+			return True
+		if _om is None:
+			return False
+
+		def _uuid_of(m_obj):
+			try:
+				return _om.MFnDependencyNode(m_obj).uuid().asString()
+			except RuntimeError:
+				return None
+
+		def _short_name_of(m_obj):
+			return _om.MFnDependencyNode(m_obj).name()
+
+		def _on_name_changed(m_obj, prev_name, *args):
+			if not m_obj.hasFn(_om.MFn.kDagNode):
+				return  # only DAG nodes are cached
+			try:
+				new_paths = [
+					p.fullPathName() for p in _om.MDagPath.getAllPathsTo(m_obj)
+				]
+				short_name = _short_name_of(m_obj)
+			except RuntimeError:
+				self.clear()
+				return
+			if prev_name:
+				# the old path is the parent's path plus the previous name:
+				for p in new_paths:
+					self._invalidate_path(p.rpartition('|')[0] + '|' + prev_name)
+			self._invalidate_uuid(_uuid_of(m_obj))
+			self._drop_short_aliases(short_name)
+
+		def _on_parent_removed(child, parent, *args):
+			try:
+				old_path = parent.fullPathName() + '|' + _short_name_of(child.node())
+			except RuntimeError:
+				self.clear()
+				return
+			self._invalidate_path(old_path)
+
+		def _on_parent_added(child, parent, *args):
+			try:
+				m_obj = child.node()
+				short_name = _short_name_of(m_obj)
+			except RuntimeError:
+				self.clear()
+				return
+			self._invalidate_uuid(_uuid_of(m_obj))
+			self._drop_short_aliases(short_name)
+
+		def _on_node_added(m_obj, *args):
+			try:
+				short_name = _short_name_of(m_obj)
+			except RuntimeError:
+				self.clear()
+				return
+			self._drop_short_aliases(short_name)
+
+		def _on_node_removed(m_obj, *args):
+			self._invalidate_uuid(_uuid_of(m_obj))
+
+		def _on_scene_changed(*args):
+			self.clear()
+
+		ids = self.__callback_ids
+		try:
+			ids.append(_om.MNodeMessage.addNameChangedCallback(
+				_om.MObject.kNullObj, _on_name_changed
+			))
+			ids.append(_om.MDagMessage.addParentAddedCallback(_on_parent_added))
+			ids.append(_om.MDagMessage.addParentRemovedCallback(_on_parent_removed))
+			ids.append(_om.MDGMessage.addNodeAddedCallback(_on_node_added, 'dagNode'))
+			ids.append(_om.MDGMessage.addNodeRemovedCallback(_on_node_removed, 'dagNode'))
+			for msg in (
+				_om.MSceneMessage.kAfterNew,
+				_om.MSceneMessage.kAfterOpen,
+				_om.MSceneMessage.kAfterImport,
+				_om.MSceneMessage.kAfterCreateReference,
+				_om.MSceneMessage.kAfterRemoveReference,
+			):
+				ids.append(_om.MSceneMessage.addCallback(msg, _on_scene_changed))
+		except RuntimeError:
+			self.remove_callbacks()
+			return False
+		return True
+
+	def remove_callbacks(self):
+		"""
+		Un-register the scene callbacks. The cache is cleared, since it can't be trusted anymore.
+		"""
+		ids = self.__callback_ids
+		if ids and _om is not None:
+			for cb_id in ids:
+				try:
+					_om.MMessage.removeCallback(cb_id)
+				except RuntimeError:
+					pass
+		self.__callback_ids = list()
+		self.clear()
+
+	# -----------------------------------------------------------
+	# invalidation
+
+	def clear(self):
+		"""
+		Forget everything.
+		"""
+		self.__aliases = dict()  # type: dict[_str_h, _str_h]
+		self.__path_aliases = dict()  # type: dict[_str_h, set[_str_h]]
+		self.__path_uuids = dict()  # type: dict[_str_h, _str_h]
+		self.__uuid_paths = dict()  # type: dict[_str_h, set[_str_h]]
+		self.__under = dict()  # type: dict[_str_h, set[_str_h]]
+		self.__short_aliases = dict()  # type: dict[_str_h, set[_str_h]]
+
+	@staticmethod
+	def _ancestors(path):
+		"""
+		All the ancestor paths of the full path: '|a|b|c' -> '|a', '|a|b'.
+		"""
+		i = path.find('|', 1)
+		while i > 0:
+			yield path[:i]
+			i = path.find('|', i + 1)
+
+	def __add_alias(self, alias, path):
+		aliases = self.__aliases
+		prev = aliases.get(alias)
+		if prev is not None and prev != path:
+			self.__path_aliases.get(prev, set()).discard(alias)
+		aliases[alias] = path
+		self.__path_aliases.setdefault(path, set()).add(alias)
+		if not alias.startswith('|'):
+			short = alias.rpartition('|')[2]
+			self.__short_aliases.setdefault(short, set()).add(alias)
+
+	def __add(self, alias, path, uuid):
+		if path not in self.__path_uuids:
+			self.__path_uuids[path] = uuid
+			self.__uuid_paths.setdefault(uuid, set()).add(path)
+			under = self.__under
+			for anc in PathCache._ancestors(path):
+				under.setdefault(anc, set()).add(path)
+		self.__add_alias(path, path)
+		self.__add_alias(alias, path)
+
+	def __drop_path(self, path):
+		uuid = self.__path_uuids.pop(path, None)
+		if uuid is None:
+			return
+		uuid_paths = self.__uuid_paths.get(uuid)
+		if uuid_paths is not None:
+			uuid_paths.discard(path)
+			if not uuid_paths:
+				del self.__uuid_paths[uuid]
+		under = self.__under
+		for anc in PathCache._ancestors(path):
+			descendants = under.get(anc)
+			if descendants is not None:
+				descendants.discard(path)
+				if not descendants:
+					del under[anc]
+		aliases = self.__aliases
+		short_aliases = self.__short_aliases
+		for alias in self.__path_aliases.pop(path, ()):
+			if aliases.get(alias) == path:
+				del aliases[alias]
+			if not alias.startswith('|'):
+				shorts = short_aliases.get(alias.rpartition('|')[2])
+				if shorts is not None:
+					shorts.discard(alias)
+
+	def _invalidate_uuid(self, uuid):
+		"""
+		Drop the node with the given UUID (all it's instances) and all their cached descendants.
+		"""
+		if uuid is None:
+			# we don't know what's changed, so drop everything:
+			self.clear()
+			return
+		for path in list(self.__uuid_paths.get(uuid, ())):
+			self.__invalidate_subtree(path)
+
+	def _invalidate_path(self, path):
+		"""
+		Drop everything cached under the given full path (as it was before the change).
+		"""
+		if not path or not path.startswith('|'):
+			# the old path can't be built reliably:
+			self.clear()
+			return
+		self.__invalidate_subtree(path.rstrip('|'))
+
+	def _drop_short_aliases(self, short_name):
+		"""
+		Drop all the partial-name aliases ending with the given short name:
+		with another node named the same, they may resolve to a different node now.
+		"""
+		if not short_name:
+			self.clear()
+			return
+		aliases = self.__aliases
+		path_aliases = self.__path_aliases
+		for alias in self.__short_aliases.pop(short_name, ()):
+			path = aliases.pop(alias, None)
+			if path is not None:
+				path_aliases.get(path, set()).discard(alias)
+
+	def __invalidate_subtree(self, path):
+		"""
+		Only the affected entries are touched: the cached descendants are known from the index.
+		"""
+		dropped = list(self.__under.get(path, ()))
+		if path in self.__path_uuids:
+			dropped.append(path)
+		for p in dropped:
+			self.__drop_path(p)
+
+	def invalidate(self, nodes=None):
+		"""
+		Explicitly drop the given nodes (and their descendants) from the cache.
+
+		Call it after renaming/re-parenting nodes if the cache doesn't use callbacks.
+
+		:param nodes:
+			Node names (as they were **before** the change) or UUIDs.
+			If None, the entire cache is cleared.
+		"""
+		if nodes is None:
+			self.clear()
+			return
+		if isinstance(nodes, _str_t):
+			nodes = [nodes]
+		aliases = self.__aliases
+		for n in nodes:
+			if n in self.__uuid_paths:
+				self._invalidate_uuid(n)
+				continue
+			path = aliases.get(n)
+			if path is not None:
+				self.__invalidate_subtree(path)
+				continue
+			if n.startswith('|'):
+				self.__invalidate_subtree(n.rstrip('|'))
+			else:
+				# a partial name that's not cached itself: we can't tell what's under it
+				self.clear()
+				return
+
+	# -----------------------------------------------------------
+	# queries
+
+	def __resolve(self, name):
+		"""
+		Query Maya for the full path and UUID of a single node, and cache them.
+
+		:return: <str / None> full path, None if it's not a single existing node.
+		"""
+		full = cmds.ls(name, long=True)
+		if not full or len(full) > 1:
+			return None
+		full = full[0]
+		uuid = cmds.ls(full, uuid=True)
+		if not uuid:
+			return full
+		self.__add(name, full, uuid[0])
+		return full
+
+	def full_path(self, name):
+		"""
+		Full path of a single node, or None if it's not found.
+
+		:type name: str|unicode
+		:rtype: str|unicode|None
+		"""
+		path = self.__aliases.get(name)
+		if path is not None:
+			return path
+		return self.__resolve(name)
+
+	def full_paths(self, names):
+		"""
+		Convert a list of names to the full paths, the same way as <ls -long> does.
+
+		Plain names are resolved through the cache, anything else (components,
+		wildcards) is passed to Maya.
+
+		:type names: list[str|unicode]
+		:rtype: list[str|unicode]
+		"""
+		res = list()
+		for nm in names:
+			path = self.full_path(nm) if is_plain_name(nm) else None
+			if path is None:
+				res.extend(cmds.ls(nm, long=True) or [])
+				continue
+			res.append(path)
+		return res
+
+
+_cache = None  # type: PathCache|None
+_enabled = True
+_explicit = False  # the shared cache is used without callbacks on purpose
+
+
+def get_cache():
+	"""
+	The shared cache used by <ls.convert.hierarchy>.
+
+	It's created on first use. If scene callbacks can't be registered, None is returned
+	(unless the cache is enabled explicitly with **enable(use_callbacks=False)**),
+	so the caller needs to query Maya directly.
+
+	:rtype: PathCache|None
+	"""
+	global _cache
+	if not _enabled:
+		return None
+	if _cache is None:
+		_cache = PathCache(use_callbacks=not _explicit)
+	if _explicit or _cache.has_callbacks or _cache.install_callbacks():
+		return _cache
+	return None
+
+
+def enable(use_callbacks=True):
+	"""
+	Turn the shared cache on.
+
+	:param use_callbacks:
+		When False, the cache works without scene callbacks (i.e., in headless
+		batch runs). In this case you're responsible for calling **invalidate()**
+		after each rename/re-parent.
+	:rtype: PathCache
+	"""
+	global _cache, _enabled, _explicit
+	_enabled = True
+	_explicit = not use_callbacks
+	if _cache is None:
+		_cache = PathCache(use_callbacks=use_callbacks)
+	elif use_callbacks:
+		_cache.install_callbacks()
+	else:
+		_cache.remove_callbacks()
+	return _cache
+
+
+def disable():
+	"""
+	Turn the shared cache off: all the queries go to Maya directly.
+	"""
+	global _cache, _enabled, _explicit
+	_enabled = False
+	_explicit = False
+	if _cache is not None:
+		_cache.remove_callbacks()
+	_cache = None
+
+
+def invalidate(nodes=None):
+	"""
+	Drop the given nodes (and their descendants) from the shared cache.
+	See **PathCache.invalidate()**.
+	"""
+	if _cache is not None:
+		_cache.invalidate(nodes)
@@ -0,0 +1,328 @@
+"""
+An in-memory snapshot of the DAG hierarchy.
+
+The whole scene DAG is listed once, and the parent/children/shape/type/intermediate
+data is stored in plain arrays indexed by node id (the position of the DAG path
+in the snapshot). All the hierarchy queries are then answered without any calls to Maya.
+
+The snapshot doesn't track scene changes. After any edit affecting the hierarchy
+(parenting, deletion, renaming, etc.), call **invalidate()**: the snapshot is rebuilt
+on the next query. Or call **refresh()** to rebuild it right away.
+
+All the nodes are returned as full-path strings. Instanced nodes have
+multiple paths, each of them gets it's own id.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+from maya import cmds
+
+from drl_py23 import (
+	str_t as _str_t,
+	str_h as _str_h,
+)
+
+_ls_all_kwargs = dict(dag=True, long=True, allPaths=True)
+
+
+class DagSnapshot(object):
+	"""
+	Hierarchy of the entire scene DAG, captured in one traversal.
+
+	:param build: whether to build the snapshot right away (default).
+		If False, it's built lazily on the first query.
+	"""
+	def __init__(self, build=True):
+		super(DagSnapshot, self).__init__()
+		self.__valid = False
+		self.__ids = dict()  # type: dict[_str_h, int]
+		self.__paths = list()  # type: list[_str_h]
+		self.__uuids = list()  # type: list[_str_h]
+		self.__types = list()  # type: list[_str_h]
+		self.__parent = list()  # type: list[int]
+		self.__children = list()  # type: list[list[int]]
+		self.__is_shape = list()  # type: list[bool]
+		self.__is_intermediate = list()  # type: list[bool]
+		self.__ids_by_uuid = dict()  # type: dict[_str_h, list[int]]
+		if build:
+			self.refresh()
+
+	# -----------------------------------------------------------
+	# building / invalidation
+
+	def refresh(self):
+		"""
+		(Re)build the snapshot from the current state of the scene.
+
+		:return: self
+		"""
+		typed = cmds.ls(showType=True, **_ls_all_kwargs) or []
+		paths = typed[0::2]
+		types = typed[1::2]
+		uuids = cmds.ls(uuid=True, **_ls_all_kwargs) or []
+		if len(uuids) != len(paths):
+			# shouldn't happen, but the ids are optional anyway:
+			uuids = [None] * len(paths)
+		shapes = set(cmds.ls(shapes=True, **_ls_all_kwargs) or [])
+		intermediates = set(cmds.ls(intermediateObjects=True, **_ls_all_kwargs) or [])
+
+		ids = dict((p, i) for i, p in enumerate(paths))
+		parent = [-1] * len(paths)
+		children = [list() for _ in paths]
+		ids_by_uuid = dict()
+		for i, p in enumerate(paths):
+			parent_path = p.rsplit('|', 1)[0]
+			parent_id = ids.get(parent_path, -1) if parent_path else -1
+			parent[i] = parent_id
+			if parent_id > -1:
+				children[parent_id].append(i)
+			ids_by_uuid.setdefault(uuids[i], list()).append(i)
+
+		self.__ids = ids
+		self.__paths = paths
+		self.__uuids = uuids
+		self.__types = types
+		self.__parent = parent
+		self.__children = children
+		self.__is_shape = [p in shapes for p in paths]
+		self.__is_intermediate = [p in intermediates for p in paths]
+		self.__ids_by_uuid = ids_by_uuid
+		self.__valid = True
+		return self
+
+	def invalidate(self):
+		"""
+		Mark the snapshot as outdated. It will be rebuilt on the next query.
+
+		Call it after any scene edit that affects the hierarchy.
+
+		:return: self
+		"""
+		self.__valid = False
+		return self
+
+	@property
+	def valid(self):
+		return self.__valid
+
+	def __ensure_valid(self):
+		if not self.__valid:
+			self.refresh()
+
+	# -----------------------------------------------------------
+	# ids
+
+	def node_id(self, node):
+		"""
+		Convert a DAG node (string / PyNode / component) to it's id in the snapshot.
+
+		:return: <int / None> None if the node isn't in the snapshot.
+		"""
+		self.__ensure_valid()
+		if not isinstance(node, _str_t):
+			# PyNode:
+			if hasattr(node, 'node') and not hasattr(node, 'longName'):
+				# component
+				node = node.node()
+			node = node.longName() if hasattr(node, 'longName') else node.name()
+		node = node.partition('.')[0]
+		ids = self.__ids
+		if node in ids:
+			return ids[node]
+		full = cmds.ls(node, long=True)
+		if not full:
+			return None
+		return ids.get(full[0])
+
+	def node_ids(self, nodes):
+		if isinstance(nodes, _str_t) or not isinstance(nodes, (list, tuple, set)):
+			nodes = [nodes]
+		res = (self.node_id(n) for n in nodes)
+		return [i for i in res if i is not None]
+
+	def path(self, node_id):
+		"""
+		:return: full path of the node with the given id.
+		:rtype: str
+		"""
+		self.__ensure_valid()
+		return self.__paths[node_id]
+
+	def paths(self, node_ids):
+		paths = self.__paths
+		return [paths[i] for i in node_ids]
+
+	def __contains__(self, node):
+		return self.node_id(node) is not None
+
+	def __len__(self):
+		self.__ensure_valid()
+		return len(self.__paths)
+
+	# -----------------------------------------------------------
+	# per-node data
+
+	def node_type(self, node):
+		i = self.node_id(node)
+		return None if i is None else self.__types[i]
+
+	def uuid(self, node):
+		i = self.node_id(node)
+		return None if i is None else self.__uuids[i]
+
+	def is_shape(self, node):
+		i = self.node_id(node)
+		return i is not None and self.__is_shape[i]
+
+	def is_intermediate(self, node):
+		i = self.node_id(node)
+		return i is not None and self.__is_intermediate[i]
+
+	# -----------------------------------------------------------
+	# hierarchy queries, working with ids
+
+	def _filter_ids(self, ids, shapes=True, transforms=True, include_intermediate=False):
+		is_shape = self.__is_shape
+		is_intermediate = self.__is_intermediate
+		return [
+			i for i in ids
+			if (
+				(shapes if is_shape[i] else transforms) and
+				(include_intermediate or not is_intermediate[i])
+			)
+		]
+
+	def _children_ids(self, node_ids):
+		children = self.__children
+		res = list()
+		for i in node_ids:
+			res.extend(children[i])
+		return res
+
+	def _descendant_ids(self, node_ids):
+		"""
+		All the descendants, depth-first, each parent before it's children.
+		"""
+		children = self.__children
+		res = list()
+		res_append = res.append
+		for i in node_ids:
+			stack = list(reversed(children[i]))
+			while stack:
+				c = stack.pop()
+				res_append(c)
+				stack.extend(reversed(children[c]))
+		return res
+
+	def _instance_parent_ids(self, node_id):
+		"""
+		Immediate parents of all the instances of the node.
+		The same as <listRelatives -allParents>.
+		"""
+		parent = self.__parent
+		uuid = self.__uuids[node_id]
+		instances = self.__ids_by_uuid.get(uuid) if uuid is not None else None
+		if not instances:
+			instances = [node_id]
+		res = list()
+		for i in instances:
+			p = parent[i]
+			if p > -1 and p not in res:
+				res.append(p)
+		return res
+
+	def _ancestor_ids(self, node_id):
+		parent = self.__parent
+		res = list()
+		p = parent[node_id]
+		while p > -1:
+			res.append(p)
+			p = parent[p]
+		return res
+
+	# -----------------------------------------------------------
+	# hierarchy queries, working with paths
+
+	def parent(self, node):
+		"""
+		:return: the immediate parent's path, or None for world-level nodes.
+		:rtype: str|None
+		"""
+		i = self.node_id(node)
+		if i is None:
+			return None
+		p = self.__parent[i]
+		return None if p < 0 else self.__paths[p]
+
+	def parents(self, nodes):
+		"""
+		Immediate parents of the given nodes. The same as <listRelatives -parent>.
+
+		:rtype: list[str]
+		"""
+		parent = self.__parent
+		res = list()
+		for i in self.node_ids(nodes):
+			p = parent[i]
+			if p > -1:
+				res.append(p)
+		return self.paths(res)
+
+	def all_parents(self, nodes):
+		"""
+		Immediate parents of all the instances of each given node.
+		The same as <listRelatives -allParents>.
+
+		:rtype: list[str]
+		"""
+		res = list()
+		for i in self.node_ids(nodes):
+			res.extend(self._instance_parent_ids(i))
+		return self.paths(res)
+
+	def ancestors(self, node):
+		"""
+		The whole chain of parents, from the immediate one up to the world-level.
+
+		:rtype: list[str]
+		"""
+		i = self.node_id(node)
+		if i is None:
+			return list()
+		return self.paths(self._ancestor_ids(i))
+
+	def children(self, nodes, shapes=True, transforms=True, include_intermediate=False):
+		"""
+		Immediate children of the given nodes. The same as <listRelatives -children>.
+
+		:rtype: list[str]
+		"""
+		ids = self._children_ids(self.node_ids(nodes))
+		return self.paths(self._filter_ids(ids, shapes, transforms, include_intermediate))
+
+	def descendants(self, nodes, shapes=True, transforms=True, include_intermediate=False):
+		"""
+		The entire hierarchy under the given nodes. The same as <listRelatives -allDescendents>
+		(except for the order: here, each parent goes before it's children).
+
+		:rtype: list[str]
+		"""
+		ids = self._descendant_ids(self.node_ids(nodes))
+		return self.paths(self._filter_ids(ids, shapes, transforms, include_intermediate))
+
+	def shapes(self, nodes, include_intermediate=False):
+		"""
+		Immediate child shapes of the given transforms. The same as <listRelatives -shapes>.
+
+		:rtype: list[str]
+		"""
+		return self.children(nodes, True, False, include_intermediate)
+
+	def all_nodes(self, no_shapes=False, include_intermediate=True):
+		"""
+		All the DAG nodes in the scene.
+
+		:rtype: list[str]
+		"""
+		self.__ensure_valid()
+		ids = range(len(self.__paths))
+		return self.paths(self._filter_ids(ids, not no_shapes, True, include_intermediate))
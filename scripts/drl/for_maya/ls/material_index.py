@@ -0,0 +1,423 @@
+"""
+A scene-wide snapshot of material assignments.
+
+Instead of querying shading groups for each shape again and again,
+the whole scene is traversed once (each **shadingEngine** node is queried
+a single time) and the result is stored in plain dictionaries.
+The snapshot is then queried in memory, so it's intended to be built once
+and reused for the entire tool run (i.e., the whole export process).
+
+The snapshot doesn't track scene changes by itself. After re-assigning materials
+(or any other scene edit affecting them), call **refresh()** explicitly.
+
+When only a few shapes are of interest (i.e., the pieces of a single object),
+the snapshot can be limited to them: then only their SGs are traversed.
+
+All the nodes are stored as full-path strings.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import re as _re
+from maya import cmds
+
+from drl_py23 import (
+	str_t as _str_t,
+	str_h as _str_h,
+)
+
+_t_str_list_tuple = tuple(list(_str_t) + [list, tuple, set])
+
+_re_face_comp = _re.compile(r'^f\[(\d+)(?::(\d+))?\]$')
+
+# the attribute of SG which material is connected to (the same one <SGs_to_materials()> uses):
+_mat_attr = 'surfaceShader'
+
+
+def _parse_face_range(comp):
+	"""
+	Convert the component part of the SG member (i.e., **'f[3:7]'**)
+	to a range of face indices.
+
+	:param comp: the component string without the node name.
+	:return:
+		<tuple of 2 ints / None>
+			* (start, end) indices, both inclusive.
+			* None if it's not a poly-face range (NURBS face, etc).
+	"""
+	match = _re_face_comp.match(comp)
+	if match is None:
+		return None
+	start, end = match.groups()
+	start = int(start)
+	end = start if end is None else int(end)
+	return start, end
+
+
+def _merge_ranges(ranges):
+	"""
+	Sort the given (start, end) ranges and merge the overlapping/adjacent ones.
+
+	:type ranges: list[tuple[int, int]]
+	:rtype: tuple[tuple[int, int]]
+	"""
+	if not ranges:
+		return tuple()
+	ranges = sorted(ranges)
+	res = [list(ranges[0])]
+	for start, end in ranges[1:]:
+		last = res[-1]
+		if start <= last[1] + 1:
+			if end > last[1]:
+				last[1] = end
+			continue
+		res.append([start, end])
+	return tuple(tuple(r) for r in res)
+
+
+class MaterialIndex(object):
+	"""
+	A snapshot of all the material assignments in the scene, built in a single pass.
+
+	It contains the following direct maps:
+		* SG -> material
+		* SG -> shapes (the SG is assigned to either the whole shape or to some of it's faces)
+		* SG -> face ranges (for each shape the SG is assigned to per-face)
+
+	... and the inverse ones:
+		* material -> SGs
+		* shape -> SGs
+
+	:param build: whether to build the snapshot right away (default).
+		If False, it's built lazily on the first query.
+	:param shapes:
+		If given, the snapshot is limited to these shapes (or transforms' shapes):
+		only the SGs assigned to them are traversed, and only their members are kept.
+		By default, it's the entire scene.
+	"""
+	def __init__(self, build=True, shapes=None):
+		super(MaterialIndex, self).__init__()
+		self.__built = False
+		self.__scope = None if shapes is None else list(
+			[shapes] if isinstance(shapes, _str_t) else shapes
+		)
+		self.__path_cache = dict()
+		self.__sg_mat = dict()  # type: dict[_str_h, _str_h]
+		self.__sg_shapes = dict()  # type: dict[_str_h, tuple[_str_h]]
+		self.__sg_whole = dict()  # type: dict[_str_h, frozenset[_str_h]]
+		self.__sg_faces = dict()  # type: dict[_str_h, dict[_str_h, tuple]]
+		self.__sg_other_comps = dict()  # type: dict[_str_h, dict[_str_h, tuple[_str_h]]]
+		self.__mat_sgs = dict()  # type: dict[_str_h, tuple[_str_h]]
+		self.__shape_sgs = dict()  # type: dict[_str_h, tuple[_str_h]]
+		self.__face_counts = dict()  # type: dict[_str_h, int]
+		if build:
+			self.refresh()
+
+	# -----------------------------------------------------------
+	# building the snapshot
+
+	def __node_to_shape(self, node):
+		"""
+		Convert the node part of the SG member to the full path of the shape.
+
+		Components may be listed by SG with their transform's name
+		(i.e., **'pCube1.f[0:5]'**), so transforms are converted to their
+		first non-intermediate shape.
+
+		:return: <str / None> full path to the shape.
+		"""
+		cache = self.__path_cache
+		if node in cache:
+			return cache[node]
+		res = None
+		full = cmds.ls(node, long=True)
+		if full:
+			res = full[0]
+			if cmds.objectType(res, isAType='transform'):
+				shapes = cmds.listRelatives(
+					res, shapes=True, noIntermediate=True, fullPath=True
+				)
+				res = shapes[0] if shapes else None
+		cache[node] = res
+		return res
+
+	@staticmethod
+	def __sg_material(sg):
+		connected = cmds.listConnections(
+			'{0}.{1}'.format(sg, _mat_attr), s=True, d=False
+		)
+		return connected[0] if connected else None
+
+	def __scoped_sgs(self):
+		"""
+		For the limited snapshot: SGs to traverse, the full paths of the shapes in scope,
+		and the short names their SG members may be listed with (shapes' and transforms').
+
+		:return: <tuple> (sgs, paths, short names). All None for the scene-wide snapshot.
+		"""
+		if self.__scope is None:
+			return None, None, None
+		paths = set()
+		for node in self.__scope:
+			shape = self._to_path(node)
+			if shape is not None:
+				paths.add(shape)
+		names = set()
+		for p in paths:
+			parent, _, short = p.rpartition('|')
+			names.add(short)
+			names.add(parent.rpartition('|')[2])
+		sgs = set(cmds.listConnections(
+			list(paths), type='shadingEngine', s=False, d=True
+		) or []) if paths else set()
+		return sgs, paths, names
+
+	def refresh(self):
+		"""
+		(Re)build the snapshot from the current state of the scene.
+
+		:return: self
+		"""
+		self.__path_cache = dict()
+		sg_mat = dict()
+		sg_shapes = dict()
+		sg_whole = dict()
+		sg_faces = dict()
+		sg_other_comps = dict()
+		mat_sgs = dict()
+		shape_sgs = dict()
+
+		node_to_shape = self.__node_to_shape
+		scope_sgs, scope_paths, scope_names = self.__scoped_sgs()
+		if scope_sgs is None:
+			scope_sgs = cmds.ls(type='shadingEngine') or []
+
+		for sg in sorted(scope_sgs):
+			mat = MaterialIndex.__sg_material(sg)
+			sg_mat[sg] = mat
+			if mat is not None:
+				mat_sgs.setdefault(mat, list()).append(sg)
+
+			whole = set()
+			faces = dict()  # shape -> list of ranges
+			other_comps = dict()  # shape -> list of component strings
+			shapes = list()  # keep the order of appearance
+
+			for member in cmds.sets(sg, q=True) or []:
+				node, _, comp = member.partition('.')
+				if scope_names is not None and node.rpartition('|')[2] not in scope_names:
+					continue  # cheap check before resolving the path
+				shape = node_to_shape(node)
+				if shape is None:
+					continue
+				if scope_paths is not None and shape not in scope_paths:
+					continue
+				if shape not in whole and shape not in faces and shape not in other_comps:
+					shapes.append(shape)
+				if not comp:
+					whole.add(shape)
+					continue
+				face_range = _parse_face_range(comp)
+				if face_range is None:
+					other_comps.setdefault(shape, list()).append(comp)
+					continue
+				faces.setdefault(shape, list()).append(face_range)
+
+			sg_shapes[sg] = tuple(shapes)
+			sg_whole[sg] = frozenset(whole)
+			sg_faces[sg] = {s: _merge_ranges(r) for s, r in faces.items()}
+			sg_other_comps[sg] = {s: tuple(c) for s, c in other_comps.items()}
+			for s in shapes:
+				shape_sgs.setdefault(s, list()).append(sg)
+
+		self.__sg_mat = sg_mat
+		self.__sg_shapes = sg_shapes
+		self.__sg_whole = sg_whole
+		self.__sg_faces = sg_faces
+		self.__sg_other_comps = sg_other_comps
+		self.__mat_sgs = {m: tuple(sgs) for m, sgs in mat_sgs.items()}
+		self.__shape_sgs = {s: tuple(sgs) for s, sgs in shape_sgs.items()}
+		self.__face_counts = dict()
+		self.__built = True
+		return self
+
+	def __ensure_built(self):
+		if not self.__built:
+			self.refresh()
+
+	@property
+	def built(self):
+		return self.__built
+
+	# -----------------------------------------------------------
+	# input conversion
+
+	def _to_path(self, node):
+		"""
+		Convert a given shape/transform (string or PyNode) to the full path of the shape,
+		the way it's stored in the snapshot.
+		"""
+		if not isinstance(node, _str_t):
+			# PyNode:
+			node = node.name()
+		node = node.partition('.')[0]
+		return self.__node_to_shape(node)
+
+	def _to_paths(self, nodes):
+		if isinstance(nodes, _str_t) or not isinstance(nodes, _t_str_list_tuple):
+			nodes = [nodes]
+		res = [self._to_path(n) for n in nodes]
+		return [p for p in res if p is not None]
+
+	# -----------------------------------------------------------
+	# queries
+
+	def shading_groups(self):
+		"""
+		:return: All the SGs in the scene (or the ones assigned to the shapes in scope).
+		:rtype: list[str]
+		"""
+		self.__ensure_built()
+		return sorted(self.__sg_mat.keys())
+
+	def sg_to_material(self, sg):
+		"""
+		:return: the material connected to SG, or None.
+		:rtype: str|None
+		"""
+		self.__ensure_built()
+		return self.__sg_mat.get(sg)
+
+	def material_to_sgs(self, material):
+		"""
+		:return: SGs the given material is connected to.
+		:rtype: tuple[str]
+		"""
+		self.__ensure_built()
+		return self.__mat_sgs.get(material, tuple())
+
+	def sg_to_shapes(self, sg):
+		"""
+		:return: full paths to shapes the SG is assigned to (entirely or per-face).
+		:rtype: tuple[str]
+		"""
+		self.__ensure_built()
+		return self.__sg_shapes.get(sg, tuple())
+
+	def sg_to_face_ranges(self, sg, shape=None):
+		"""
+		Faces the SG is assigned to.
+
+		:param shape: if given, only the ranges for this shape are returned.
+		:return:
+			* when **shape** is given: <tuple of (start, end) int pairs>, both inclusive.
+			* otherwise: <dict> with shapes as keys and such tuples as values.
+		"""
+		self.__ensure_built()
+		faces = self.__sg_faces.get(sg, dict())
+		if shape is None:
+			return dict(faces)
+		return faces.get(self._to_path(shape), tuple())
+
+	def shape_to_sgs(self, shape):
+		"""
+		:return: SGs assigned to the shape (entirely or per-face), sorted.
+		:rtype: tuple[str]
+		"""
+		self.__ensure_built()
+		return self.__shape_sgs.get(self._to_path(shape), tuple())
+
+	def shape_to_materials(self, shape):
+		"""
+		:return:
+			Materials assigned to the shape, in the order of SGs.
+			SGs with no material connected are skipped.
+		:rtype: list[str]
+		"""
+		sg_mat = self.__sg_mat
+		mats = (sg_mat.get(sg) for sg in self.shape_to_sgs(shape))
+		return [m for m in mats if m is not None]
+
+	def shapes_to_materials(self, shapes):
+		"""
+		The same as **shape_to_materials()**, but for multiple shapes.
+		The result is a flat list, so it may contain duplicates.
+
+		:rtype: list[str]
+		"""
+		res = list()
+		for s in self._to_paths(shapes):
+			res.extend(self.shape_to_materials(s))
+		return res
+
+	def material_to_shapes(self, material):
+		"""
+		:return: shapes using the given material, without duplicates.
+		:rtype: list[str]
+		"""
+		res = list()
+		seen = set()
+		for sg in self.material_to_sgs(material):
+			for s in self.sg_to_shapes(sg):
+				if s in seen:
+					continue
+				seen.add(s)
+				res.append(s)
+		return res
+
+	def is_assigned_to_whole_shape(self, sg, shape):
+		"""
+		Whether the SG is assigned to the shape itself (not to it's faces).
+
+		:rtype: bool
+		"""
+		self.__ensure_built()
+		return self._to_path(shape) in self.__sg_whole.get(sg, frozenset())
+
+	def has_non_face_components(self, sg, shape):
+		"""
+		Whether the SG is assigned to any components other than poly-faces
+		(i.e., NURBS-faces).
+
+		:rtype: bool
+		"""
+		self.__ensure_built()
+		return bool(
+			self.__sg_other_comps.get(sg, dict()).get(self._to_path(shape))
+		)
+
+	def face_count(self, shape):
+		"""
+		The number of faces in the poly-shape. It's queried once and cached.
+
+		:rtype: int
+		"""
+		shape = self._to_path(shape)
+		counts = self.__face_counts
+		if shape not in counts:
+			counts[shape] = int(cmds.polyEvaluate(shape, face=True))
+		return counts[shape]
+
+	def single_face_sg(self, shape):
+		"""
+		If all the faces of the poly-shape share the same single SG,
+		assigned per-face, return this SG.
+
+		:return: <str / None>
+		"""
+		shape = self._to_path(shape)
+		sgs = self.shape_to_sgs(shape)
+		if len(sgs) != 1:
+			return None
+		sg = sgs[0]
+		if (
+			self.is_assigned_to_whole_shape(sg, shape) or
+			self.has_non_face_components(sg, shape)
+		):
+			return None
+		ranges = self.__sg_faces.get(sg, dict()).get(shape)
+		if not ranges or len(ranges) != 1:
+			return None
+		start, end = ranges[0]
+		if start != 0 or end + 1 != self.face_count(shape):
+			return None
+		return sg
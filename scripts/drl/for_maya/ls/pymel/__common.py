@@ -24,6 +24,13 @@ _t_comp_any = _pnt.comp.any
 _t_PyNode_or_str = tuple([PyNode] + list(_str_t))
 
 
+def _dag_to_py_nodes(paths):
+	"""
+	Convert full paths returned by <DagSnapshot> back to PyNodes.
+	"""
+	return [PyNode(p) for p in paths]
+
+
 def all_objects(no_shapes=True, **ls_args):
 	"""
 	Lists all the DAG objects in the scene, possibly without their shapes.
@@ -49,7 +56,7 @@ def to_objects_filter(items=None, selection_if_none=True, no_shapes=True):
 def to_objects(
 	items=None, selection_if_none=True,
 	shape_to_object=True, component_to_shape=False, remove_duplicates=False,
-	include_intermediate=False
+	include_intermediate=False, dag=None
 ):
 	"""
 	Convert given items to objects.
@@ -79,10 +86,17 @@ def to_objects(
 			*
 				When **False** (default), such intermediate nodes (shapes/transforms)
 				will be excluded from the result, even if they were in the source list.
+	:param dag:
+		Optional <ls.dag_snapshot.DagSnapshot>. If given, intermediate flags
+		are taken from it instead of querying each node.
 	:return: Transforms or Shapes.
 	:rtype: list[PyNode]
 	"""
 	items = _handle_input(items, selection_if_none)
+	is_intermediate_f = (
+		(lambda n: n.intermediateObject.get()) if dag is None
+		else dag.is_intermediate
+	)
 	comp_to_node_f = (
 		(lambda c: c.node()) if component_to_shape
 		else lambda c: c.node().parent(0)
@@ -99,7 +113,7 @@ def to_objects(
 		node = _err.WrongTypeError(
 			node, (_t_transform, _t_shape_any), 'item', 'DAG object'
 		).raise_if_needed()
-		if node.intermediateObject.get() and not include_intermediate:
+		if not include_intermediate and is_intermediate_f(node):
 			return
 		res.append(node)
 
@@ -160,7 +174,9 @@ def all_shapes(include_intermediate=False):
 	return _pm.ls(dag=True, shapes=True, noIntermediate=not include_intermediate)
 
 
-def all_parents(objects=None, selection_if_none=True, include_current_transforms=False):
+def all_parents(
+	objects=None, selection_if_none=True, include_current_transforms=False, dag=None
+):
 	"""
 	Lists all the parents of given object(s).
 
@@ -168,16 +184,22 @@ def all_parents(objects=None, selection_if_none=True, include_current_transforms
 	:param selection_if_none: whether to use selection if <objects> is None
 	:param include_current_transforms:
 		if True, objects(not shapes) from <objects> will be added to result
+	:param dag:
+		Optional <ls.dag_snapshot.DagSnapshot>. If given, the query is performed
+		in memory, without listRelatives.
 	:rtype: list[PyNode]
 	"""
 	objects = _handle_input(objects, selection_if_none)
-	parents = _pm.listRelatives(objects, allParents=True)
+	if dag is None:
+		parents = _pm.listRelatives(objects, allParents=True)
+	else:
+		parents = _dag_to_py_nodes(dag.all_parents(objects))
 	if include_current_transforms:
-		parents += [x for x in objects(objects, selection_if_none) if not x in parents]
+		parents += [x for x in to_objects(objects, False, dag=dag) if not x in parents]
 	return parents
 
 
-def to_parent(objects=None, selection_if_none=True, shape_as_object=False):
+def to_parent(objects=None, selection_if_none=True, shape_as_object=False, dag=None):
 	"""
 	The parent of a given objects.
 	It returns only the immediate parent, not all of them.
@@ -194,6 +216,9 @@ def to_parent(objects=None, selection_if_none=True, shape_as_object=False):
 		I.e., instead of returning shape's immediate transform,
 		it's parent transform is returned
 		(a parent transform of shape's transform).
+	:param dag:
+		Optional <ls.dag_snapshot.DagSnapshot>. If given, the query is performed
+		in memory, without listRelatives.
 	:rtype: list[PyNode]
 	"""
 	kw_args = dict(
@@ -208,16 +233,18 @@ def to_parent(objects=None, selection_if_none=True, shape_as_object=False):
 
 	objects = to_objects(
 		objects, selection_if_none,
-		remove_duplicates=True,
+		remove_duplicates=True, dag=dag,
 		**kw_args
 	)
+	if dag is not None:
+		return _dag_to_py_nodes(dag.parents(objects))
 	return _pm.listRelatives(objects, parent=True)
 
 
 def to_hierarchy(
 	items=None, selection_if_none=True,
 	from_shape_transforms=False, keep_shapes=False, keep_source_objects=True,
-	remove_duplicates=False, include_intermediate=False
+	remove_duplicates=False, include_intermediate=False, dag=None
 ):
 	"""
 	Converts given list of objects to their entire hierarchies.
@@ -247,20 +274,29 @@ def to_hierarchy(
 		(and can just turn result to a set).
 	:param include_intermediate:
 		Also list shapes that aren't displayed but used in history.
+	:param dag:
+		Optional <ls.dag_snapshot.DagSnapshot>. If given, the query is performed
+		in memory, without listRelatives.
 	:rtype: list[PyNode]
 	"""
 	items = to_objects(
 		items, selection_if_none,
-		shape_to_object=from_shape_transforms, component_to_shape=(not from_shape_transforms)
+		shape_to_object=from_shape_transforms, component_to_shape=(not from_shape_transforms),
+		dag=dag
 	)
 	res = list()
 	if keep_source_objects:
 		res = items[:]
 
-	res.extend([
-		i for i in _pm.listRelatives(items, allDescendents=1, noIntermediate=not include_intermediate)
-		if keep_shapes or not isinstance(i, _t_shape_any)
-	])
+	if dag is not None:
+		res.extend(_dag_to_py_nodes(dag.descendants(
+			items, shapes=keep_shapes, include_intermediate=include_intermediate
+		)))
+	else:
+		res.extend([
+			i for i in _pm.listRelatives(items, allDescendents=1, noIntermediate=not include_intermediate)
+			if keep_shapes or not isinstance(i, _t_shape_any)
+		])
 
 	if remove_duplicates:
 		return _utils.remove_duplicates(res)
@@ -298,7 +334,7 @@ def to_geo_nodes(
 def to_children(
 	items=None, selection_if_none=True,
 	from_shape_transforms=False, keep_shapes=False, keep_source_objects=True,
-	remove_duplicates=False, include_intermediate=False
+	remove_duplicates=False, include_intermediate=False, dag=None
 ):
 	"""
 	Converts given list of objects to their immediate children.
@@ -327,20 +363,29 @@ def to_children(
 		(and can just turn result to a set).
 	:param include_intermediate:
 		Also list shapes that aren't displayed but used in history.
+	:param dag:
+		Optional <ls.dag_snapshot.DagSnapshot>. If given, the query is performed
+		in memory, without listRelatives.
 	:rtype: list[PyNode]
 	"""
 	items = to_objects(
 		items, selection_if_none,
-		shape_to_object=from_shape_transforms, component_to_shape=(not from_shape_transforms)
+		shape_to_object=from_shape_transforms, component_to_shape=(not from_shape_transforms),
+		dag=dag
 	)
 	res = list()
 	if keep_source_objects:
 		res = items[:]
 
-	res.extend([
-		i for i in _pm.listRelatives(items, children=1, noIntermediate=not include_intermediate)
-		if keep_shapes or not isinstance(i, _t_shape_any)
-	])
+	if dag is not None:
+		res.extend(_dag_to_py_nodes(dag.children(
+			items, shapes=keep_shapes, include_intermediate=include_intermediate
+		)))
+	else:
+		res.extend([
+			i for i in _pm.listRelatives(items, children=1, noIntermediate=not include_intermediate)
+			if keep_shapes or not isinstance(i, _t_shape_any)
+		])
 
 	if remove_duplicates:
 		return _utils.remove_duplicates(res)
@@ -481,7 +526,7 @@ def is_shape(
 def to_shapes(
 	items=None, selection_if_none=True,
 	geo_surface=False, any_geo=False, light=False, camera=False, exact_type=None,
-	remove_duplicates=False, include_intermediate=False
+	remove_duplicates=False, include_intermediate=False, dag=None
 ):
 	"""
 	Converts the given items (nodes/components) to the shapes. I.e.:
@@ -523,6 +568,10 @@ def to_shapes(
 	:param include_intermediate:
 		Also list shapes that aren't displayed but used in history.
 	:type include_intermediate: bool
+	:param dag:
+		Optional <ls.dag_snapshot.DagSnapshot>. If given, child shapes
+		are taken from it, without listRelatives.
+	:type dag: None|drl.for_maya.ls.dag_snapshot.DagSnapshot
 	:return: Shapes
 	:rtype: list[PyNode]
 	"""
@@ -530,6 +579,12 @@ def to_shapes(
 
 	# it's a function, not a variable:
 	is_right_shape = is_shape_checker_f(geo_surface, any_geo, light, camera, exact_type)
+	if dag is None:
+		child_shapes_f = lambda tr: _pm.listRelatives(
+			tr, shapes=True, noIntermediate=not include_intermediate
+		)
+	else:
+		child_shapes_f = lambda tr: _dag_to_py_nodes(dag.shapes(tr, include_intermediate))
 
 	res = list()
 	for o in items:
@@ -540,7 +595,7 @@ def to_shapes(
 			if not(o in res):
 				res.append(o)
 		elif isinstance(o, _t_transform):
-			child_shapes = _pm.listRelatives(o, shapes=True, noIntermediate=not include_intermediate)
+			child_shapes = child_shapes_f(o)
 			res += [
 				c for c in child_shapes
 				if is_right_shape(c) and not (c in res)
@@ -3,6 +3,12 @@ __author__ = 'Lex Darlog (DRL)'
 
 from pymel import core as pm
 
+try:
+	# bulk name lookup via a single selection list:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
+
 try:
 	# support type hints in Python 3:
 	import typing as _t
@@ -12,10 +18,18 @@ from drl_py23 import (
 	str_t as _str_t,
 	str_hint as _str_h,
 )
-from collections import (
-	Iterable as _Iterable,
-	Iterator as _Iterator,
-)
+try:
+	from collections.abc import (
+		Iterable as _Iterable,
+		Iterator as _Iterator,
+		Sequence as _Sequence,
+	)
+except ImportError:
+	from collections import (
+		Iterable as _Iterable,
+		Iterator as _Iterator,
+		Sequence as _Sequence,
+	)
 
 try:
 	_hint_item_single = _t.Union[_str_h, pm.PyNode]
@@ -56,37 +70,170 @@ def _flatten_items_gen(items, bruteforce=True, keep_strings=True):
 	"""
 	A variation of the common flatten_gen().
 	It's designed to keep PyNodes properly, not converting them to char sequences.
+
+	The nested iterables are walked with an explicit stack, not recursively,
+	so no generator is created per nesting level.
+
+	**bruteforce** and **keep_strings** apply only to the top-level items:
+	the nested ones are always walked with the defaults (strings are kept as leaves).
 	"""
-	if isinstance(items, pm.PyNode) or (
-			keep_strings and isinstance(items, _str_t)
-	):
-		# kept string or a PyNode:
+	t_kept_nested = (pm.PyNode, ) + tuple(_str_t)
+	t_kept_root = t_kept_nested if keep_strings else pm.PyNode
+
+	def _as_iter(value, t_kept=t_kept_nested, bruteforce=True):
+		"""
+		:return: iterator over the value, or None if it's a leaf element.
+		"""
+		if isinstance(value, t_kept):
+			# kept string or a PyNode:
+			return None
+		if bruteforce:
+			# we try to detect non-iterable by actually attempting to iterate over it:
+			try:
+				return iter(value)
+			except TypeError:
+				return None
+		# only those classes inherited from built-in iterable classes
+		# are considered iterables:
+		if not isinstance(value, (_Iterable, _Iterator)):
+			return None
+		return iter(value)
+
+	root = _as_iter(items, t_kept_root, bruteforce)
+	if root is None:
 		yield items
 		return
 
-	if bruteforce:
-		# we try to detect non-iterable by actually attempting to iterate over it:
+	stack = [root]
+	stack_append = stack.append
+	stack_pop = stack.pop
+	while stack:
+		for el in stack[-1]:
+			sub = _as_iter(el)
+			if sub is None:
+				yield el
+				continue
+			stack_append(sub)
+			break
+		else:
+			# the iterator on top of the stack is exhausted:
+			stack_pop()
+
+
+def _is_normalized(items):
+	"""
+	Whether the given input is already a flat list/tuple of PyNodes,
+	so it can be passed through as is.
+	"""
+	if not isinstance(items, (list, tuple)):
+		return False
+	t_py_node = pm.PyNode
+	for x in items:
+		if not isinstance(x, t_py_node):
+			return False
+	return True
+
+
+def _names_exist(names):
+	"""
+	Check in bulk whether each of the given strings is a name of a single
+	existing Maya node/component.
+
+	Each name is looked up in it's own selection list, without creating
+	any PyNodes: a shared list would merge components of the same mesh
+	into a single item.
+
+	:type names: list[str|unicode]
+	:return: for each name, whether it's found.
+	:rtype: list[bool]
+	"""
+	if _om is None:
+		from maya import cmds
+		return [len(cmds.ls(nm)) == 1 for nm in names]
+
+	t_sel = _om.MSelectionList
+	res = list()
+	res_append = res.append
+	for nm in names:
+		sel = t_sel()
 		try:
-			items = iter(items)
-		except TypeError:
-			yield items
-			return
-	else:
-		# only those classes inherited from built-in iterable classes
-		# are considered iterables:
-		if not isinstance(items, (_Iterable, _Iterator)):
-			yield items
-			return
+			sel.add(nm)
+		except RuntimeError:
+			res_append(False)
+			continue
+		# a wildcard or a non-unique name could be expanded to multiple items:
+		res_append(sel.length() == 1)
+	return res
+
+
+def _to_py_node(element):
+	if isinstance(element, pm.PyNode):
+		return element
+	if isinstance(element, _str_t):
+		return pm.PyNode(element)
+	try:
+		return pm.PyNode(element)
+	except:
+		raise NotNodeError(element, "Can't create PyNode from element: {0}")
+
+
+class LazyItems(_Sequence):
+	"""
+	A read-only sequence returned by **handle_input(lazy=True)**.
+
+	It stores the items as they were given (strings or PyNodes), already verified
+	to exist in the scene. PyNode for an element is created only when this element
+	is accessed, and then it's cached.
+
+	If only names are needed, use **names()**: it doesn't create any PyNodes.
+	"""
+	def __init__(self, elements):
+		super(LazyItems, self).__init__()
+		self.__elements = list(elements)
 
-	# it is indeed an iterable:
-	for el in items:
-		for sub in _flatten_items_gen(el):
-			yield sub
+	def __len__(self):
+		return len(self.__elements)
+
+	def __getitem__(self, index):
+		elements = self.__elements
+		if isinstance(index, slice):
+			return [self[i] for i in range(*index.indices(len(elements)))]
+		el = elements[index]
+		if isinstance(el, pm.PyNode):
+			return el
+		el = _to_py_node(el)
+		elements[index] = el
+		return el
+
+	def __iter__(self):
+		for i in range(len(self.__elements)):
+			yield self[i]
+
+	def __repr__(self):
+		return '{0}({1!r})'.format(self.__class__.__name__, self.__elements)
+
+	def names(self):
+		"""
+		Names of all the elements, without creating PyNodes.
+
+		:rtype: list[str|unicode]
+		"""
+		return [
+			x.name() if isinstance(x, pm.PyNode) else x
+			for x in self.__elements
+		]
+
+	def materialized(self):
+		"""
+		:return: a regular list of PyNodes.
+		:rtype: list[pm.PyNode]
+		"""
+		return list(self)
 
 
 def handle_input(
 	items=None,  # type: _t.Optional[_hint_item_mult]
-	selection_if_none=True, flatten=False,
+	selection_if_none=True, flatten=False, lazy=False,
 	**ls_sel_args
 ):
 	"""
@@ -97,31 +244,51 @@ def handle_input(
 	I.e., it:
 		* expands included sets/lists/tuples to the actual elements.
 		* ensures eah element is PyNode object.
+
+	If the input is already a flat list/tuple of PyNodes, it's just copied.
+	In lazy mode, string names are checked in bulk, and a PyNode is created
+	only for those elements that are actually used.
+
+	:param lazy:
+		When **True**, a **LazyItems** sequence is returned instead of a list.
+		It creates a PyNode for each element only on access,
+		so use it when the caller needs just names.
+		Ignored if **flatten** is enabled.
+		In lazy mode, it's returned for any input (empty one, selection included).
 	"""
+	lazy = lazy and not flatten
+
 	if items is None or not items:
 		if selection_if_none:
 			items = pm.ls(sl=True, **ls_sel_args)
 		else:
 			res = []  # type: _t.List[pm.PyNode]
-			return res
+			return LazyItems(res) if lazy else res
 
-	def make_py_mel(element):
-		if isinstance(element, pm.PyNode):
-			return element
-		if isinstance(element, _str_t):
-			return pm.PyNode(element)
-		try:
-			return pm.PyNode(element)
-		except:
-			raise NotNodeError(element, "Can't create PyNode from element: {0}")
+	if _is_normalized(items):
+		# fast path: nothing to flatten or convert
+		if flatten:
+			return pm.ls(items, fl=1)
+		return LazyItems(items) if lazy else list(items)
+
+	elements = list(_flatten_items_gen(items))
+
+	if lazy:
+		str_ids = [i for i, x in enumerate(elements) if isinstance(x, _str_t)]
+		if str_ids:
+			found = _names_exist([elements[i] for i in str_ids])
+			for i, is_found in zip(str_ids, found):
+				if not is_found:
+					raise NotNodeError(
+						elements[i], "Not a single existing Maya node/component: {0}"
+					)
+		return LazyItems(elements)
 
-	res_gen = map(make_py_mel, _flatten_items_gen(items))
+	res = [_to_py_node(x) for x in elements]
 	# now we're guaranteed to have a list of PyNodes in items
 
 	if flatten:
-		res = pm.ls(res_gen, fl=1)
-	else:
-		res = list(res_gen)
+		res = pm.ls(res, fl=1)
 	return res
 
 
@@ -3,7 +3,14 @@ __author__ = 'Lex Darlog (DRL)'
 from pymel import core as pm
 from drl.for_maya.ls import pymel as ls
 from drl.for_maya.geo.components import uv_sets
+from drl.for_maya.geo_math import topology as _topology
 from drl_common import errors as err
+from drl_common import utils
+
+try:
+	from maya.api import OpenMaya as _om
+except ImportError:
+	_om = None
 
 from drl.for_maya import py_node_types as _pnt
 _t_transform = _pnt.transform
@@ -20,6 +27,7 @@ __uvAttr_shortName = 'uvlSrcUV'
 __uvAttr_title = 'Source UV-set'
 
 __group_container_name = 'To_UV_Layout'
+__disconnect_chunk_size = 1000
 
 
 def __error_check_single_obj(obj, obj_name='Temp duplicate'):
@@ -107,13 +115,12 @@ def set_source_object(dup_obj, src_obj, uv_set_name=''):
 	"""
 	dup = __error_check_single_obj(dup_obj)
 	src = __error_check_single_obj(src_obj, 'Source object')
-	src.message >> __src_mesh_attr(dup)
 
 	if not uv_set_name:
 		uv_set_name = uv_sets.get_set_name(src)
 	elif not (uv_set_name in uv_sets.get_object_sets(src)):
 		raise uv_sets.NoSuchUVSetError(src, uv_set_name)
-	__src_uv_attr(dup).set(uv_set_name)
+	__link_to_source(dup, src, uv_set_name)
 
 
 def get_source_uv_set(obj):
@@ -161,75 +168,148 @@ def __get_group_container():
 	return pm.group(n=__group_container_name, world=True, empty=True)
 
 
-def __prepare_single_duplicate(src_obj, uv_set=''):
+def __link_to_source(dup, src, uv_set_name):
+	"""
+	Stores the link to the source object and it's UV-set in the duplicate. No error checks.
 	"""
-	Prepare a duplicate of a single source object. Assuming the input is correct.
+	src.message >> __src_mesh_attr(dup)
+	__src_uv_attr(dup).set(uv_set_name)
 
-	:param src_obj: source Transform/Shape to make duplicate for
-	:return: the created duplicate
+
+def __disconnect_all(nodes):
 	"""
-	src_obj = __error_check_single_obj(src_obj, 'Source object')
-	pm.delete(src_obj, ch=1)
+	Breaks all the incoming and outgoing connections of the given nodes,
+	with a few MEL evaluations (each one disconnecting up to a thousand plugs).
 
-	if (
-		bool(uv_set)
-		and uv_set != uv_sets.get_current(src_obj)
-		and (uv_set in uv_sets.get_object_sets(src_obj))
-	):
-		uv_sets.set_current_for_singe_obj(src_obj, uv_set)
+	:param nodes: list of full node paths
+	"""
+	from maya import cmds, mel
+
+	pairs = list()
+	outs = cmds.listConnections(
+		nodes, connections=1, plugs=1, destination=1, source=0
+	) or []
+	pairs.extend(zip(outs[0::2], outs[1::2]))
+	ins = cmds.listConnections(
+		nodes, connections=1, plugs=1, destination=0, source=1
+	) or []
+	pairs.extend(zip(ins[1::2], ins[0::2]))
+	pairs = utils.remove_duplicates(pairs)
+
+	for i in range(0, len(pairs), __disconnect_chunk_size):
+		mel.eval(''.join(
+			'disconnectAttr "{0}" "{1}";'.format(src, dst)
+			for src, dst in pairs[i:i + __disconnect_chunk_size]
+		))
+
+
+def __normalize_uv_sets(shapes):
+	"""
+	Leaves only the main UV-set on each of the given shapes, named 'map1'
+	and containing UVs from the set which was current.
 
-	dup = pm.duplicate(src_obj, rr=1)
-	dup = __error_check_single_obj(dup)
+	Shapes are grouped by their UV-sets layout, and each step is done for the whole group
+	with a single MEL evaluation (see <uv_sets.rename_bulk()>).
 
-	# rename and reparent to a container group:
-	parent = ls.to_parent(dup, False)
+	:param shapes: list of nt.Mesh
+	"""
+	removed = dict()  # set name -> shapes
+	renamed = dict()  # main set name -> shapes
+	for (all_sets, current), group in uv_sets.group_by_layout(shapes).items():
+		if not all_sets:
+			continue
+		main_set = all_sets[0]
+		if current and current != main_set:
+			uv_sets.copy_bulk(group, current, main_set)
+			uv_sets.set_current_bulk(group, main_set)
+		for s in all_sets[1:]:
+			removed.setdefault(s, list()).extend(group)
+		renamed.setdefault(main_set, list()).extend(group)
+
+	uv_sets.remove_bulk(removed)
+	uv_sets.rename_bulk(renamed, 'map1')
+
+
+def __prepare_duplicates(sources):
+	"""
+	Prepare duplicates for all the source objects at once. Assuming the input is correct.
+
+	Each step is performed for all the objects with a single command (or a few of them):
+		* history deletion;
+		* duplication;
+		* removing extra shapes and hierarchy;
+		* UV-sets cleanup (per group of objects with the same UV-sets);
+		* breaking connections;
+		* default material assignment.
+
+	:param sources: list of source Transforms
+	:return: list of the created duplicates, in the same order
+	"""
+	from maya import cmds
+
+	pm.delete(sources, ch=1)
+	src_sets = [
+		current for all_sets, current in uv_sets.read_layouts(
+			[__get_shape(src) for src in sources]
+		)
+	]
+
+	duplicates = pm.duplicate(sources, rr=1)
+	if len(duplicates) != len(sources):
+		raise RuntimeError(
+			'Unable to duplicate objects: {0} sources, {1} duplicates.'.format(
+				len(sources), len(duplicates)
+			)
+		)
+
+	# reparent to a container group and rename:
 	container = __get_group_container()
-	if not(parent and parent[0] == container):
-		pm.parent(dup, container)
-	pm.rename(dup, 'toUVL_' + ls.short_item_name(src_obj))
-	pm.delete(dup, ch=1)
-
-	# remove all extra shapes:
-	dup_extra_shapes = pm.listRelatives(dup, s=1)
-	if not dup_extra_shapes:
-		raise RuntimeError("Duplicate %s doesn't have any shapes." % dup)
-	assert isinstance(dup_extra_shapes, (list, tuple))
-	dup_shape = dup_extra_shapes.pop(0)
-	if dup_extra_shapes:
-		pm.delete(dup_extra_shapes)
-	err.WrongTypeError(dup_shape, pm.nt.Mesh, 'duplicate shape').raise_if_needed()
-	assert isinstance(dup_shape, pm.nt.Mesh)
-
-	# also remove any hierarchy:
-	extra_children = [x for x in pm.listRelatives(dup, children=1) if x != dup_shape]
-	if extra_children:
-		pm.delete(extra_children)
-
-	# copy current UV-set to the main one
-	src_set = uv_sets.get_current(dup)
-	if src_set != uv_sets.get_set_name(dup, 1):
-		uv_sets.copy_to_set(dup, to_set=1, from_set=src_set, selection_if_none=False)
-		uv_sets.set_current_for_singe_obj(dup, 1)
-	pm.delete(dup, ch=1)
-
-	# keep only main set:
-	uv_sets.keep_only_main_set(dup, selection_if_none=False)
-	pm.delete(dup, ch=1)
-
-	# remove all extra connections
-	for o in [dup, dup_shape]:
-		outs = o.connections(connections=1, plugs=1, destination=1, source=0)
-		ins = o.connections(connections=1, plugs=1, destination=0, source=1)
-		connections = outs + [(x[1], x[0]) for x in ins]
-		for c in connections:
-			c[0] // c[1]
-
-	# assign default material
-	pm.sets('initialShadingGroup', e=1, forceElement=dup)
-
-	set_source_object(dup, src_obj)
-
-	return dup
+	to_parent = [
+		d for d in duplicates
+		if ls.to_parent(d, False) != [container]
+	]
+	if to_parent:
+		pm.parent(to_parent, container)
+	for dup, src in zip(duplicates, sources):
+		pm.rename(dup, 'toUVL_' + ls.short_item_name(src))
+	pm.delete(duplicates, ch=1)
+
+	# remove all extra shapes and any hierarchy:
+	dup_paths = [d.longName() for d in duplicates]
+	children = cmds.listRelatives(dup_paths, children=1, fullPath=1) or []
+	shapes = set(cmds.ls(children, shapes=1, long=1) or [])
+	children_per_dup = dict((p, list()) for p in dup_paths)
+	for c in children:
+		children_per_dup[c.rsplit('|', 1)[0]].append(c)
+
+	dup_shapes = list()
+	extra = list()
+	for dup, p in zip(duplicates, dup_paths):
+		dup_children = children_per_dup[p]
+		main_shape = next((c for c in dup_children if c in shapes), None)
+		if main_shape is None:
+			raise RuntimeError("Duplicate %s doesn't have any shapes." % dup)
+		extra.extend(c for c in dup_children if c != main_shape)
+		dup_shapes.append(main_shape)
+	if extra:
+		cmds.delete(extra)
+
+	dup_shapes = [pm.PyNode(s) for s in dup_shapes]
+	for s in dup_shapes:
+		err.WrongTypeError(s, pm.nt.Mesh, 'duplicate shape').raise_if_needed()
+
+	__normalize_uv_sets(dup_shapes)
+	pm.delete(dup_shapes, ch=1)
+
+	__disconnect_all(
+		[d.longName() for d in duplicates] + [s.longName() for s in dup_shapes]
+	)
+	pm.sets('initialShadingGroup', e=1, forceElement=duplicates)
+
+	for dup, src, src_set in zip(duplicates, sources, src_sets):
+		__link_to_source(dup, src, src_set)
+
+	return duplicates
 
 
 def prepare_duplicates(objects=None, selection_if_none=True):
@@ -252,7 +332,10 @@ def prepare_duplicates(objects=None, selection_if_none=True):
 		err.WrongTypeError(
 			o, _tt_poly_geo, 'source item'
 		).raise_if_needed()
-	duplicates = [__prepare_single_duplicate(src) for src in objects]
+	sources = utils.remove_duplicates(
+		[__error_check_single_obj(o, 'Source object') for o in objects]
+	)
+	duplicates = __prepare_duplicates(sources) if sources else []
 	pm.select(duplicates, r=1)
 
 	# finally, open default UV Layout sending window
@@ -274,16 +357,85 @@ def __get_shape(obj):
 		return __get_shape(obj.getShape())
 
 
-def __transfer_from_single_duplicate(dup):
+def __mesh_fn(shape):
+	sel = _om.MSelectionList()
+	sel.add(shape.longName())
+	return _om.MFnMesh(sel.getDagPath(0))
+
+
+def __transfer_uvs_exact(dup_shape, src_shape, src_set):
+	"""
+	Copies UVs from the duplicate directly to the source's UV-set:
+	UV coordinates and their per-face assignment are matched by component IDs,
+	not sampled spatially.
+
+	It's possible only if both meshes have exactly the same topology,
+	which is verified with the connectivity hash (with API, read-only).
+	The write itself is done with <transferAttributes> in component space,
+	so it's undoable. It leaves construction history on the source,
+	which is deleted by the caller.
+
+	:param dup_shape: nt.Mesh of the duplicate
+	:param src_shape: nt.Mesh of the source object
+	:param src_set: (string) the UV-set in the source to write UVs to
+	:return: (bool) whether UVs are transferred. If not, the source isn't modified.
+	"""
+	if _om is None:
+		return False
+
+	dup_fn = __mesh_fn(dup_shape)
+	src_fn = __mesh_fn(src_shape)
+	if (
+		dup_fn.numVertices != src_fn.numVertices
+		or dup_fn.numPolygons != src_fn.numPolygons
+	):
+		return False
+
+	vertex_counts, vertex_ids = src_fn.getVertices()
+	src_hash = _topology.topology_hash(src_fn.numVertices, vertex_counts, vertex_ids)
+	dup_hash = _topology.topology_hash(dup_fn.numVertices, *dup_fn.getVertices())
+	if src_hash != dup_hash:
+		return False
+
+	dup_sets = dup_fn.getUVSetNames()
+	if not dup_sets:
+		return False
+	dup_set = 'map1' if 'map1' in dup_sets else dup_sets[0]
+	uv_counts, uv_ids = dup_fn.getAssignedUVs(dup_set)
+	if not _topology.assignment_matches(vertex_counts, uv_counts, uv_ids, dup_fn.numUVs(dup_set)):
+		return False
+
+	pm.transferAttributes(
+		dup_shape, src_shape,
+		transferPositions=0,
+		transferNormals=0,
+		transferUVs=1,
+		sourceUvSet=dup_set,
+		sourceUvSpace=dup_set,
+		targetUvSet=src_set,
+		targetUvSpace=src_set,
+		transferColors=0,
+		sampleSpace=3,  # component
+		flipUVs=0,
+		colorBorders=1
+	)
+	return True
+
+
+def __transfer_from_single_duplicate(dup, exact=True):
 	"""
 	Sending UVs back from duplicate object to it's source.
 	Works only with single object, assuming input is correct.
 
 	:param dup: a duplicate's Transform/Shape node
+	:param exact:
+		(bool) if the duplicate has the same topology as the source,
+		copy UVs directly (see **__transfer_uvs_exact()**).
+		Otherwise (or if it's False), UVs are transferred with spatial sampling.
+		Both ways are undoable.
 	:return: (nt.Transform) source object that got new UVs
 	"""
 	dup = __error_check_single_obj(dup)
-	pm.delete(dup, ch=1)
 
 	src_obj = get_source_object(dup)
 	src_set = get_source_uv_set(dup)
@@ -293,33 +445,39 @@ def __transfer_from_single_duplicate(dup):
 		uv_sets.set_current_for_singe_obj(src_obj, src_set)
 
 	src_set = uv_sets.get_current(src_obj)
-
-	pm.transferAttributes(
-		__get_shape(dup), __get_shape(src_obj),
-		transferPositions=0,
-		transferNormals=0,
-		transferUVs=1,
-		sourceUvSet="map1",
-		sourceUvSpace="map1",
-		targetUvSet=src_set,
-		targetUvSpace=src_set,
-		transferColors=0,
-		sampleSpace=4,
-		searchMethod=0,
-		flipUVs=0,
-		colorBorders=1
-	)
+	dup_shape = __get_shape(dup)
+	src_shape = __get_shape(src_obj)
+
+	if not (exact and __transfer_uvs_exact(dup_shape, src_shape, src_set)):
+		pm.transferAttributes(
+			dup_shape, src_shape,
+			transferPositions=0,
+			transferNormals=0,
+			transferUVs=1,
+			sourceUvSet="map1",
+			sourceUvSpace="map1",
+			targetUvSet=src_set,
+			targetUvSpace=src_set,
+			transferColors=0,
+			sampleSpace=4,
+			searchMethod=0,
+			flipUVs=0,
+			colorBorders=1
+		)
 
 	pm.delete(src_obj, ch=1)
 	return src_obj
 
 
-def transfer_from_duplicates(objects=None):
+def transfer_from_duplicates(objects=None, exact=True):
 	"""
 	Sends updated UVs back from duplicates to their corresponding source objects,
 	to their corresponding UV sets.
 
 	:param objects: optional list of duplicates to transfer from. If none given, all the ovjects in the default container group are taken.
+	:param exact:
+		(bool) copy UVs as-is (by component IDs) to the sources with the same topology,
+		sample the others. Undoable either way.
 	:return: (list of nt.Transform) source objects. The current selection is kept intact.
 	"""
 	prev_sel = pm.ls(sl=1)
@@ -333,7 +491,7 @@ def transfer_from_duplicates(objects=None):
 	if not objects:
 		raise RuntimeError('No temporary duplicates given to transfer their UVs.')
 
-	sources = [__transfer_from_single_duplicate(d) for d in objects]
+	sources = [__transfer_from_single_duplicate(d, exact) for d in objects]
 	pm.select(prev_sel, r=1)
 
 	return sources
@@ -11,6 +11,16 @@ from drl_py23 import (
 
 from .__grid import Grid
 from .__progress import Progress
+from .__progress_backends import (
+	ProgressBackend,
+	NullBackend,
+	UIBackend,
+	TerminalBackend,
+	JSONLinesBackend,
+	has_gui,
+	get_backend,
+	default_backend,
+)
 
 _is_py2 = _sys.version_info[0] == 2
 
@@ -18,6 +18,21 @@ from drl_py23 import (
 	t_strict_unicode as _unicode,
 )
 
+from .__throttle import Throttle
+from .__timing import (
+	Timing,
+	TimingRecord,
+	format_duration as _format_duration,
+	format_rate as _format_rate,
+	log_timing as _log_timing,
+	timing_log as _timing_log,
+	clear_timing_log as _clear_timing_log,
+)
+from .__progress_backends import (
+	ProgressBackend,
+	default_backend,
+)
+
 
 class ProgressError(Exception):
 	pass
@@ -249,8 +264,18 @@ class Progress(object):
 		message_template='Progress [{cur}/{max}]',
 		title_template='Progress: {percent}%',
 		width=400, progresses_spacing=15, label_spacing=5, id=None,
-		max_displayed=3, background=None
+		max_displayed=3, background=None, backend=None
 	):
+		"""
+		Besides the values, message/title templates may contain timing patterns:
+			* {elapsed} - time since the start (M:SS)
+			* {rate} - smoothed items per second
+			* {eta} - estimated time left (M:SS)
+
+		:param backend:
+			<ProgressBackend / None> where to report the progress when there's no UI.
+			If None, it's chosen automatically (see <default_backend()>) on the first use.
+		"""
 		super(Progress, self).__init__()
 
 		# Progress instance properties:
@@ -276,6 +301,9 @@ class Progress(object):
 		self._max_can_change = False
 		self._cur_can_change = True
 
+		# throughput:
+		self.__timing = Timing()
+
 		# message properties (for formatting):
 		self._format_patterns = {  # could be overridden in child classes
 			'cur': lambda: self.__cur_value,
@@ -285,7 +313,10 @@ class Progress(object):
 				100.0 * (self.__cur_value - self.__min_value) / self.__max_value,
 				'.2f'
 			),
-			'class': lambda: self.__class__.__name__
+			'class': lambda: self.__class__.__name__,
+			'elapsed': lambda: _format_duration(self.__timing.elapsed()),
+			'rate': lambda: _format_rate(self.__timing.rate()),
+			'eta': lambda: _format_duration(self.__timing.eta(self.__max_value)),
 		}
 		self.__message_patterns = self._format_patterns  # type: dict[str, _t.Callable[[], object]]
 		self.__title_patterns = self._format_patterns  # type: dict[str, _t.Callable[[], object]]
@@ -309,6 +340,11 @@ class Progress(object):
 
 		self._update_progress = self._update_progress_bar
 
+		# rate-limited UI updates and cancel polls:
+		self.__update_throttle = Throttle()
+		self.__cancel_throttle = Throttle()
+		self.__backend = backend  # type: Optional[ProgressBackend]
+
 		# ensuring the class has the required common variables.
 		# sic: Progress is called explicitly instead of self.__class__:
 		# this way all the child classes will use the same common values,
@@ -423,6 +459,21 @@ class Progress(object):
 	def progresses(self):
 		return tuple(Progress.__get_progresses())  # type: Tuple[Progress]
 
+
+	@staticmethod
+	def timing_log():
+		"""
+		Timing records of the finished progresses (the latest ones), oldest first.
+		The log is common with <ProgressWindow>.
+
+		:rtype: tuple[TimingRecord]
+		"""
+		return _timing_log()
+
+	@staticmethod
+	def clear_timing_log():
+		_clear_timing_log()
+
 	def _get_main_progress_or_this(self, attach_this=True):
 		"""
 		Service getter-method, which guarantees you get a proper Progress object.
@@ -597,6 +648,15 @@ class Progress(object):
 			filter(None, (self.__class__.__name__, self.id))
 		)
 
+	@property
+	def timing(self):
+		"""
+		Throughput of the current run: elapsed time, rate, ETA.
+
+		:rtype: Timing
+		"""
+		return self.__timing
+
 	@property
 	def formatting_patterns(self):
 		"""
@@ -1149,6 +1209,96 @@ class Progress(object):
 
 	# endregion
 
+	# region Progress value
+
+	@property
+	def update_interval(self):
+		"""
+		Minimum time (seconds) between UI updates and between cancel polls.
+		0 means the UI is updated on each change.
+
+		:rtype: float
+		"""
+		return self.__update_throttle.interval
+
+	@update_interval.setter
+	def update_interval(self, value):
+		value = float(value or 0.0)
+		self.__update_throttle.interval = value
+		self.__cancel_throttle.interval = value
+
+	@property
+	def backend(self):
+		"""
+		Where the progress is reported to. In interactive Maya, it's the UI backend,
+		and the progress bars themselves are used. Otherwise, it's any other backend
+		(terminal, JSON-lines log, etc.), and no UI is touched at all.
+
+		:rtype: ProgressBackend
+		"""
+		if self.__backend is None:
+			self.__backend = default_backend()
+		return self.__backend
+
+	@backend.setter
+	def backend(self, value):
+		if not (value is None or isinstance(value, ProgressBackend)):
+			raise TypeError('ProgressBackend instance expected. Got: ' + repr(value))
+		self.__backend = value
+
+	def _headless_backend(self):
+		"""
+		:return: the backend if it replaces UI, None if UI is used.
+		:rtype: ProgressBackend | None
+		"""
+		backend = self.backend
+		return None if backend.is_ui else backend
+
+	def update_ui(self):
+		"""
+		Update all the bars of this progress right away.
+		"""
+		headless = self._headless_backend()
+		if headless is not None:
+			headless.update(self.__cur_value, self.message())
+		for p_bar in self.__p_bars:
+			self._update_progress(p_bar)
+		self.__update_throttle.mark()
+
+	def set_current(self, value, force=False):
+		"""
+		Set the current progress value.
+
+		The value itself is always exact, but the UI is updated
+		at most once per **update_interval**, unless force is True.
+		"""
+		self.__cur_value = value
+		self.__timing.update(value)
+		if force or self.__update_throttle.due():
+			self.update_ui()
+
+	def increment(self, amount=1, force=False):
+		"""
+		Increment the current progress value (see **set_current()**).
+		"""
+		self.set_current(self.__cur_value + amount, force)
+
+	def is_cancelled(self):
+		"""
+		Whether the user has tried to cancel the operation (in the main progress bar).
+
+		The bar is actually polled at most once per **update_interval**.
+		"""
+		headless = self._headless_backend()
+		main = self.__p_bars.main
+		if (headless is None and main is None) or not self.__cancel_throttle.due():
+			return False
+		if headless is not None:
+			return bool(headless.is_cancelled())
+		return bool(main.getIsCancelled())
+
+	# endregion
+
 	def start(self):
 		"""
 		Prepare UI for current process and add it to the global progresses list.
@@ -1164,7 +1314,15 @@ class Progress(object):
 		Prepare UI for current process.
 		But don't touch the global progresses list.
 		"""
-		pass
+		self.__timing.start(self.__cur_value)
+		headless = self._headless_backend()
+		if headless is not None:
+			headless.start(
+				self.title(), self.message(),
+				self.__min_value, self.__max_value, self.__cur_value
+			)
+		self.__update_throttle.mark()
+		self.__cancel_throttle.reset()
 
 	def end(self):
 		"""
@@ -1189,7 +1347,23 @@ class Progress(object):
 		and stop the working process.
 		But don't touch the global progresses list.
 		"""
-		pass
+		self.__record_timing()
+		headless = self._headless_backend()
+		if headless is not None:
+			headless.end()
+
+	def __record_timing(self):
+		"""
+		Stop the timer and add the run to the common timing log.
+		"""
+		timing = self.__timing
+		if not timing.is_started:
+			return
+		_log_timing(timing.record(
+			self.window_id(), self.title(),
+			completed=self.__cur_value >= self.__max_value,
+		))
+		self.__timing = Timing(timing.smoothing, timing.sample_interval)
 
 	def __enter__(self):
 		self.start()
@@ -0,0 +1,266 @@
+"""
+Progress backends: where <ProgressWindow> and <Progress> actually report to.
+
+* UIBackend - Maya's progress window (the default in interactive Maya).
+* TerminalBackend - text lines to a stream.
+* JSONLinesBackend - a JSON object per event, with rate and ETA (for farm logs).
+* NullBackend - does nothing (the default when there's no GUI).
+
+The backend is chosen by the **DRL_PROGRESS** environment variable
+(one of: ui, terminal, json, null) or, if it's not set, by whether Maya has a GUI.
+For json, the **DRL_PROGRESS_LOG** variable may specify the file to append to.
+"""
+__author__ = 'Lex Darlog (DRL)'
+
+import json as _json
+import os as _os
+import sys as _sys
+
+from .__timing import Timing
+
+ENV_BACKEND = 'DRL_PROGRESS'
+ENV_LOG_PATH = 'DRL_PROGRESS_LOG'
+
+
+class ProgressBackend(object):
+	"""
+	The base class (and the interface) for all the progress backends.
+	It ignores everything, so it's also the null backend.
+	"""
+	is_ui = False
+
+	def start(self, title='', message='', min=0, max=100, value=0, interruptable=True):
+		pass
+
+	def update(self, value, message):
+		pass
+
+	def set_range(self, min, max):
+		pass
+
+	def set_title(self, title):
+		pass
+
+	def set_interruptable(self, value):
+		pass
+
+	def is_cancelled(self):
+		return False
+
+	def end(self):
+		pass
+
+
+class NullBackend(ProgressBackend):
+	pass
+
+
+class UIBackend(ProgressBackend):
+	"""
+	Maya's own progress window (<cmds.progressWindow>).
+	"""
+	is_ui = True
+
+	def __init__(self):
+		super(UIBackend, self).__init__()
+		from maya import cmds
+		self.__cmds = cmds
+
+	def start(self, title='', message='', min=0, max=100, value=0, interruptable=True):
+		self.__cmds.progressWindow(
+			title=title, status=message,
+			isInterruptable=interruptable,
+			min=min, max=max, progress=value
+		)
+
+	def update(self, value, message):
+		self.__cmds.progressWindow(e=True, progress=value, status=message)
+
+	def set_range(self, min, max):
+		self.__cmds.progressWindow(e=True, min=min, max=max)
+
+	def set_title(self, title):
+		self.__cmds.progressWindow(e=True, title=title)
+
+	def set_interruptable(self, value):
+		self.__cmds.progressWindow(e=True, isInterruptable=value)
+
+	def is_cancelled(self):
+		return bool(self.__cmds.progressWindow(q=True, isCancelled=True))
+
+	def end(self):
+		self.__cmds.progressWindow(endProgress=True)
+
+
+class _TimedBackend(ProgressBackend):
+	"""
+	Common base for text backends: tracks the state, and rate and ETA with <Timing>
+	(the same tracker <Progress> uses, so the numbers match).
+	"""
+	def __init__(self, stream=None):
+		super(_TimedBackend, self).__init__()
+		self.stream = stream
+		self.title = ''
+		self.message = ''
+		self.min = 0
+		self.max = 100
+		self.value = 0
+		self.timing = Timing()
+		self.__active = False
+
+	def _stream(self):
+		return _sys.stderr if self.stream is None else self.stream
+
+	def _write(self, line):
+		stream = self._stream()
+		stream.write(line + '\n')
+		try:
+			stream.flush()
+		except Exception:
+			pass
+
+	def elapsed(self):
+		return self.timing.elapsed()
+
+	def rate(self):
+		"""Smoothed items per second."""
+		return self.timing.rate()
+
+	def eta(self):
+		"""Seconds left, estimated by the smoothed rate."""
+		return self.timing.eta(self.max)
+
+	def _emit(self, event):
+		raise NotImplementedError()
+
+	def start(self, title='', message='', min=0, max=100, value=0, interruptable=True):
+		self.title = title
+		self.message = message
+		self.min = min
+		self.max = max
+		self.value = value
+		self.timing.start(value)
+		self.__active = True
+		self._emit('start')
+
+	def update(self, value, message):
+		self.value = value
+		self.message = message
+		self.timing.update(value)
+		self._emit('update')
+
+	def set_range(self, min, max):
+		self.min = min
+		self.max = max
+
+	def set_title(self, title):
+		self.title = title
+
+	def end(self):
+		if not self.__active:
+			return
+		self.__active = False
+		self.timing.stop()
+		self._emit('end')
+
+
+class TerminalBackend(_TimedBackend):
+	"""
+	Writes a human-readable line for each update.
+	"""
+	def _emit(self, event):
+		span = self.max - self.min
+		percent = 100.0 * (self.value - self.min) / span if span else 100.0
+		eta = self.eta()
+		parts = [
+			'[{0}]'.format(self.title) if self.title else '',
+			self.message,
+			'{0}/{1} ({2:.1f}%)'.format(self.value, self.max, percent),
+		]
+		if event == 'end':
+			parts.append('done in {0:.2f}s'.format(self.elapsed()))
+		elif eta is not None:
+			parts.append('ETA {0:.1f}s'.format(eta))
+		self._write(' '.join(x for x in parts if x))
+
+
+class JSONLinesBackend(_TimedBackend):
+	"""
+	Writes a JSON object per line for each event: start, update, end.
+
+	:param path: <str / None> the file to append to. If not given, the stream is used.
+	"""
+	def __init__(self, stream=None, path=None):
+		super(JSONLinesBackend, self).__init__(stream)
+		self.path = path
+
+	def _write(self, line):
+		if not self.path:
+			return super(JSONLinesBackend, self)._write(line)
+		with open(self.path, 'a') as f:
+			f.write(line + '\n')
+
+	def _emit(self, event):
+		self._write(_json.dumps(dict(
+			event=event,
+			time=round(self.elapsed(), 4),
+			title=self.title,
+			message=self.message,
+			min=self.min,
+			max=self.max,
+			value=self.value,
+			rate=self.rate(),
+			eta=self.eta(),
+		), sort_keys=True))
+
+
+def has_gui():
+	"""
+	Whether Maya runs interactively (not in batch mode / standalone / without Maya at all).
+	"""
+	try:
+		from maya import cmds
+		return not cmds.about(batch=True)
+	except Exception:
+		return False
+
+
+_backends = dict(
+	ui=UIBackend,
+	terminal=TerminalBackend,
+	json=JSONLinesBackend,
+	null=NullBackend,
+)
+
+
+def get_backend(name):
+	"""
+	Create a backend by it's name: ui, terminal, json or null.
+
+	:rtype: ProgressBackend
+	"""
+	key = (name or '').strip().lower()
+	if key not in _backends:
+		raise ValueError(
+			'Unknown progress backend: {0}. Expected one of: {1}'.format(
+				repr(name), ', '.join(sorted(_backends))
+			)
+		)
+	if key == 'json':
+		return JSONLinesBackend(path=_os.environ.get(ENV_LOG_PATH) or None)
+	return _backends[key]()
+
+
+def default_backend():
+	"""
+	Create a backend for the current environment:
+		* specified with DRL_PROGRESS environment variable, if it's set;
+		* UI, if Maya has a GUI;
+		* null otherwise.
+
+	:rtype: ProgressBackend
+	"""
+	name = _os.environ.get(ENV_BACKEND)
+	if name:
+		return get_backend(name)
+	return UIBackend() if has_gui() else NullBackend()
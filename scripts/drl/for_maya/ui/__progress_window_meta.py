@@ -1,45 +1,171 @@
 __author__ = 'Lex Darlog (DRL)'
 
-from maya import cmds
 from drl_common import errors as err
-from drl_py23 import (
-	str_t as _str_t,
-	str_h as _str_h,
+from drl_py23 import str_h as _str_h
+
+from .__throttle import Throttle
+from .__timing import (
+	Timing,
+	format_duration as _format_duration,
+	format_rate as _format_rate,
+	log_timing as _log_timing,
+)
+from .__progress_backends import (
+	ProgressBackend,
+	default_backend,
 )
 
 
 _types = (int, float)
 
 
+class _WindowState(object):
+	"""
+	The logical state of the progress window.
+
+	It's always exact, while the actual UI is updated only when the throttle allows.
+	"""
+	def __init__(self):
+		super(_WindowState, self).__init__()
+		self.min = 0
+		self.max = 100
+		self.progress = 0
+		self.message = ''
+		self.title = ''
+		self.interruptable = True
+		self.dirty = False  # progress/message changed since the last UI update
+		self.update_throttle = Throttle()
+		self.cancel_throttle = Throttle()
+		self.backend = None  # type: ProgressBackend
+		self.timing = Timing()
+		self.prev_interval = None  # to restore on end(), if the run has it's own interval
+
+
+def _backend(state):
+	if state.backend is None:
+		state.backend = default_backend()
+	return state.backend
+
+
 class _ProgressWindowMeta(type):
 	"""
 	Meta-subclass required to provide static properties.
+
+	The window is rate-limited: progress and message changes are sent to UI
+	(and the cancel state is polled) at most once per **update_interval**.
+	The values read from the class are always exact, though.
+
+	The window itself is a **backend**: Maya's progress window in interactive session,
+	or a headless one (terminal, JSON-lines log, nothing at all) in batch mode.
+
+	Each run (from start() to end()) is timed, and added to the common timing log
+	when it's finished (see <Progress.timing_log()>).
 	"""
 
+	def __init__(cls, name, bases, dct):
+		super(_ProgressWindowMeta, cls).__init__(name, bases, dct)
+		cls.__state = _WindowState()
+
+	@property
+	def update_interval(cls):
+		"""
+		<float> Minimum time (seconds) between UI updates and between cancel polls.
+		0 means the window is updated on each change.
+		"""
+		return cls.__state.update_throttle.interval
+
+	@update_interval.setter
+	def update_interval(cls, value):
+		value = float(value or 0.0)
+		state = cls.__state
+		state.update_throttle.interval = value
+		state.cancel_throttle.interval = value
+
+	@property
+	def timing(cls):
+		"""
+		Throughput of the current run: elapsed time, rate, ETA.
+
+		:rtype: Timing
+		"""
+		return cls.__state.timing
+
+	def timing_fields(cls):
+		"""
+		Formatted timing values of the current run, as keyword arguments for message formatting:
+			* elapsed - time since the start (M:SS)
+			* rate - smoothed items per second
+			* eta - estimated time left (M:SS)
+
+		:rtype: dict[str, str]
+		"""
+		state = cls.__state
+		timing = state.timing
+		return dict(
+			elapsed=_format_duration(timing.elapsed()),
+			rate=_format_rate(timing.rate()),
+			eta=_format_duration(timing.eta(state.max)),
+		)
+
+	@property
+	def backend(cls):
+		"""
+		Where the progress is actually reported to.
+		If not set explicitly, it's chosen automatically on the first use (see <default_backend()>).
+
+		:rtype: ProgressBackend
+		"""
+		return _backend(cls.__state)
+
+	@backend.setter
+	def backend(cls, value):
+		if not (value is None or isinstance(value, ProgressBackend)):
+			raise TypeError('ProgressBackend instance expected. Got: ' + repr(value))
+		cls.__state.backend = value
+
+	def flush(cls):
+		"""
+		Send the pending progress/message changes to UI right away.
+		"""
+		state = cls.__state
+		if not state.dirty:
+			return
+		_backend(state).update(state.progress, state.message)
+		state.dirty = False
+		state.update_throttle.mark()
+
+	def __changed(cls):
+		state = cls.__state
+		state.dirty = True
+		if state.update_throttle.due():
+			cls.flush()
+
 	@property
 	def progress(cls):
-		res = cmds.progressWindow(q=True, progress=True)
-		assert isinstance(res, _types)
-		return res
+		return cls.__state.progress
 
 	@progress.setter
 	def progress(cls, value):
 		err.WrongTypeError(value, _types, 'progress value').raise_if_needed()
 		assert isinstance(value, _types)
-		cmds.progressWindow(e=True, progress=value)
-		if value > cls.max or value < cls.min:
+		state = cls.__state
+		state.progress = value
+		state.timing.update(value)
+		state.dirty = True
+		cls.flush()
+		if value > state.max or value < state.min:
 			cls.end()
 
 	@property
 	def min(cls):
-		res = cmds.progressWindow(q=True, min=True)
-		assert isinstance(res, _types)
-		return res
+		return cls.__state.min
 
 	@min.setter
 	def min(cls, value):
 		err.WrongTypeError(value, _types, 'min value').raise_if_needed()
-		cmds.progressWindow(e=True, min=value)
+		state = cls.__state
+		_backend(state).set_range(value, state.max)
+		state.min = value
 		if value > cls.max:
 			cls.max = value
 		if value > cls.progress:
@@ -47,14 +173,14 @@ class _ProgressWindowMeta(type):
 
 	@property
 	def max(cls):
-		res = cmds.progressWindow(q=True, max=True)
-		assert isinstance(res, _types)
-		return res
+		return cls.__state.max
 
 	@max.setter
 	def max(cls, value):
 		err.WrongTypeError(value, _types, 'max value').raise_if_needed()
-		cmds.progressWindow(e=True, max=value)
+		state = cls.__state
+		_backend(state).set_range(state.min, value)
+		state.max = value
 		if value < cls.min:
 			cls.min = value
 		if value < cls.progress:
@@ -68,70 +194,107 @@ class _ProgressWindowMeta(type):
 
 		The cancel button is disabled if this is set to true.
 		"""
-		res = cmds.progressWindow(q=True, isInterruptable=True)
-		assert isinstance(res, bool)
-		return res
+		return cls.__state.interruptable
 
 	@interruptable.setter
 	def interruptable(cls, value):
 		if isinstance(value, int):
 			value = bool(value)
 		err.WrongTypeError(value, bool, 'is-interruptable value').raise_if_needed()
-		cmds.progressWindow(e=True, isInterruptable=value)
+		state = cls.__state
+		_backend(state).set_interruptable(value)
+		state.interruptable = value
 
 	@property
 	def title(cls):
-		res = cmds.progressWindow(q=True, title=True)
-		assert isinstance(res, _str_t)
-		return res
+		return cls.__state.title
 
 	@title.setter
 	def title(cls, value):
 		err.NotStringError(value, 'title name').raise_if_needed()
-		cmds.progressWindow(e=True, title=value)
+		state = cls.__state
+		_backend(state).set_title(value)
+		state.title = value
 
 	@property
 	def message(cls):
-		res = cmds.progressWindow(q=True, status=True)
-		assert isinstance(res, _str_t)
-		return res
+		return cls.__state.message
 
 	@message.setter
 	def message(cls, value):
 		err.NotStringError(value, 'status message').raise_if_needed()
-		cmds.progressWindow(e=True, status=value)
+		state = cls.__state
+		if value == state.message:
+			return
+		state.message = value
+		cls.__changed()
 
 	def end(cls):
 		"""
 		Terminates the progress window.
+
+		The run's timing is added to the common log,
+		and the update interval given to start() only for this run is restored.
 		"""
-		cmds.progressWindow(endProgress=True)
-		progress = cls.progress
-		assert isinstance(progress, _types)
-		max_v = cls.max
-		assert isinstance(max_v, _types)
-		cls.progress = max_v
+		state = cls.__state
+		_backend(state).end()
+		timing = state.timing
+		if timing.is_started:
+			_log_timing(timing.record(
+				cls.__name__, state.title, completed=state.progress >= state.max
+			))
+			state.timing = Timing(timing.smoothing, timing.sample_interval)
+		state.progress = state.max
+		state.dirty = False
+		if state.prev_interval is not None:
+			cls.update_interval = state.prev_interval
+			state.prev_interval = None
 
 	def start(
 		cls,
 		message='', title='Progress',
 		interruptable=True,
-		min=0, max=100, start_value=0
+		min=0, max=100, start_value=0,
+		update_interval=None
 	):
+		"""
+		:param update_interval:
+			<float> Minimum time (seconds) between UI updates, for this run only:
+			the previous one is restored on end().
+			None keeps the current one (see **update_interval** property).
+		"""
 		cls.end()
-		cmds.progressWindow(
-			title=title, status=message,
-			isInterruptable=interruptable,
-			min=min, max=max, progress=start_value
+		state = cls.__state
+		_backend(state).start(
+			title=title, message=message,
+			min=min, max=max, value=start_value,
+			interruptable=interruptable
 		)
+		state.min = min
+		state.max = max
+		state.progress = start_value
+		state.message = message
+		state.title = title
+		state.interruptable = interruptable
+		state.dirty = False
+		if update_interval is not None:
+			state.prev_interval = cls.update_interval
+			cls.update_interval = update_interval
+		state.timing.start(start_value)
+		state.update_throttle.mark()
+		state.cancel_throttle.reset()
 
 	def is_cancelled(cls):
 		"""
 		Returns true if the user has tried to cancel the operation.
 		Returns false otherwise.
+
+		The window is actually polled at most once per **update_interval**.
 		"""
-		res = cmds.progressWindow(q=True, isCancelled=True)
-		assert isinstance(res, bool)
+		state = cls.__state
+		if not (state.interruptable and state.cancel_throttle.due()):
+			return False
+		res = bool(_backend(state).is_cancelled())
 		if res:
 			cls.end()
 		return res
@@ -155,17 +318,20 @@ class _ProgressWindowMeta(type):
 		"""
 		err.WrongTypeError(amount, _types, 'amount').raise_if_needed()
 		assert isinstance(amount, _types)
-		cmds.progressWindow(e=True, step=amount)
-		progress = cls.progress
-		assert isinstance(progress, _types)
-		if progress >= cls.max:
+		state = cls.__state
+		state.progress += amount
+		state.timing.update(state.progress)
+		if state.progress >= state.max:
 			cls.end()
+			return
+		cls.__changed()
 
 	def do_with_each(
 		cls,
 		items, do_with_each_f,
 		progress_title='Performing task...', progress_message='Progress: {0} / {1}',
-		progress_message_formatter_f=None
+		progress_message_formatter_f=None,
+		update_interval=None
 	):
 		"""
 		This is high-level function, allowing you to easily perform the same action
@@ -185,7 +351,10 @@ class _ProgressWindowMeta(type):
 				I.e., the list you may want to add the current element to
 				if some condition is met.
 		:param progress_title: <string> The title of the window.
-		:param progress_message: <string> The message that will be formatted.
+		:param progress_message:
+			<string> The message that will be formatted.
+			Besides the current item number ({0}) and the total ({1}), it may contain
+			timing patterns: {elapsed}, {rate} and {eta} (see **timing_fields()**).
 		:param progress_message_formatter_f:
 			A custom <function> that performs the actual formatting of the message.
 
@@ -194,6 +363,13 @@ class _ProgressWindowMeta(type):
 			:arg: <string> the formatted message
 			:arg: <int> number of the current item (i + 1)
 			:arg: <int> total number of items
+
+			Since the window is rate-limited, the formatter is called only when the message
+			is actually going to be shown.
+			The timing values are available in it with **timing_fields()**.
+		:param update_interval:
+			<float> Minimum time (seconds) between UI updates and cancel polls, for this run only.
+			None keeps the current one.
 		:return:
 			<list>, that you can add anything to by accessing
 			the last argument of the <do_with_each_f>.
@@ -226,7 +402,7 @@ class _ProgressWindowMeta(type):
 		def _error_check_formatter_f(formatter):
 			if formatter is None:
 				# formatter isn't defined, let's use the default one
-				formatter = lambda msg, cur, total: msg.format(cur, total)
+				formatter = lambda msg, cur, total: msg.format(cur, total, **cls.timing_fields())
 				return formatter
 
 			# formatter is defined, but... :
@@ -251,10 +427,16 @@ class _ProgressWindowMeta(type):
 
 		res = list()
 		pw = cls
-		cls.start(formatter_f(progress_message, 0, num), progress_title, max=num)
+		cls.start(
+			formatter_f(progress_message, 0, num), progress_title, max=num,
+			update_interval=update_interval
+		)
+		update_throttle = cls.__state.update_throttle
 		i = 0
 		while cls.is_active():
-			cls.message = formatter_f(progress_message, i + 1, num)
+			if update_throttle.due():
+				update_throttle.reset()  # let the message setter flush it
+				cls.message = formatter_f(progress_message, i + 1, num)
 			do_with_each_f(items[i], i, res)
 			i += 1
 			cls.increment()
@@ -0,0 +1,39 @@
+__author__ = 'Lex Darlog (DRL)'
+
+import time as _time
+
+_clock = getattr(_time, 'perf_counter', _time.time)
+
+DEFAULT_UPDATE_INTERVAL = 0.1  # seconds
+
+
+class Throttle(object):
+	"""
+	Rate limiter for UI updates and cancel polls:
+	**due()** returns True at most once per interval.
+
+	:param interval: <float> seconds. 0 or None disables throttling (always due).
+	"""
+	def __init__(self, interval=DEFAULT_UPDATE_INTERVAL):
+		super(Throttle, self).__init__()
+		self.interval = interval
+		self.__last = None
+
+	def reset(self):
+		"""The next **due()** call will return True."""
+		self.__last = None
+
+	def mark(self):
+		"""Remember that the update is just performed."""
+		self.__last = _clock()
+
+	def due(self):
+		interval = self.interval
+		if not interval:
+			return True
+		now = _clock()
+		last = self.__last
+		if last is None or now - last >= interval:
+			self.__last = now
+			return True
+		return False
@@ -0,0 +1,180 @@
+__author__ = 'Lex Darlog (DRL)'
+
+import collections as _c
+
+from .__throttle import _clock
+
+TimingRecord = _c.namedtuple(
+	'TimingRecord',
+	'name title items elapsed rate completed'
+)
+
+
+_log_size = 1000
+_log = _c.deque(maxlen=_log_size)  # the latest records, oldest first
+
+
+def log_timing(record):
+	"""
+	Add a finished run to the common timing log (shared by <Progress> and <ProgressWindow>).
+
+	:type record: TimingRecord
+	"""
+	_log.append(record)
+
+
+def timing_log():
+	"""
+	Timing records of the finished runs (the latest ones), oldest first.
+
+	:rtype: tuple[TimingRecord]
+	"""
+	return tuple(_log)
+
+
+def clear_timing_log():
+	_log.clear()
+
+
+def format_rate(rate):
+	"""
+	Items per second with 2 decimals. None gives '?' (unknown).
+
+	:type rate: float | None
+	:rtype: str
+	"""
+	return '?' if rate is None else format(rate, '.2f')
+
+
+def format_duration(seconds):
+	"""
+	Human-readable duration: 'M:SS' or 'H:MM:SS'. None gives '--:--' (unknown).
+
+	:type seconds: float | None
+	:rtype: str
+	"""
+	if seconds is None:
+		return '--:--'
+	seconds = int(round(max(seconds, 0.0)))
+	h, rest = divmod(seconds, 3600)
+	m, s = divmod(rest, 60)
+	if h:
+		return '{0}:{1:02d}:{2:02d}'.format(h, m, s)
+	return '{0}:{1:02d}'.format(m, s)
+
+
+class Timing(object):
+	"""
+	Throughput tracker for a single progress run.
+
+	The rate (items per second) is an exponential moving average of the samples
+	taken at least **sample_interval** seconds apart.
+	Until the first sample, it's the average since the start.
+
+	:param smoothing: <float> 0..1, the weight of the newest sample.
+	:param sample_interval: <float> seconds between rate samples.
+	"""
+	def __init__(self, smoothing=0.3, sample_interval=0.25):
+		super(Timing, self).__init__()
+		self.smoothing = float(smoothing)
+		self.sample_interval = float(sample_interval)
+		self.__start_time = None
+		self.__start_value = 0
+		self.__end_time = None
+		self.__value = 0
+		self.__sample_time = None
+		self.__sample_value = 0
+		self.__rate = None
+
+	@property
+	def is_started(self):
+		return self.__start_time is not None
+
+	def start(self, value=0):
+		now = _clock()
+		self.__start_time = now
+		self.__start_value = value
+		self.__end_time = None
+		self.__value = value
+		self.__sample_time = now
+		self.__sample_value = value
+		self.__rate = None
+
+	def stop(self):
+		if self.__start_time is not None and self.__end_time is None:
+			self.__end_time = _clock()
+
+	def update(self, value):
+		"""
+		Register the new progress value.
+		"""
+		if self.__start_time is None:
+			self.start(value)
+			return
+		self.__value = value
+		now = _clock()
+		dt = now - self.__sample_time
+		if dt < self.sample_interval:
+			return
+		sample = (value - self.__sample_value) / dt
+		rate = self.__rate
+		a = self.smoothing
+		self.__rate = sample if rate is None else a * sample + (1.0 - a) * rate
+		self.__sample_time = now
+		self.__sample_value = value
+
+	@property
+	def items(self):
+		"""Number of items processed since the start."""
+		return self.__value - self.__start_value
+
+	def elapsed(self):
+		"""
+		:rtype: float
+		"""
+		if self.__start_time is None:
+			return 0.0
+		end = _clock() if self.__end_time is None else self.__end_time
+		return end - self.__start_time
+
+	def rate(self):
+		"""
+		Smoothed items per second. None if it's unknown yet.
+
+		:rtype: float | None
+		"""
+		if self.__rate is not None:
+			return self.__rate
+		elapsed = self.elapsed()
+		if elapsed <= 0.0 or not self.items:
+			return None
+		return self.items / elapsed
+
+	def record(self, name, title, completed):
+		"""
+		Stop the timer and build the record of the run.
+
+		:rtype: TimingRecord
+		"""
+		self.stop()
+		elapsed = self.elapsed()
+		items = self.items
+		return TimingRecord(
+			name=name,
+			title=title,
+			items=items,
+			elapsed=elapsed,
+			rate=(items / elapsed) if elapsed > 0.0 else None,
+			completed=completed,
+		)
+
+	def eta(self, target):
+		"""
+		Estimated seconds left to reach the target value. None if it's unknown.
+
+		:rtype: float | None
+		"""
+		rate = self.rate()
+		if not rate or rate <= 0.0:
+			return None
+		return max(target - self.__value, 0) / rate
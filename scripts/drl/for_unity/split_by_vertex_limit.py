@@ -12,6 +12,7 @@ from drl_py23 import (
 	t_strict_unicode as _unicode,
 )
 from drl.for_maya import ls
+from drl.for_maya.ls.material_index import MaterialIndex
 from drl.for_maya.geo.components.old.vertices import calc_unityCount as calc_vert
 from drl.for_maya import transformations as tr
 from drl.for_maya import utils as mu
@@ -223,8 +224,9 @@ class GroupedShapes(object):
 		def __call__(self, *args, **kwargs):
 			return self.mat, self.big
 
-	def __init__(self, shapes=None, max_verts=300):
+	def __init__(self, shapes=None, max_verts=300, material_index=None):
 		self.__max = 300
+		self.__material_index = material_index
 		self.__unordered = ShapesGroup()
 		self.__by_mat = list()
 		self.__errored = self.__ErrorGroup()
@@ -286,11 +288,14 @@ class GroupedShapes(object):
 
 	def __regroup(self):
 		pending = self.unordered
+		mat_index = self.__material_index
+		if mat_index is None:
+			mat_index = self.__material_index = MaterialIndex()
 		for sObj in pending:
 			if not isinstance(sObj, CountedShape):
 				raise Exception('GroupedShapes: Somehow non-CountedShape element appeared in unordered: %s' % sObj)
 			shapePath = sObj.shape
-			mats = ls.shapes_to_materials(shapePath)
+			mats = ls.shapes_to_materials(shapePath, material_index=mat_index)
 			if len(mats) != 1:
 				self.__errored.mat.add_shape(sObj)
 			elif sObj.vertices(refresh=False) > self.max_vert:
@@ -386,7 +391,9 @@ class Splitter(object):
 		res = list()
 		shapes = hrc.to_children(objects, **no_sel)
 		shapes = hrc.to_shapes(shapes, **no_sel)
-		grouped = GroupedShapes(shapes, self.max)
+		# a single material snapshot for all the separated pieces of this object,
+		# limited to them (not the entire scene for each split object):
+		grouped = GroupedShapes(shapes, self.max, MaterialIndex(shapes=shapes))
 		# errors - big:
 		self.__perform_errored_processing(
 			grouped.errors.big,
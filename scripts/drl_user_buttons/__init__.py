@@ -1,4 +1,10 @@
 __author__ = 'Lex Darlog (DRL)'
 
+from drl.for_maya.lazy_import import lazy_submodules as _lazy_submodules
 
-from . import aivik, auto, cleanup, colors, curves, hud, plugin, poly, transform, ui, uv_layout, uvs, vertices
+# Each button module is imported (with all it's dependencies, like PyMEL)
+# only on the first access. I.e., <drl_user_buttons.uvs> loads <uvs> submodule.
+_lazy_submodules(__name__, (
+	'aivik', 'auto', 'cleanup', 'colors', 'curves', 'hud', 'plugin', 'poly', 'transform', 'ui',
+	'uv_layout', 'uvs', 'vertices',
+))